@@ -0,0 +1,322 @@
+#!/usr/bin/env -S uv run
+# /// script
+# dependencies = []
+# requires-python = ">=3.8"
+# ///
+"""
+Benchmark the managing-specifications analysis and validation scripts on synthetic repositories
+
+Usage:
+    uv run benchmarks/run-benchmarks.py generate <dir> [--files 10000] [--seed 1]
+    uv run benchmarks/run-benchmarks.py run [--files 10000] [--output results.json]
+    uv run benchmarks/run-benchmarks.py run --repo <dir> --output results.json
+    uv run benchmarks/run-benchmarks.py compare before.json after.json
+"""
+
+import sys
+import os
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+import importlib.util
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent / 'skills' / 'managing-specifications' / 'scripts'
+ANALYZE_SCRIPT = SCRIPTS_DIR / 'analyze-project-context.py'
+VALIDATE_SCRIPT = SCRIPTS_DIR / 'validate-spec.py'
+
+# A running analysis server would answer from its warm caches and skew the timings
+BENCH_ENV = dict(os.environ, SDD_NO_SERVER='1')
+
+DEFAULT_LANGUAGE_MIX = 'py:35,js:25,ts:15,php:10,rb:5,go:5,md:5'
+
+# Route snippets per extension; one in four source files gets a few routes
+ROUTE_SNIPPETS = {
+    'py': "@app.route('/{name}/<int:id>', methods=['GET', 'POST'])\ndef {name}_view(id):\n    return {{}}\n",
+    'js': "app.get('/{name}/:id', (req, res) => res.json({{}}));\n",
+    'ts': "router.post('/{name}', async (req, res) => res.sendStatus(201));\n",
+    'php': "Route::get('/{name}', '{Name}Controller@index');\n",
+    'rb': "get '/{name}', to: '{name}#index'\n",
+}
+
+FILLER_LINES = {
+    'py': "def helper_{i}(value):\n    # Normalise the value before returning it\n    return value * {i}\n",
+    'js': "function helper{i}(value) {{\n  // Normalise the value before returning it\n  return value * {i};\n}}\n",
+    'ts': "export function helper{i}(value: number): number {{\n  return value * {i};\n}}\n",
+    'php': "function helper_{i}($value) {{\n    return $value * {i};\n}}\n",
+    'rb': "def helper_{i}(value)\n  value * {i}\nend\n",
+    'go': "func helper{i}(value int) int {{\n\treturn value * {i}\n}}\n",
+    'md': "## Section {i}\n\nSome prose describing part {i} of the system.\n",
+}
+
+WORDS = ['user', 'order', 'item', 'cart', 'auth', 'report', 'search', 'billing', 'profile', 'admin']
+
+def parse_mix(mix):
+    """Parse 'py:35,js:25' into a list of (extension, weight)"""
+    pairs = []
+    for part in mix.split(','):
+        ext, _, weight = part.partition(':')
+        pairs.append((ext.strip(), float(weight or 1)))
+    return pairs
+
+def source_file(rng, ext, lines):
+    """Render a synthetic source file of roughly `lines` lines"""
+    chunks = []
+    if ext in ROUTE_SNIPPETS and rng.random() < 0.25:
+        for _ in range(rng.randint(1, 4)):
+            name = rng.choice(WORDS)
+            chunks.append(ROUTE_SNIPPETS[ext].format(name=name, Name=name.title()))
+    template = FILLER_LINES.get(ext, FILLER_LINES['md'])
+    for i in range(max(1, lines // template.count('\n'))):
+        chunks.append(template.format(i=i))
+    return ''.join(chunks)
+
+def write(path, content):
+    """Write a text file, creating parents"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+
+def generate_repo(root, files=10000, depth=4, mix=DEFAULT_LANGUAGE_MIX, vendored=0.1, ignored=0.1,
+                  large_files=2, large_file_mb=5, changes=200, seed=1, git=False):
+    """Generate a deterministic synthetic repository and return its parameters
+
+    `vendored` and `ignored` are the fractions of files placed in vendored
+    (vendor/, third_party/) and build-output (build/, dist/) directories.
+    """
+    rng = random.Random(seed)
+    root = Path(root)
+    if root.exists():
+        shutil.rmtree(root)
+    root.mkdir(parents=True)
+
+    mix_pairs = parse_mix(mix)
+    extensions = [ext for ext, _ in mix_pairs]
+    weights = [weight for _, weight in mix_pairs]
+
+    write(root / 'README.md', "# Synthetic project\n\nGenerated for benchmarking project analysis.\n")
+    write(root / 'requirements.txt', "flask==3.0.0\nrequests>=2.31\n")
+    write(root / 'package.json', json.dumps({'name': 'synthetic', 'dependencies': {'express': '^4.18.0'}}))
+    write(root / '.gitignore', "build/\ndist/\n*.log\n")
+
+    top_dirs = ['src', 'app', 'lib', 'internal', 'pkg']
+    for n in range(files):
+        roll = rng.random()
+        ext = rng.choices(extensions, weights)[0]
+        if roll < vendored:
+            base = rng.choice(['vendor', 'third_party']) + f"/lib{n % 20}"
+        elif roll < vendored + ignored:
+            base = rng.choice(['build', 'dist'])
+        else:
+            base = rng.choice(top_dirs)
+        parts = [base] + [f"{rng.choice(WORDS)}{rng.randint(0, 9)}" for _ in range(rng.randint(0, depth))]
+        path = root / '/'.join(parts) / f"file{n}.{ext}"
+        write(path, source_file(rng, ext, rng.randint(10, 200)))
+
+    for n in range(large_files):
+        bundle = root / 'dist' / f"bundle{n}.min.js"
+        bundle.parent.mkdir(parents=True, exist_ok=True)
+        line = "var a=function(b){return b*2};app.get('/bundled',a);" * 20 + "\n"
+        with open(bundle, 'w') as f:
+            for _ in range(max(1, large_file_mb * (1 << 20) // len(line))):
+                f.write(line)
+
+    for n in range(20):
+        write(root / 'migrations' / f"{n:04d}_step.sql",
+              f"CREATE TABLE t{n} (id INTEGER PRIMARY KEY, name TEXT);\nCREATE INDEX idx_t{n} ON t{n}(name);\n")
+    write(root / 'docs' / 'architecture.md', "# Architecture\n\nSynthetic.\n")
+
+    write(root / 'openspec' / 'project.md', "# Project\n")
+    for n in range(changes):
+        change = root / 'openspec' / 'changes' / f"change-{n:05d}"
+        write(change / 'proposal.md', "# Problem\n\nWhy: because.\n\n# Solution\n\nDo it.\n\n# Impact\n\n"
+              "Affects the API. Alternatives considered: none.\n")
+        write(change / 'design.md', "# Design\n\nAPI and database schema changes.\n")
+        done = rng.randint(0, 5)
+        tasks = ''.join(f"- [{'x' if i < done else ' '}] Task {i} (after task {i - 1})\n" for i in range(5))
+        write(change / 'tasks.md', "# Tasks\n\n" + tasks)
+
+    if git:
+        env = dict(os.environ, GIT_AUTHOR_NAME='bench', GIT_AUTHOR_EMAIL='bench@example.com',
+                   GIT_COMMITTER_NAME='bench', GIT_COMMITTER_EMAIL='bench@example.com')
+        subprocess.run(['git', 'init', '-q'], cwd=str(root), check=True)
+        subprocess.run(['git', 'add', '-A'], cwd=str(root), check=True)
+        subprocess.run(['git', 'commit', '-qm', 'synthetic'], cwd=str(root), check=True, env=env)
+
+    return {
+        'files': files, 'depth': depth, 'mix': mix, 'vendored': vendored, 'ignored': ignored,
+        'large_files': large_files, 'large_file_mb': large_file_mb, 'changes': changes,
+        'seed': seed, 'git': git,
+    }
+
+def run_analysis(repo, workdir, label, extra_args):
+    """Run analyze-project-context.py with --profile and return its timing record"""
+    output_file = Path(workdir) / 'project-context.json'
+    cmd = [sys.executable, str(ANALYZE_SCRIPT), '--project-root', str(repo),
+           '--output-file', str(output_file), '--profile'] + extra_args
+    start = time.perf_counter()
+    result = subprocess.run(cmd, capture_output=True, text=True, env=BENCH_ENV)
+    wall = time.perf_counter() - start
+    if result.returncode != 0:
+        print(result.stdout + result.stderr)
+        raise SystemExit(f"{label} failed with exit code {result.returncode}")
+
+    metadata_file = Path(repo) / 'openspec' / 'specs' / '.analysis-metadata.json'
+    with open(metadata_file) as f:
+        profile = json.load(f).get('profile', {})
+    print(f"   {label:<16} {wall:8.3f}s")
+    return {'wall_seconds': round(wall, 6), 'phases': profile.get('phases', {})}
+
+def load_validator():
+    """Import validate-spec.py as a module"""
+    spec = importlib.util.spec_from_file_location('validate_spec', VALIDATE_SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def run_validation(repo, label, cache_file):
+    """Validate every spec file under the repo in-process with `cache_file` and return its timing record"""
+    validator_module = load_validator()
+    start = time.perf_counter()
+    cache = validator_module.load_validation_cache(Path(cache_file))
+    paths, _ = validator_module.discover_spec_files([str(Path(repo) / 'openspec')])
+    summary = validator_module.summarize(validator_module.validate_files(paths, cache=cache))
+    validator_module.save_validation_cache(cache)
+    wall = time.perf_counter() - start
+    print(f"   {label:<16} {wall:8.3f}s  ({summary['total']} files)")
+    return {'wall_seconds': round(wall, 6), 'files': summary['total'], 'issues': summary['issues']}
+
+def cmd_generate(args):
+    params = generate_repo(args.dir, args.files, args.depth, args.mix, args.vendored, args.ignored,
+                           args.large_files, args.large_file_mb, args.changes, args.seed, args.git)
+    print(json.dumps(params, indent=2))
+
+def cmd_run(args):
+    workdir = Path(tempfile.mkdtemp(prefix='sdd-bench-'))
+    try:
+        if args.repo:
+            # Runs write openspec/ and analysis metadata, so they work on a copy
+            source = Path(args.repo).resolve()
+            repo = workdir / 'repo'
+            print(f"Copying {source}...")
+            shutil.copytree(source, repo, symlinks=True)
+            params = {'repo': str(source)}
+        else:
+            repo = workdir / 'repo'
+            print(f"Generating {args.files} files...")
+            params = generate_repo(repo, args.files, args.depth, args.mix, args.vendored, args.ignored,
+                                   args.large_files, args.large_file_mb, args.changes, args.seed, args.git)
+
+        (repo / 'openspec').mkdir(exist_ok=True)
+        extra = ['--jobs', str(args.jobs)] if args.jobs > 1 else []
+        cache_file = workdir / 'cache.json'
+        validation_cache_file = workdir / 'validate-cache.json'
+
+        print("Running:")
+        runs = {}
+        for n in range(args.repeat):
+            suffix = f"#{n + 1}" if args.repeat > 1 else ''
+            for path in (cache_file, validation_cache_file):
+                if path.exists():
+                    path.unlink()
+            runs.setdefault('analyze_cold', []).append(
+                run_analysis(repo, workdir, f"analyze cold{suffix}", extra + ['--cache-file', str(cache_file)]))
+            runs.setdefault('analyze_warm', []).append(
+                run_analysis(repo, workdir, f"analyze warm{suffix}", extra + ['--cache-file', str(cache_file)]))
+            runs.setdefault('validate_cold', []).append(
+                run_validation(repo, f"validate cold{suffix}", validation_cache_file))
+            runs.setdefault('validate_warm', []).append(
+                run_validation(repo, f"validate warm{suffix}", validation_cache_file))
+
+        results = {
+            'created_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'params': params,
+            'runs': runs,
+        }
+        if args.output:
+            Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+            with open(args.output, 'w') as f:
+                json.dump(results, f, indent=2)
+            print(f"\nResults written to: {args.output}")
+    finally:
+        if args.keep:
+            print(f"Working directory kept: {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+def best(records, key='wall_seconds'):
+    """Fastest value of `key` across repeated runs"""
+    return min(record[key] for record in records)
+
+def cmd_compare(args):
+    with open(args.before) as f:
+        before = json.load(f)
+    with open(args.after) as f:
+        after = json.load(f)
+
+    print(f"{'benchmark':<32} {'before':>10} {'after':>10} {'change':>8}")
+    for name in sorted(set(before['runs']) & set(after['runs'])):
+        rows = [(name, best(before['runs'][name]), best(after['runs'][name]))]
+        phases = before['runs'][name][0].get('phases', {})
+        for phase in phases:
+            if phase in after['runs'][name][0].get('phases', {}):
+                rows.append((
+                    f"  {phase}",
+                    min(r['phases'][phase]['seconds'] for r in before['runs'][name]),
+                    min(r['phases'][phase]['seconds'] for r in after['runs'][name]),
+                ))
+        for label, old, new in rows:
+            change = f"{(new - old) / old:+.0%}" if old else 'n/a'
+            print(f"{label:<32} {old:>9.3f}s {new:>9.3f}s {change:>8}")
+
+def add_generation_args(parser):
+    parser.add_argument('--files', type=int, default=10000, help='Number of source files (default: 10000)')
+    parser.add_argument('--depth', type=int, default=4, help='Maximum nesting below top-level dirs (default: 4)')
+    parser.add_argument('--mix', default=DEFAULT_LANGUAGE_MIX, help=f"Extension weights (default: {DEFAULT_LANGUAGE_MIX})")
+    parser.add_argument('--vendored', type=float, default=0.1, help='Fraction of files in vendored dirs (default: 0.1)')
+    parser.add_argument('--ignored', type=float, default=0.1, help='Fraction of files in build output (default: 0.1)')
+    parser.add_argument('--large-files', type=int, default=2, help='Number of large generated bundles (default: 2)')
+    parser.add_argument('--large-file-mb', type=int, default=5, help='Size of each bundle in MB (default: 5)')
+    parser.add_argument('--changes', type=int, default=200, help='Number of openspec changes (default: 200)')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed (default: 1)')
+    parser.add_argument('--git', action='store_true', help='Initialise a git repository and commit everything')
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark analysis and validation on synthetic repositories')
+    subparsers = parser.add_subparsers(dest='command')
+
+    generate = subparsers.add_parser('generate', help='Generate a synthetic repository')
+    generate.add_argument('dir', help='Directory to create (replaced if it exists)')
+    add_generation_args(generate)
+
+    run = subparsers.add_parser('run', help='Time cold and warm runs and write JSON results')
+    run.add_argument('--repo', help='Benchmark an existing repository instead of generating one')
+    run.add_argument('--output', help='Write results JSON here')
+    run.add_argument('--repeat', type=int, default=1, help='Repeat each measurement (default: 1)')
+    run.add_argument('--jobs', type=int, default=1, help='Pass --jobs to the analysis (default: 1)')
+    run.add_argument('--keep', action='store_true', help='Keep the temporary working directory')
+    add_generation_args(run)
+
+    compare = subparsers.add_parser('compare', help='Compare two results files')
+    compare.add_argument('before')
+    compare.add_argument('after')
+
+    args = parser.parse_args()
+    if args.command == 'generate':
+        cmd_generate(args)
+    elif args.command == 'run':
+        cmd_run(args)
+    elif args.command == 'compare':
+        cmd_compare(args)
+    else:
+        parser.print_help()
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -67,6 +67,15 @@ case $PHASE in
             echo "   ✓ OpenSpec already initialized"
         fi
 
+        # The proposal status index is a local cache; keep it (and its journal) out of commits
+        if ! grep -qxF 'openspec/.status-index.sqlite*' .gitignore 2>/dev/null; then
+            if [ -s .gitignore ] && [ -n "$(tail -c 1 .gitignore)" ]; then
+                echo "" >> .gitignore
+            fi
+            echo 'openspec/.status-index.sqlite*' >> .gitignore
+            echo "   ✓ Added openspec/.status-index.sqlite* to .gitignore"
+        fi
+
         # Step 3: Analyze project and generate baseline specs (legacy only)
         if [ "$PHASE" = "legacy" ]; then
             echo -e "\n🔍 Step 3/4: Analyzing project and generating baseline specs..."
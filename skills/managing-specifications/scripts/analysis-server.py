@@ -0,0 +1,222 @@
+#!/usr/bin/env -S uv run
+# /// script
+# dependencies = []
+# requires-python = ">=3.8"
+# ///
+"""
+Local analysis server: runs analyze-project-context.py and validate-spec.py
+in one long-lived process so parsed caches, compiled templates and imported
+code stay warm between invocations. While it is running, both CLIs hand
+their arguments to it over a Unix socket; otherwise they run in-process.
+
+Usage:
+    uv run scripts/analysis-server.py &           # serve until idle for --idle-timeout
+    uv run scripts/analysis-server.py --status
+    uv run scripts/analysis-server.py --stop
+
+Set SDD_NO_SERVER=1 to make the CLIs ignore a running server, and
+SDD_ANALYSIS_SOCKET to use a different socket path.
+"""
+
+import sys
+import os
+import io
+import json
+import hashlib
+import time
+import signal
+import socket
+import argparse
+import tempfile
+import traceback
+import importlib.util
+from contextlib import redirect_stdout, redirect_stderr
+
+# Scripts a client may ask the server to run (matched by file name)
+SERVED_SCRIPTS = {'analyze-project-context.py', 'validate-spec.py'}
+
+# Served script path -> ((mtime_ns, size), module)
+_scripts = {}
+
+def server_socket_path():
+    """Where the server listens; SDD_ANALYSIS_SOCKET overrides the per-user default"""
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR') or tempfile.gettempdir()
+    return os.environ.get('SDD_ANALYSIS_SOCKET') or os.path.join(runtime_dir, f'sdd-analysis-{os.getuid()}.sock')
+
+def load_script(path):
+    """Import a served script by path, re-importing it when the file changes"""
+    st = os.stat(path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _scripts.get(path)
+    if cached and cached[0] == stamp:
+        return cached[1]
+
+    # One module name per resolved path, so checkouts served by one daemon never share module state
+    name = os.path.basename(path)[:-3].replace('-', '_') + '_' + hashlib.sha1(path.encode('utf-8')).hexdigest()[:12]
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    # Registered so worker pools can pickle the module's functions
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    _scripts[path] = (stamp, module)
+    return module
+
+def run_script(request):
+    """Run a served script's main() with the client's argv, cwd and environment, capturing its output"""
+    path = os.path.realpath(request.get('script', ''))
+    if os.path.basename(path) not in SERVED_SCRIPTS or not os.path.isfile(path):
+        return {'stdout': '', 'stderr': f"Not a served script: {path}\n", 'exit_code': 2}
+
+    stdout, stderr = io.StringIO(), io.StringIO()
+    saved_argv, saved_cwd, saved_env = sys.argv, os.getcwd(), dict(os.environ)
+    exit_code = 0
+    try:
+        if request.get('env') is not None:
+            os.environ.clear()
+            os.environ.update(request['env'])
+            # The served scripts must still not forward to ourselves
+            os.environ['SDD_NO_SERVER'] = '1'
+        os.chdir(request.get('cwd') or saved_cwd)
+        sys.argv = [path] + list(request.get('argv', []))
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            try:
+                load_script(path).main()
+            except SystemExit as e:
+                if isinstance(e.code, int) or e.code is None:
+                    exit_code = e.code or 0
+                else:
+                    print(e.code, file=sys.stderr)
+                    exit_code = 1
+            except Exception:
+                traceback.print_exc()
+                exit_code = 1
+    except OSError as e:
+        stderr.write(f"Error: {e}\n")
+        exit_code = 1
+    finally:
+        sys.argv = saved_argv
+        os.chdir(saved_cwd)
+        os.environ.clear()
+        os.environ.update(saved_env)
+
+    return {'stdout': stdout.getvalue(), 'stderr': stderr.getvalue(), 'exit_code': exit_code}
+
+def send_request(socket_path, request, timeout=None):
+    """Send one JSON request and return the JSON response, or None if nobody answers"""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(1.0)
+            sock.connect(socket_path)
+            sock.settimeout(timeout)
+            sock.sendall(json.dumps(request).encode('utf-8') + b'\n')
+            with sock.makefile('rb') as f:
+                return json.loads(f.readline())
+    except (OSError, ValueError):
+        return None
+
+def serve(socket_path, idle_timeout):
+    """Answer requests one at a time until shut down or idle; returns the exit code"""
+    if os.path.exists(socket_path):
+        if send_request(socket_path, {'command': 'ping'}, timeout=2.0) is not None:
+            print(f"Analysis server already running on {socket_path}")
+            return 1
+        os.unlink(socket_path)
+
+    # The served scripts must not try to forward to ourselves
+    os.environ['SDD_NO_SERVER'] = '1'
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    old_umask = os.umask(0o177)
+    try:
+        server.bind(socket_path)
+    finally:
+        os.umask(old_umask)
+    bound_inode = os.stat(socket_path).st_ino
+    server.listen(16)
+    server.settimeout(idle_timeout or None)
+
+    started = time.time()
+    served = 0
+    print(f"🛰  Analysis server listening on {socket_path} (pid {os.getpid()})", flush=True)
+    try:
+        while True:
+            try:
+                conn, _ = server.accept()
+            except socket.timeout:
+                print(f"Idle for {idle_timeout:g}s, shutting down", flush=True)
+                return 0
+            with conn:
+                conn.settimeout(30.0)
+                try:
+                    with conn.makefile('rb') as f:
+                        request = json.loads(f.readline())
+                except (OSError, ValueError):
+                    continue
+                conn.settimeout(None)
+
+                command = request.get('command')
+                if command == 'ping':
+                    response = {
+                        'pid': os.getpid(),
+                        'uptime_seconds': round(time.time() - started, 1),
+                        'requests': served,
+                        'scripts': sorted(os.path.basename(p) for p in _scripts),
+                    }
+                elif command == 'shutdown':
+                    response = {'stopping': True}
+                else:
+                    response = run_script(request)
+                    served += 1
+                try:
+                    conn.sendall(json.dumps(response).encode('utf-8') + b'\n')
+                except OSError:
+                    pass
+                if command == 'shutdown':
+                    print("Shutdown requested", flush=True)
+                    return 0
+    finally:
+        server.close()
+        try:
+            if os.stat(socket_path).st_ino == bound_inode:
+                os.unlink(socket_path)
+        except OSError:
+            pass
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve analysis and validation requests from warm caches')
+    parser.add_argument(
+        '--socket',
+        default=server_socket_path(),
+        help='Unix socket path (default: $XDG_RUNTIME_DIR or the temp dir, per user)'
+    )
+    parser.add_argument(
+        '--idle-timeout',
+        type=float,
+        default=1800,
+        help='Exit after this many seconds without requests; 0 serves forever (default: 1800)'
+    )
+    parser.add_argument('--status', action='store_true', help='Report whether a server is running')
+    parser.add_argument('--stop', action='store_true', help='Ask a running server to exit')
+    args = parser.parse_args()
+
+    if not hasattr(socket, 'AF_UNIX'):
+        print("Error: Unix domain sockets are not available on this platform")
+        sys.exit(1)
+
+    if args.status or args.stop:
+        response = send_request(args.socket, {'command': 'shutdown' if args.stop else 'ping'}, timeout=5.0)
+        if response is None:
+            print(f"No analysis server running on {args.socket}")
+            sys.exit(1)
+        if args.stop:
+            print("Analysis server stopped")
+        else:
+            print(f"Analysis server pid {response['pid']} on {args.socket}: up {response['uptime_seconds']}s, "
+                  f"{response['requests']} request(s) served")
+        sys.exit(0)
+
+    sys.exit(serve(args.socket, args.idle_timeout))
+
+if __name__ == "__main__":
+    main()
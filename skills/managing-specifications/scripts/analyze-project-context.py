@@ -6,35 +6,1189 @@
 """
 Analyze existing codebase and generate project context for AI assistance
 Usage: uv run scripts/analyze-project-context.py [--output-file .claude/project-context.json] [--generate-specs]
+       uv run scripts/analyze-project-context.py --watch    # keep the context current while you work
 """
 
 import sys
 import os
+import re
+import ast
 import json
+import time
+import codecs
+import select
+import socket
+import struct
+import stat
+import tempfile
+import bisect
+import hashlib
 import argparse
+import subprocess
 from pathlib import Path
 from collections import defaultdict
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11 falls back to parse_toml_subset()
+    tomllib = None
+
+# Root files that identify each tech stack
+PROJECT_MARKERS = {
+    'python': ['setup.py', 'requirements.txt', 'pyproject.toml'],
+    'node': ['package.json', 'yarn.lock'],
+    'go': ['go.mod', 'go.sum'],
+    'rust': ['Cargo.toml'],
+    'java': ['pom.xml', 'build.gradle'],
+    'ruby': ['Gemfile'],
+}
+
+# Root dependency manifests and lockfiles parsed per detected stack
+DEPENDENCY_FILES = {
+    'python': ['requirements.txt', 'Pipfile', 'pyproject.toml', 'Pipfile.lock', 'poetry.lock'],
+    'node': ['package.json', 'package-lock.json', 'yarn.lock'],
+    'go': ['go.mod', 'go.sum'],
+    'rust': ['Cargo.toml', 'Cargo.lock'],
+    'java': ['pom.xml', 'build.gradle', 'build.gradle.kts']
+}
 
 def detect_project_type(root_path):
     """Detect project type and tech stack"""
-    markers = {
-        'python': ['setup.py', 'requirements.txt', 'pyproject.toml'],
-        'node': ['package.json', 'yarn.lock'],
-        'go': ['go.mod', 'go.sum'],
-        'rust': ['Cargo.toml'],
-        'java': ['pom.xml', 'build.gradle'],
-        'ruby': ['Gemfile'],
-    }
-
     detected = []
-    for lang, files in markers.items():
+    for lang, files in PROJECT_MARKERS.items():
         if any((root_path / f).exists() for f in files):
             detected.append(lang)
 
     return detected
 
-def analyze_directory_structure(root_path):
+# Directories never worth descending into (kept in sync with detect-phase.sh)
+IGNORED_DIRS = {
+    '.git', 'node_modules', 'venv', '.venv', 'env', 'build', 'dist',
+    'target', '__pycache__', '.pytest_cache', 'vendor',
+}
+
+# Third-party code copied into the tree: directory names, and files that mark their directory as vendored
+VENDOR_DIR_NAMES = {
+    'third_party', 'third-party', 'thirdparty', '3rdparty', '_vendor', 'vendored',
+    'bower_components', 'jspm_packages', 'site-packages', 'Godeps',
+}
+VENDOR_MARKER_FILES = {'.git', '.bower.json'}
+VENDOR_ATTRIBUTES = {'linguist-vendored', 'linguist-generated'}
+
+# Identical subtrees with at least this many files are analyzed once
+DUPLICATE_MIN_FILES = 3
+DUPLICATE_SAMPLE_FILES = 16
+DUPLICATE_SAMPLE_BYTES = 4096
+
+# Files inspected for API route patterns
+SOURCE_EXTENSIONS = ('.py', '.js', '.ts', '.php', '.rb')
+
+# Schema files matched by name anywhere, or by extension inside a schema directory
+SCHEMA_FILE_NAMES = {'schema.sql', 'models.py', 'schema.rb'}
+SCHEMA_DIRS = {'migrations', 'schema'}
+
+# Top-level documentation files
+DOC_FILES = ['README.md', 'ARCHITECTURE.md', 'API.md', 'CONTRIBUTING.md']
+
+# Languages counted in code statistics: extensions and the prefixes of their comment lines
+C_COMMENT_PREFIXES = (b'//', b'/*', b'*')
+CODE_LANGUAGES = {
+    'python': (('.py', '.pyi'), (b'#',)),
+    'javascript': (('.js', '.jsx', '.mjs', '.cjs'), C_COMMENT_PREFIXES),
+    'typescript': (('.ts', '.tsx', '.mts', '.cts'), C_COMMENT_PREFIXES),
+    'go': (('.go',), C_COMMENT_PREFIXES),
+    'rust': (('.rs',), C_COMMENT_PREFIXES),
+    'java': (('.java',), C_COMMENT_PREFIXES),
+    'kotlin': (('.kt', '.kts'), C_COMMENT_PREFIXES),
+    'scala': (('.scala',), C_COMMENT_PREFIXES),
+    'swift': (('.swift',), C_COMMENT_PREFIXES),
+    'c': (('.c', '.h'), C_COMMENT_PREFIXES),
+    'cpp': (('.cc', '.cpp', '.cxx', '.hh', '.hpp', '.hxx'), C_COMMENT_PREFIXES),
+    'csharp': (('.cs',), C_COMMENT_PREFIXES),
+    'php': (('.php',), C_COMMENT_PREFIXES + (b'#',)),
+    'ruby': (('.rb', '.rake'), (b'#',)),
+    'shell': (('.sh', '.bash', '.zsh'), (b'#',)),
+    'sql': (('.sql',), (b'--',)),
+    'html': (('.html', '.htm', '.vue', '.svelte'), (b'<!--',)),
+    'css': (('.css', '.scss', '.sass', '.less'), C_COMMENT_PREFIXES),
+    'markdown': (('.md', '.rst'), ()),
+    'yaml': (('.yml', '.yaml'), (b'#',)),
+    'toml': (('.toml',), (b'#',)),
+    'json': (('.json',), ()),
+    'xml': (('.xml',), (b'<!--',)),
+}
+LANGUAGE_BY_EXTENSION = {ext: lang for lang, (exts, _) in CODE_LANGUAGES.items() for ext in exts}
+COMMENT_LINE_PATTERNS = {
+    lang: re.compile(rb'^[ \t]*(?:' + b'|'.join(re.escape(p) for p in prefixes) + rb')', re.M)
+    for lang, (_, prefixes) in CODE_LANGUAGES.items() if prefixes
+}
+BLANK_LINE = re.compile(rb'^[ \t\r\f\v]*$', re.M)
+
+def translate_gitignore_pattern(pattern):
+    """Translate a single .gitignore glob into a regular expression body"""
+    i, n = 0, len(pattern)
+    out = []
+    while i < n:
+        c = pattern[i]
+        if c == '*':
+            if pattern[i:i + 3] == '**/':
+                out.append('(?:.*/)?')
+                i += 3
+                continue
+            if pattern[i:i + 2] == '**':
+                out.append('.*')
+                i += 2
+                continue
+            out.append('[^/]*')
+        elif c == '?':
+            out.append('[^/]')
+        elif c == '[':
+            j = pattern.find(']', i + 1)
+            if j == -1:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1:j]
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                out.append(f"[{body}]")
+                i = j
+        elif c == '\\' and i + 1 < n:
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return ''.join(out)
+
+def compile_gitignore(lines):
+    """Compile .gitignore lines into (regex, negated, dir_only) rules"""
+    rules = []
+    for line in lines:
+        line = line.rstrip('\n').rstrip()
+        if not line or line.startswith('#'):
+            continue
+
+        negated = line.startswith('!')
+        if negated:
+            line = line[1:]
+        dir_only = line.endswith('/')
+        line = line.rstrip('/')
+        if not line:
+            continue
+
+        # A slash anywhere but the end anchors the pattern to the .gitignore directory
+        anchored = '/' in line
+        line = line.lstrip('/')
+        body = translate_gitignore_pattern(line)
+        if not anchored:
+            body = '(?:.*/)?' + body
+
+        try:
+            rules.append((re.compile(f"^{body}$"), negated, dir_only))
+        except re.error:
+            continue
+    return rules
+
+def load_gitignore(dir_path):
+    """Load and compile the .gitignore in a directory, if any"""
+    try:
+        with open(os.path.join(dir_path, '.gitignore'), 'r', encoding='utf-8', errors='ignore') as f:
+            return compile_gitignore(f)
+    except OSError:
+        return []
+
+def is_gitignored(rule_sets, rel_path, is_dir):
+    """Apply stacked (base, rules) sets to a path; the last matching rule wins"""
+    ignored = False
+    for base, rules in rule_sets:
+        if not rel_path.startswith(base):
+            continue
+        local_path = rel_path[len(base):]
+        for regex, negated, dir_only in rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(local_path):
+                ignored = not negated
+    return ignored
+
+def walk_project(root_path, ignored_dirs=IGNORED_DIRS, use_gitignore=True):
+    """Yield relative POSIX paths of all files, pruning ignored directories before descending"""
+    root_rules = load_gitignore(str(root_path)) if use_gitignore else []
+    stack = [(str(root_path), '', [('', root_rules)] if root_rules else [])]
+    while stack:
+        dir_path, rel_dir, rule_sets = stack.pop()
+        try:
+            with os.scandir(dir_path) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            continue
+
+        subdirs = []
+        for entry in entries:
+            rel_path = f"{rel_dir}{entry.name}"
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name in ignored_dirs or is_gitignored(rule_sets, rel_path, True):
+                        continue
+                    child_rules = rule_sets
+                    if use_gitignore:
+                        local_rules = load_gitignore(entry.path)
+                        if local_rules:
+                            child_rules = rule_sets + [(rel_path + '/', local_rules)]
+                    subdirs.append((entry.path, rel_path + '/', child_rules))
+                elif entry.is_file() and not is_gitignored(rule_sets, rel_path, False):
+                    yield rel_path
+            except OSError:
+                continue
+
+        # Reversed so directories are visited in sorted order
+        stack.extend(reversed(subdirs))
+
+def git_tracked_files(root_path, ignored_dirs=IGNORED_DIRS):
+    """List tracked and untracked-but-not-ignored files via the git index, or None outside git"""
+    try:
+        result = subprocess.run(
+            ['git', 'ls-files', '-z', '--cached', '--others', '--exclude-standard'],
+            cwd=str(root_path), capture_output=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+    files = set()
+    for raw in result.stdout.split(b'\0'):
+        if not raw:
+            continue
+        rel_path = raw.decode('utf-8', errors='surrogateescape')
+        if any(part in ignored_dirs for part in rel_path.split('/')[:-1]):
+            continue
+        files.add(rel_path)
+
+    # --cached repeats paths with merge conflicts and lists files deleted in the worktree
+    root = str(root_path)
+    return [p for p in sorted(files) if os.path.isfile(os.path.join(root, p))]
+
+def list_project_files(root_path, source='auto'):
+    """Enumerate project files from the git index or a .gitignore-aware walk
+
+    Returns (files, source_used) where source_used is 'git' or 'walk'.
+    """
+    if source in ('auto', 'git'):
+        files = git_tracked_files(root_path)
+        if files is not None:
+            return files, 'git'
+        if source == 'git':
+            print("   ⚠️  Not a git repository, falling back to directory walk")
+    return walk_project(root_path), 'walk'
+
+# Files slower than this get their own event in --trace-file output
+TRACE_SLOW_FILE_SECONDS = 0.001
+
+def new_profile():
+    """Create an empty profile for --profile"""
+    return {'origin': time.perf_counter(), 'phases': {}, 'directories': {}, 'events': []}
+
+def trace_event(profile, name, start, elapsed, tid=0, args=None):
+    """Build a Chrome trace-event 'complete' event relative to the profile origin"""
+    event = {
+        'name': name,
+        'ph': 'X',
+        'ts': round((start - profile['origin']) * 1e6),
+        'dur': round(elapsed * 1e6),
+        'pid': 1,
+        'tid': tid,
+    }
+    if args:
+        event['args'] = args
+    return event
+
+def directory_counters(profile, top):
+    """Per top-level directory counters, created on first use"""
+    return profile['directories'].setdefault(top, {
+        'files_visited': 0, 'files_read': 0, 'bytes_read': 0, 'read_seconds': 0.0
+    })
+
+def count_file_read(counters, rel_path, bytes_read, started, elapsed):
+    """Tally one file read into a phase's counters"""
+    if bytes_read:
+        counters['files_read'] += 1
+        counters['bytes_read'] += bytes_read
+    top, sep, _ = rel_path.partition('/')
+    counters['reads'].append((top if sep else '.', rel_path, bytes_read, started, elapsed))
+
+@contextmanager
+def profile_phase(profile, name, cache=None, files_visited=0):
+    """Time one analysis phase and record its counters when profiling
+
+    Yields a counters dict for iter_file_scans() to fill, or None when
+    profiling is off.
+    """
+    if profile is None:
+        yield None
+        return
+
+    counters = {'files_visited': files_visited, 'files_read': 0, 'bytes_read': 0, 'reads': []}
+    before = dict(cache['stats']) if cache is not None else None
+    start = time.perf_counter()
+    try:
+        yield counters
+    finally:
+        elapsed = time.perf_counter() - start
+        reads = counters.pop('reads')
+        phase = dict(counters, seconds=round(elapsed, 6))
+
+        if before is not None:
+            delta = {k: cache['stats'][k] - before[k] for k in before}
+            lookups = sum(delta.values())
+            if lookups:
+                phase['cache'] = dict(delta, hit_rate=round((delta['hits'] + delta['rehashed']) / lookups, 4))
+
+        for top, rel_path, bytes_read, started, read_elapsed in reads:
+            directory = directory_counters(profile, top)
+            if bytes_read:
+                directory['files_read'] += 1
+                directory['bytes_read'] += bytes_read
+            directory['read_seconds'] += read_elapsed
+            if read_elapsed >= TRACE_SLOW_FILE_SECONDS:
+                profile['events'].append(trace_event(
+                    profile, rel_path, started, read_elapsed, tid=1, args={'bytes': bytes_read, 'phase': name}
+                ))
+
+        profile['phases'][name] = phase
+        profile['events'].append(trace_event(profile, name, start, elapsed))
+
+def profile_summary(profile, index):
+    """Profile data as stored in .analysis-metadata.json"""
+    for top, count in index['dir_file_counts'].items():
+        directory_counters(profile, top)['files_visited'] = count
+    directories = {
+        top: dict(d, read_seconds=round(d['read_seconds'], 6))
+        for top, d in sorted(profile['directories'].items(), key=lambda kv: -kv[1]['read_seconds'])
+    }
+    return {
+        'total_seconds': round(time.perf_counter() - profile['origin'], 6),
+        'phases': profile['phases'],
+        'directories': directories,
+    }
+
+def write_chrome_trace(profile, trace_file):
+    """Write profile events in Chrome trace-event format (chrome://tracing, Perfetto)"""
+    trace_file = Path(trace_file)
+    trace_file.parent.mkdir(parents=True, exist_ok=True)
+    metadata = [
+        {'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': 0, 'args': {'name': 'phases'}},
+        {'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': 1, 'args': {'name': 'slow files'}},
+    ]
+    with open(trace_file, 'w') as f:
+        json.dump({'traceEvents': metadata + profile['events'], 'displayTimeUnit': 'ms'}, f)
+
+def git_head(root_path):
+    """Return the current HEAD commit, or None outside git"""
+    try:
+        result = subprocess.run(
+            ['git', 'rev-parse', '--verify', '-q', 'HEAD'],
+            cwd=str(root_path), capture_output=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.decode().strip() or None
+
+def git_dirty_paths(root_path, since):
+    """Paths that may differ from commit `since`: changed or deleted since then, or untracked
+
+    Diffing the commit directly against the working tree covers both
+    `since..HEAD` and uncommitted changes in a single call. Returns
+    (changed, deleted, untracked) sets of relative paths, or None if `since`
+    is unknown (e.g. a shallow CI clone).
+    """
+    try:
+        diff = subprocess.run(
+            ['git', 'diff', '--name-status', '-z', '--no-renames', '--relative', since, '--'],
+            cwd=str(root_path), capture_output=True, check=True
+        )
+        untracked = subprocess.run(
+            ['git', 'ls-files', '-z', '--others', '--exclude-standard'],
+            cwd=str(root_path), capture_output=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+    changed, deleted, untracked_paths = set(), set(), set()
+    fields = diff.stdout.split(b'\0')
+    for status, raw in zip(fields[0::2], fields[1::2]):
+        rel_path = raw.decode('utf-8', errors='surrogateescape')
+        if status.startswith(b'D'):
+            deleted.add(rel_path)
+        else:
+            changed.add(rel_path)
+
+    for raw in untracked.stdout.split(b'\0'):
+        if raw:
+            untracked_paths.add(raw.decode('utf-8', errors='surrogateescape'))
+
+    return changed, deleted, untracked_paths
+
+def record_output(outputs, path, changed):
+    """Note an output as written or unchanged; a file written by any step counts as written"""
+    if outputs is not None:
+        outputs[str(path)] = outputs.get(str(path), False) or changed
+
+def replace_if_changed(tmp_path, path, outputs=None):
+    """Rename a fully written temp file over `path`, or discard it if the contents match"""
+    try:
+        with open(path, 'rb') as old, open(tmp_path, 'rb') as new:
+            changed = hashlib.sha256(old.read()).digest() != hashlib.sha256(new.read()).digest()
+    except OSError:
+        changed = True
+    if changed:
+        os.replace(tmp_path, path)
+    else:
+        os.unlink(tmp_path)
+    record_output(outputs, path, changed)
+    return changed
+
+def temp_output_path(path):
+    """Sibling temp file, so the final rename stays on one filesystem"""
+    path = Path(path)
+    return path.with_name(f'.{path.name}.{os.getpid()}.tmp')
+
+def write_if_changed(path, content, outputs=None):
+    """Atomically write text to `path` (temp file + rename) unless it already holds it"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = temp_output_path(path)
+    try:
+        with open(tmp_path, 'w') as f:
+            f.write(content)
+        return replace_if_changed(tmp_path, path, outputs)
+    finally:
+        # Only left over when writing or comparing failed
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+def reuse_timestamp(previous, data, key):
+    """Carry `key` over from the previous record when nothing else changed
+
+    Keeps regenerated files byte-identical across runs that found nothing new.
+    """
+    if not isinstance(previous, dict) or key not in previous:
+        return data
+
+    def strip(d):
+        return {k: v for k, v in d.items() if k != key}
+
+    return dict(data, **{key: previous[key]}) if strip(previous) == strip(data) else data
+
+def stream_state(path):
+    """(digest of the records before the summary, summary data) of a JSONL output, or (None, None)"""
+    try:
+        with open(path, 'rb') as f:
+            previous = f.read()
+        head, _, last = previous.rstrip(b'\n').rpartition(b'\n')
+        record = json.loads(last)
+    except (OSError, ValueError):
+        return None, None
+    summary = record.get('data') if isinstance(record, dict) and record.get('phase') == 'summary' else None
+    return hashlib.sha256(head + b'\n' if head else b'').digest(), summary
+
+def load_analysis_metadata(metadata_file):
+    """Load .analysis-metadata.json, or an empty dict"""
+    try:
+        with open(metadata_file, 'r') as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+def update_analysis_metadata(metadata_file, updates, outputs=None):
+    """Merge keys into .analysis-metadata.json, preserving what other steps recorded"""
+    metadata = load_analysis_metadata(metadata_file)
+    metadata.update(updates)
+    write_if_changed(metadata_file, json.dumps(metadata, indent=2), outputs)
+
+# Bump whenever per-file phase results change shape or meaning
+CACHE_VERSION = 7
+
+def default_cache_path(output_file):
+    """Place the analysis cache next to the context file"""
+    output_file = Path(output_file)
+    return output_file.with_name(output_file.stem + '.cache.json')
+
+# Parsed JSON outputs by path, reused while the file on disk is unchanged; only
+# pays off in a long-lived process such as analysis-server.py
+_loaded_json = {}
+
+def file_stamp(path):
+    """Identity of a file's current contents for in-memory memoization, or None if missing"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+def load_json_file(path):
+    """Parse a JSON file we wrote, reusing the last parse while it is unchanged (raises OSError/ValueError)"""
+    stamp = file_stamp(path)
+    memo = _loaded_json.get(str(path))
+    if memo and stamp and memo[0] == stamp:
+        return memo[1]
+    with open(path, 'r') as f:
+        data = json.load(f)
+    _loaded_json[str(path)] = (stamp, data)
+    return data
+
+def remember_json_file(path, data):
+    """Record what was just written to `path` so load_json_file() need not parse it again"""
+    _loaded_json[str(path)] = (file_stamp(path), data)
+
+def load_analysis_cache(cache_path, policy=None):
+    """Load the per-file analysis cache, discarding it if unreadable, stale or read with another policy"""
+    policy = policy or DEFAULT_READ_POLICY
+    cache = {'version': CACHE_VERSION, 'files': {}, 'read_policy': policy}
+    try:
+        data = load_json_file(cache_path)
+        if (data.get('version') == CACHE_VERSION and isinstance(data.get('files'), dict)
+                and data.get('read_policy') == policy):
+            # Shallow copy: entries are shared with the memoized parse until writable_entry() copies them
+            cache['files'] = dict(data['files'])
+            cache['git_head'] = data.get('git_head')
+            cache['git_dirty'] = set(data.get('git_dirty', []))
+            cache['packages'] = data.get('packages', {})
+            cache['schema_model'] = data.get('schema_model')
+    except (OSError, ValueError):
+        pass
+    cache['loaded_count'] = len(cache['files'])
+    cache.setdefault('packages', {})
+    cache['packages_changed'] = False
+    cache.setdefault('schema_model', None)
+    cache['schema_model_changed'] = False
+
+    cache['path'] = str(cache_path)
+    cache['seen'] = set()
+    # Entries this run has copied and may change in place
+    cache['owned'] = set()
+    cache['stats'] = {'hits': 0, 'rehashed': 0, 'misses': 0}
+    # Set by use_git_diff(); paths outside it are trusted without a stat call
+    cache['git_changed'] = None
+    return cache
+
+def use_git_diff(cache, root_path, head, previous_head):
+    """Switch the cache to git-diff mode when it was written at `previous_head`
+
+    Returns (changed, deleted) counts, or None if git cannot tell what changed.
+    """
+    if not head or not previous_head or cache.get('git_head') != previous_head:
+        return None
+    dirty = git_dirty_paths(root_path, previous_head)
+    if dirty is None:
+        return None
+
+    # Reused when saving, if HEAD has not moved by then
+    cache['dirty_since'] = (previous_head, dirty)
+    changed, deleted, untracked = dirty
+    # Files that were uncommitted last time were cached from worktree content
+    cache['git_changed'] = changed | deleted | untracked | cache.get('git_dirty', set())
+    for rel_path in deleted:
+        cache['files'].pop(rel_path, None)
+    return len(changed), len(deleted)
+
+def save_analysis_cache(cache, root_path=None, head=None):
+    """Persist the cache, dropping entries for files no longer in the project
+
+    When `head` is given, the commit and the files that differed from it are
+    recorded so the next run can diff against it instead of stat'ing.
+    """
+    files = {p: entry for p, entry in cache['files'].items() if p in cache['seen']}
+    data = {'version': CACHE_VERSION, 'read_policy': cache['read_policy'], 'files': files}
+    if cache['packages']:
+        data['packages'] = cache['packages']
+    if cache['schema_model']:
+        data['schema_model'] = cache['schema_model']
+    if head:
+        previous_head, dirty = cache.get('dirty_since', (None, None))
+        if previous_head != head:
+            dirty = git_dirty_paths(root_path, head)
+        if dirty is not None:
+            data['git_head'] = head
+            data['git_dirty'] = sorted(dirty[0] | dirty[1] | dirty[2])
+
+    # Nothing scanned, rehashed or dropped and the same git state: the file already holds this
+    stats = cache['stats']
+    if (not stats['misses'] and not stats['rehashed'] and len(files) == cache['loaded_count']
+            and not cache['packages_changed'] and not cache['schema_model_changed']
+            and data.get('git_head') == cache.get('git_head')
+            and set(data.get('git_dirty', ())) == cache.get('git_dirty', set())
+            and os.path.exists(cache['path'])):
+        return
+
+    write_if_changed(cache['path'], json.dumps(data, separators=(',', ':')))
+    remember_json_file(cache['path'], data)
+
+def cache_lookup(root_path, rel_path, cache, phase):
+    """Look up a file's cached phase result without reading it
+
+    Returns (hit, result, stat, known_digest). On a miss, `stat` is the
+    file's current stat (None if it vanished) and `known_digest` is the
+    cached content hash that would still let the result be reused.
+    """
+    cache['seen'].add(rel_path)
+    entry = cache['files'].get(rel_path)
+    results = entry.get('results', {}) if entry else {}
+
+    # In git-diff mode, files git reports as untouched are trusted outright
+    git_changed = cache['git_changed']
+    if git_changed is not None and rel_path not in git_changed and phase in results:
+        return True, results[phase], None, None
+
+    try:
+        st = (root_path / rel_path).stat()
+    except OSError:
+        return False, None, None, None
+
+    if phase in results and entry.get('mtime_ns') == st.st_mtime_ns and entry.get('size') == st.st_size:
+        return True, results[phase], st, None
+
+    return False, None, st, entry.get('sha256') if phase in results else None
+
+# Bytes sniffed for NUL to detect binary files, and the block size for streamed reads
+BINARY_SNIFF_BYTES = 8192
+STREAM_CHUNK_BYTES = 1 << 20
+
+DEFAULT_READ_POLICY = {
+    'max_file_size': 1 << 20,
+    'large_files': 'skip',
+    'head_bytes': 64 << 10,
+}
+
+def stream_scan(f, rel_path, head, compute):
+    """Scan an open file in line-aligned chunks, hashing as it goes
+
+    compute() is called with the 1-based line number each chunk starts at
+    so it can report absolute lines. Returns (digest, results, bytes_read).
+    """
+    hasher = hashlib.sha256(head)
+    results = []
+    buf, line = head, 1
+    bytes_read = len(head)
+    while True:
+        chunk = f.read(STREAM_CHUNK_BYTES)
+        if chunk:
+            bytes_read += len(chunk)
+            hasher.update(chunk)
+            buf += chunk
+        cut = buf.rfind(b'\n') + 1
+        # Minified files may have no newline for a long stretch; flush anyway
+        if not chunk or len(buf) > 4 * STREAM_CHUNK_BYTES:
+            cut = len(buf)
+        if cut:
+            results.extend(compute(rel_path, buf[:cut], line) or [])
+            line += buf.count(b'\n', 0, cut)
+            buf = buf[cut:]
+        if not chunk:
+            return hasher.hexdigest(), results, bytes_read
+
+def read_and_scan(root_path, rel_path, known_digest, compute, policy=None):
+    """Read a file, hash it and run compute(rel_path, data) unless the hash is already known
+
+    Returns (digest, result, note, bytes_read); digest is None if the file
+    is unreadable, result is None if the hash matched `known_digest` or the
+    file was skipped, and note is 'binary', 'too_large' or 'truncated' when
+    the file was not scanned in full.
+    """
+    policy = policy or DEFAULT_READ_POLICY
+    try:
+        with open(root_path / rel_path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            large = size > policy['max_file_size']
+            if large and policy['large_files'] == 'skip':
+                return f"size:{size}", None, 'too_large', 0
+
+            head = f.read(BINARY_SNIFF_BYTES)
+            if b'\0' in head:
+                return f"size:{size}:" + hashlib.sha256(head).hexdigest(), None, 'binary', len(head)
+
+            if large and policy['large_files'] == 'stream':
+                digest, result, bytes_read = stream_scan(f, rel_path, head, compute)
+                return digest, (None if digest == known_digest else result), None, bytes_read
+
+            note = None
+            if large:
+                data = head + f.read(max(0, policy['head_bytes'] - len(head)))
+                note = 'truncated'
+            else:
+                data = head + f.read()
+    except OSError:
+        return None, None, None, 0
+
+    digest = hashlib.sha256(data).hexdigest()
+    if note:
+        digest = f"size:{size}:{digest}"
+    if digest == known_digest:
+        return digest, None, note, len(data)
+    return digest, compute(rel_path, data), note, len(data)
+
+def scan_file_batch(root_path, batch, compute, policy=None):
+    """Worker entry point: scan a chunk of (rel_path, known_digest) pairs in order
+
+    Each item is read_and_scan()'s result plus the scan's start time and duration.
+    """
+    scanned = []
+    for rel_path, known_digest in batch:
+        start = time.perf_counter()
+        item = read_and_scan(root_path, rel_path, known_digest, compute, policy)
+        scanned.append(item + (start, time.perf_counter() - start))
+    return scanned
+
+# Files looked up and dispatched together; bounds memory and lets results stream out early
+SCAN_WINDOW = 2048
+
+# Paths per scan window when a --max-seconds deadline is set, so a run stops close to it
+BUDGET_SCAN_WINDOW = 64
+
+def new_budget(max_seconds=None, max_files=None):
+    """Run budget for --max-seconds / --max-files, or None when unlimited"""
+    if max_seconds is None and max_files is None:
+        return None
+    return {
+        'max_seconds': max_seconds,
+        'max_files': max_files,
+        'deadline': time.perf_counter() + max_seconds if max_seconds is not None else None,
+        'files_read': 0,
+        'exhausted': None,
+        'phases': {},
+    }
+
+def charge_read(budget):
+    """Claim one file read from the budget; False once it is exhausted
+
+    Cached results cost nothing, so only reads are charged.
+    """
+    if budget is None:
+        return True
+    if budget['exhausted'] is None:
+        if budget['deadline'] is not None and time.perf_counter() >= budget['deadline']:
+            budget['exhausted'] = 'time'
+        elif budget['max_files'] is not None and budget['files_read'] >= budget['max_files']:
+            budget['exhausted'] = 'files'
+    if budget['exhausted']:
+        return False
+    budget['files_read'] += 1
+    return True
+
+def out_of_time(budget):
+    """Whether the --max-seconds deadline has passed; phases then stop, cached results included"""
+    if budget is None or budget['deadline'] is None:
+        return False
+    if budget['exhausted'] is None and time.perf_counter() >= budget['deadline']:
+        budget['exhausted'] = 'time'
+    return budget['exhausted'] == 'time'
+
+def budget_coverage(budget):
+    """The context's coverage section: each phase complete, or truncated with processed/total files"""
+    phases = {}
+    for phase in ANALYSIS_PHASES:
+        coverage = budget['phases'].get(phase, {})
+        status = 'truncated' if coverage.get('processed', 0) < coverage.get('total', 0) else 'complete'
+        phases[phase] = dict({'status': status}, **coverage)
+    return {
+        'max_seconds': budget['max_seconds'],
+        'max_files': budget['max_files'],
+        'exhausted': budget['exhausted'],
+        'files_read': budget['files_read'],
+        'phases': phases,
+    }
+
+def phase_coverage(budget, phase, total):
+    """Counter of how many of a phase's `total` files were processed, reported with the budget"""
+    coverage = {'processed': 0, 'total': total}
+    if budget is not None:
+        budget['phases'][phase] = coverage
+    return coverage
+
+def writable_entry(cache, rel_path):
+    """A file's cache entry that this run may change in place, or None
+
+    Loaded entries are shared with the memoized parse of the cache file, so
+    each is copied the first time a run changes it.
+    """
+    entry = cache['files'].get(rel_path)
+    if entry is not None and rel_path not in cache['owned']:
+        entry = dict(entry, results=dict(entry.get('results', {})))
+        cache['files'][rel_path] = entry
+        cache['owned'].add(rel_path)
+    return entry
+
+def forget_result(cache, rel_path, phase):
+    """Drop a cached phase result that could not be refreshed, so it is never trusted stale"""
+    entry = writable_entry(cache, rel_path)
+    if entry:
+        entry['results'].pop(phase, None)
+
+def iter_file_scans(root_path, rel_paths, cache, phase, compute, jobs=1, executor='thread', policy=None,
+                    counters=None, budget=None):
+    """Yield (rel_path, result, note) for a per-file phase, reusing cached results and fanning misses out to a pool
+
+    Results come out in the order of rel_paths (None for unreadable or
+    skipped files, with the reason in note), so output is identical whatever
+    the job count or executor. Paths are processed in windows so results are
+    available before the scan ends. Reads are tallied into `counters` from
+    profile_phase() when given. Files the `budget` has no reads left for
+    come out as None and are counted as not processed.
+    """
+    coverage = phase_coverage(budget, phase, len(rel_paths))
+    window_size = SCAN_WINDOW if budget is None or budget['deadline'] is None else BUDGET_SCAN_WINDOW
+    pool = None
+    if jobs > 1:
+        pool_class = ProcessPoolExecutor if executor == 'process' else ThreadPoolExecutor
+        pool = pool_class(max_workers=jobs)
+
+    try:
+        for start in range(0, len(rel_paths), window_size):
+            if out_of_time(budget):
+                break
+            window = rel_paths[start:start + window_size]
+            results = [None] * len(window)
+            notes = [None] * len(window)
+            pending = []
+            denied = 0
+            for i, rel_path in enumerate(window):
+                if cache is None:
+                    if charge_read(budget):
+                        pending.append((i, rel_path, None, None))
+                    else:
+                        denied += 1
+                    continue
+                hit, result, st, known_digest = cache_lookup(root_path, rel_path, cache, phase)
+                if hit:
+                    cache['stats']['hits'] += 1
+                    results[i] = result
+                    notes[i] = cache['files'][rel_path].get('note')
+                elif st is not None:
+                    if charge_read(budget):
+                        pending.append((i, rel_path, st, known_digest))
+                    else:
+                        forget_result(cache, rel_path, phase)
+                        denied += 1
+            coverage['processed'] += len(window) - denied
+
+            batch = [(rel_path, known_digest) for _, rel_path, _, known_digest in pending]
+            if pool is not None and len(batch) > 1:
+                # Several chunks per worker keeps the pool busy when file sizes are uneven
+                chunk_size = max(1, min(256, len(batch) // (jobs * 4)))
+                chunks = [batch[i:i + chunk_size] for i in range(0, len(batch), chunk_size)]
+                futures = [pool.submit(scan_file_batch, root_path, chunk, compute, policy) for chunk in chunks]
+                scanned = [item for future in futures for item in future.result()]
+            else:
+                scanned = scan_file_batch(root_path, batch, compute, policy)
+
+            for (i, rel_path, st, known_digest), item in zip(pending, scanned):
+                digest, result, note, bytes_read, started, elapsed = item
+                if counters is not None:
+                    count_file_read(counters, rel_path, bytes_read, started, elapsed)
+                if digest is None:
+                    continue
+                notes[i] = note
+                if cache is None:
+                    results[i] = result
+                    continue
+
+                entry = writable_entry(cache, rel_path)
+                if digest == known_digest:
+                    cache['stats']['rehashed'] += 1
+                    result = entry['results'][phase]
+                else:
+                    cache['stats']['misses'] += 1
+                    if not entry or entry.get('sha256') != digest:
+                        entry = {'results': {}}
+                        cache['files'][rel_path] = entry
+                    entry['results'][phase] = result
+                entry.update(mtime_ns=st.st_mtime_ns, size=st.st_size, sha256=digest)
+                if note:
+                    entry['note'] = note
+                else:
+                    entry.pop('note', None)
+                results[i] = result
+
+            for rel_path, result, note in zip(window, results, notes):
+                yield rel_path, result, note
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+def hash_file(path):
+    """sha256 of a file read in blocks"""
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(STREAM_CHUNK_BYTES), b''):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+def cached_parse(root_path, rel_path, cache, phase, parse, budget=None):
+    """Parse a whole file through the per-file cache: unchanged stat or content hash skips parsing
+
+    `parse` takes the file's path. Returns (result, sha256), or (None, None)
+    if the file cannot be read or the budget has no reads left.
+    """
+    hit, result, st, known_digest = cache_lookup(root_path, rel_path, cache, phase)
+    if hit:
+        cache['stats']['hits'] += 1
+        return result, cache['files'][rel_path].get('sha256')
+    if st is None:
+        return None, None
+    if not charge_read(budget):
+        forget_result(cache, rel_path, phase)
+        return None, None
+
+    full_path = root_path / rel_path
+    try:
+        digest = hash_file(full_path)
+    except OSError:
+        return None, None
+    entry = writable_entry(cache, rel_path)
+    if digest == known_digest:
+        cache['stats']['rehashed'] += 1
+        result = entry['results'][phase]
+    else:
+        cache['stats']['misses'] += 1
+        result = parse(full_path)
+        if not entry or entry.get('sha256') != digest:
+            entry = {'results': {}}
+            cache['files'][rel_path] = entry
+        entry['results'][phase] = result
+    entry.update(mtime_ns=st.st_mtime_ns, size=st.st_size, sha256=digest)
+    return result, digest
+
+def is_schema_file(rel_path):
+    """Check whether a relative path looks like a database schema file"""
+    parts = rel_path.split('/')
+    name = parts[-1]
+    if name in SCHEMA_FILE_NAMES:
+        return True
+    return len(parts) > 1 and parts[-2] in SCHEMA_DIRS and name.endswith('.sql')
+
+def is_doc_file(rel_path):
+    """Check whether a relative path is project documentation"""
+    if rel_path in DOC_FILES:
+        return True
+    return rel_path.startswith('docs/') and rel_path.endswith('.md')
+
+def load_vendored_attributes(root_path):
+    """Compile the root .gitattributes patterns that set or unset linguist-vendored/-generated
+
+    Returns (regex, vendored, attribute) rules; like git, directory-only
+    patterns never match.
+    """
+    rules = []
+    try:
+        with open(os.path.join(str(root_path), '.gitattributes'), 'r', encoding='utf-8', errors='ignore') as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return rules
+
+    for line in lines:
+        fields = line.split()
+        if not fields or fields[0].startswith('#'):
+            continue
+        for attribute in fields[1:]:
+            name, _, value = attribute.lstrip('-!').partition('=')
+            if name not in VENDOR_ATTRIBUTES:
+                continue
+            vendored = not attribute.startswith(('-', '!')) and value != 'false'
+            for regex, _, dir_only in compile_gitignore([fields[0]]):
+                if not dir_only:
+                    rules.append((regex, vendored, name))
+    return rules
+
+def directory_signatures(files):
+    """Hash each directory's names bottom-up, so directories with identical layouts share a signature
+
+    Returns ({dir: signature}, {dir: files in subtree}).
+    """
+    entries = defaultdict(list)
+    file_counts = defaultdict(int)
+    for rel_path in files:
+        parent, _, name = rel_path.rpartition('/')
+        entries[parent].append((name, ''))
+        while parent:
+            if parent not in file_counts:
+                grandparent, _, dir_name = parent.rpartition('/')
+                entries[grandparent].append((dir_name, parent))
+            file_counts[parent] += 1
+            parent = parent.rpartition('/')[0]
+
+    signatures = {}
+    for directory in sorted(file_counts, key=lambda d: d.count('/'), reverse=True):
+        hasher = hashlib.sha1()
+        for name, child in sorted(entries[directory]):
+            hasher.update(f"{name}\0{signatures[child] if child else ''}\0".encode('utf-8', errors='surrogateescape'))
+        signatures[directory] = hasher.hexdigest()
+    return signatures, file_counts
+
+def directory_fingerprint(root_path, directory, rel_paths):
+    """Names and sizes of every file below `directory`, plus head/tail hashes of an evenly spaced sample
+
+    Returns None when a file cannot be read.
+    """
+    hasher = hashlib.sha1()
+    step = max(1, len(rel_paths) // DUPLICATE_SAMPLE_FILES)
+    prefix = len(directory) + 1
+    try:
+        for i, rel_path in enumerate(rel_paths):
+            path = os.path.join(str(root_path), rel_path)
+            size = os.path.getsize(path)
+            hasher.update(f"{rel_path[prefix:]}\0{size}\0".encode('utf-8', errors='surrogateescape'))
+            if i % step == 0:
+                with open(path, 'rb') as f:
+                    hasher.update(f.read(DUPLICATE_SAMPLE_BYTES))
+                    if size > 2 * DUPLICATE_SAMPLE_BYTES:
+                        f.seek(-DUPLICATE_SAMPLE_BYTES, os.SEEK_END)
+                        hasher.update(f.read())
+    except OSError:
+        return None
+    return hasher.hexdigest()
+
+def skipped_dir_of(skip_dirs, rel_path):
+    """The skipped directory containing `rel_path`, or None"""
+    parent = rel_path.rpartition('/')[0]
+    while parent:
+        if parent in skip_dirs:
+            return parent
+        parent = parent.rpartition('/')[0]
+    return None
+
+def find_redundant_dirs(root_path, files):
+    """Find vendored directories and duplicated subtrees whose files need not be analyzed
+
+    Vendored directories are recognized by name, by marker files and by
+    linguist-vendored/-generated in the root .gitattributes. Duplicates are
+    found by comparing directory layouts first, then names, sizes and
+    sampled content of the candidates; the shallowest copy is kept. Returns
+    report entries, outermost first.
+    """
+    files = sorted(files)
+    signatures, file_counts = directory_signatures(files)
+    found = {}
+
+    attribute_rules = load_vendored_attributes(root_path)
+    attributed = defaultdict(int)
+    attribute_names = {}
+    for rel_path in files:
+        parent, _, name = rel_path.rpartition('/')
+        if name in VENDOR_MARKER_FILES and parent:
+            found.setdefault(parent, {'reason': 'vendored', 'marker': name})
+        if attribute_rules:
+            match = None
+            for regex, vendored, attribute in attribute_rules:
+                if regex.match(rel_path):
+                    match = attribute if vendored else None
+            while match and parent:
+                attributed[parent] += 1
+                attribute_names.setdefault(parent, match)
+                parent = parent.rpartition('/')[0]
+
+    for directory in file_counts:
+        name = directory.rpartition('/')[2]
+        if name in VENDOR_DIR_NAMES:
+            found.setdefault(directory, {'reason': 'vendored', 'marker': name})
+        elif attributed.get(directory) == file_counts[directory]:
+            found.setdefault(directory, {'reason': 'vendored', 'marker': f".gitattributes {attribute_names[directory]}"})
+
+    skip_dirs = set()
+    for directory in sorted(found, key=lambda d: (d.count('/'), d)):
+        if skipped_dir_of(skip_dirs, directory) is None:
+            skip_dirs.add(directory)
+
+    # Same layout is cheap to find; only those candidates are stat'ed and sampled
+    layouts = defaultdict(list)
+    for directory, signature in signatures.items():
+        if file_counts[directory] >= DUPLICATE_MIN_FILES:
+            layouts[signature].append(directory)
+    groups = sorted(
+        (sorted(group, key=lambda d: (d.count('/'), d)) for group in layouts.values() if len(group) > 1),
+        key=lambda group: (group[0].count('/'), group[0])
+    )
+    for group in groups:
+        group = [d for d in group if d not in skip_dirs and skipped_dir_of(skip_dirs, d) is None]
+        if len(group) < 2:
+            continue
+        copies = defaultdict(list)
+        for directory in group:
+            start = bisect.bisect_left(files, directory + '/')
+            fingerprint = directory_fingerprint(root_path, directory, files[start:start + file_counts[directory]])
+            if fingerprint is not None:
+                copies[fingerprint].append(directory)
+        for kept, *duplicates in copies.values():
+            for directory in duplicates:
+                found[directory] = {'reason': 'duplicate', 'duplicate_of': kept}
+                skip_dirs.add(directory)
+
+    return [
+        dict({'path': directory}, **found[directory], files=file_counts[directory])
+        for directory in sorted(skip_dirs, key=lambda d: (d.count('/'), d))
+        if skipped_dir_of(skip_dirs, directory) is None
+    ]
+
+def scan_project_tree(root_path, files=None, skip_dirs=None):
+    """Enumerate the project once and dispatch each file to the analysis phases that need it
+
+    Files below `skip_dirs` are counted but not dispatched.
+    """
+    if files is None:
+        files = walk_project(root_path)
+
+    index = {
+        'top_dirs': set(),
+        'file_count': 0,
+        'dir_file_counts': defaultdict(int),
+        'source_files': [],
+        'schema_files': [],
+        'doc_files': [],
+        'code_files': [],
+        # Nested directories with their own manifest (sub-projects for --monorepo)
+        'package_roots': set(),
+    }
+
+    for rel_path in files:
+        index['file_count'] += 1
+        top, sep, _ = rel_path.partition('/')
+        if sep:
+            index['top_dirs'].add(top)
+        index['dir_file_counts'][top if sep else '.'] += 1
+        if skip_dirs and skipped_dir_of(skip_dirs, rel_path) is not None:
+            continue
+        if sep:
+            parent, _, name = rel_path.rpartition('/')
+            if name in PACKAGE_MANIFESTS:
+                index['package_roots'].add(parent)
+        if rel_path.endswith(SOURCE_EXTENSIONS):
+            index['source_files'].append(rel_path)
+        if is_schema_file(rel_path):
+            index['schema_files'].append(rel_path)
+        if is_doc_file(rel_path):
+            index['doc_files'].append(rel_path)
+        if code_language(rel_path):
+            index['code_files'].append(rel_path)
+
+    return index
+
+def prioritize_paths(paths, structure):
+    """Order paths so source, config, doc and test directories (in that order) come first
+
+    Top-level files rank with the source directories; the sort is stable, so
+    the original order holds within each rank.
+    """
+    ranks = {'': 0}
+    for rank, category in enumerate(('source_dirs', 'config_dirs', 'doc_dirs', 'test_dirs')):
+        for directory in structure.get(category, []):
+            ranks.setdefault(directory, rank)
+    return sorted(paths, key=lambda p: ranks.get(p.partition('/')[0] if '/' in p else '', 4))
+
+def analyze_directory_structure(root_path, index=None):
     """Analyze project structure"""
+    if index is None:
+        index = scan_project_tree(root_path)
+
     structure = {
         'source_dirs': [],
         'test_dirs': [],
@@ -51,119 +1205,1723 @@ def analyze_directory_structure(root_path):
 
     for category, patterns in common_patterns.items():
         for pattern in patterns:
-            path = root_path / pattern
-            if path.exists() and path.is_dir():
-                structure[category].append(str(path.relative_to(root_path)))
+            if pattern in index['top_dirs']:
+                structure[category].append(pattern)
 
     return structure
 
-def find_api_endpoints(root_path):
-    """Find API endpoints by scanning common patterns"""
-    endpoints = []
+def code_language(rel_path):
+    """Language a file counts toward in code statistics, or None"""
+    dot = rel_path.rfind('.')
+    return LANGUAGE_BY_EXTENSION.get(rel_path[dot:].lower()) if dot > rel_path.rfind('/') + 1 else None
 
-    # Common route patterns to search for
-    patterns = [
-        r'@app\.route\(["\']([^"\']+)',           # Flask
-        r'@router\.(get|post|put|delete)\(["\']([^"\']+)',  # FastAPI
-        r'app\.(get|post|put|delete)\(["\']([^"\']+)',      # Express
-        r'Route::(\w+)\(["\']([^"\']+)',          # Laravel
-    ]
+def count_lines(data, language):
+    """(lines, blank, comment) of a file's bytes, counted without decoding them
+
+    Comment lines are an estimate: lines starting with the language's
+    comment prefix, so the inside of block comments is only counted for
+    C-style `*` continuation lines.
+    """
+    if not data:
+        return 0, 0, 0
+    ends_with_newline = data[-1:] == b'\n'
+    lines = data.count(b'\n') + (not ends_with_newline)
+    # The empty "line" after a final newline is not a blank line
+    blank = len(BLANK_LINE.findall(data)) - ends_with_newline
+    pattern = COMMENT_LINE_PATTERNS.get(language)
+    comment = len(pattern.findall(data)) if pattern else 0
+    return lines, blank, comment
 
-    # Scan relevant files
-    for ext in ['.py', '.js', '.ts', '.php', '.rb']:
-        for file_path in root_path.rglob(f'*{ext}'):
-            if 'node_modules' in str(file_path) or '.git' in str(file_path):
+def file_code_stats(path, language):
+    """([bytes, lines, blank, comment], sha256) of one file, from a single pass of large-block reads
+
+    Blocks are counted up to their last newline; the partial line is carried
+    into the next block (only its head for very long lines). Binary files
+    only count their bytes.
+    """
+    hasher = hashlib.sha256()
+    size, totals, binary, tail = 0, [0, 0, 0], None, b''
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(STREAM_CHUNK_BYTES), b''):
+            hasher.update(block)
+            size += len(block)
+            if binary is None:
+                binary = b'\0' in block[:BINARY_SNIFF_BYTES]
+            if binary:
+                continue
+            cut = block.rfind(b'\n') + 1
+            if not cut:
+                tail = (tail + block)[:BINARY_SNIFF_BYTES]
                 continue
+            counts = count_lines(tail + block[:cut], language)
+            totals = [total + count for total, count in zip(totals, counts)]
+            tail = block[cut:]
+    if tail and not binary:
+        counts = count_lines(tail, language)
+        totals = [total + count for total, count in zip(totals, counts)]
+    return [size] + totals, hasher.hexdigest()
 
+def iter_code_stats(root_path, rel_paths, cache=None, counters=None, budget=None):
+    """Yield (rel_path, [bytes, lines, blank, comment]) for code files, reusing cached counts"""
+    root_path = Path(root_path)
+    coverage = phase_coverage(budget, 'code_stats', len(rel_paths))
+    for rel_path in rel_paths:
+        if out_of_time(budget):
+            break
+        language = code_language(rel_path)
+        if cache is None:
+            if not charge_read(budget):
+                continue
+            coverage['processed'] += 1
             try:
-                content = file_path.read_text(encoding='utf-8', errors='ignore')
-                # Simple pattern matching (can be enhanced with AST parsing)
-                if 'route' in content.lower() or 'endpoint' in content.lower():
-                    endpoints.append({
-                        'file': str(file_path.relative_to(root_path)),
-                        'type': 'api_route'
-                    })
-            except Exception:
+                yield rel_path, file_code_stats(root_path / rel_path, language)[0]
+            except (OSError, ValueError):
+                pass
+            continue
+
+        hit, result, st, _ = cache_lookup(root_path, rel_path, cache, 'code_stats')
+        if hit:
+            cache['stats']['hits'] += 1
+            coverage['processed'] += 1
+            yield rel_path, result
+            continue
+        if st is not None and not charge_read(budget):
+            forget_result(cache, rel_path, 'code_stats')
+            continue
+        coverage['processed'] += 1
+        if st is None:
+            continue
+        started = time.perf_counter()
+        try:
+            result, digest = file_code_stats(root_path / rel_path, language)
+        except (OSError, ValueError):
+            continue
+        if counters is not None:
+            count_file_read(counters, rel_path, result[0], started, time.perf_counter() - started)
+        cache['stats']['misses'] += 1
+        # Other phases' results stay valid only while the content is the same
+        entry = writable_entry(cache, rel_path)
+        if not entry or entry.get('sha256') != digest:
+            entry = {'results': {}}
+            cache['files'][rel_path] = entry
+        entry['results']['code_stats'] = result
+        entry.update(mtime_ns=st.st_mtime_ns, size=st.st_size, sha256=digest)
+        yield rel_path, result
+
+def summarize_code_stats(file_stats):
+    """Totals per language and per top-level directory from {rel_path: [bytes, lines, blank, comment]}"""
+    # Summed per (language, top-level directory) first: far fewer updates than per bucket
+    groups = defaultdict(lambda: [0, 0, 0, 0, 0])
+    for rel_path, (size, lines, blank, comment) in file_stats.items():
+        top, sep, _ = rel_path.partition('/')
+        group = groups[code_language(rel_path), top if sep else '.']
+        group[0] += 1
+        group[1] += size
+        group[2] += lines
+        group[3] += blank
+        group[4] += comment
+
+    def bucket():
+        return {'files': 0, 'bytes': 0, 'lines': 0, 'code': 0, 'blank': 0, 'comment': 0}
+
+    languages, directories, total = defaultdict(bucket), defaultdict(bucket), bucket()
+    for (language, top), (files, size, lines, blank, comment) in groups.items():
+        for counts in (languages[language], directories[top], total):
+            counts['files'] += files
+            counts['bytes'] += size
+            counts['lines'] += lines
+            counts['code'] += max(lines - blank - comment, 0)
+            counts['blank'] += blank
+            counts['comment'] += comment
+
+    def by_size(buckets):
+        return dict(sorted(buckets.items(), key=lambda item: (-item[1]['code'], item[0])))
+
+    return {'total': total, 'languages': by_size(languages), 'directories': by_size(directories)}
+
+# Per-language route extraction: literal prefilter tokens and one combined regex.
+# Every alternative captures `verb` (or a NestJS `deco`) and the route `path`.
+ROUTE_PATTERNS = {
+    'python': (
+        # Verbs only with a route path (or a wrapped argument list) after them: a bare .get( is every dict lookup
+        (b'.route(', b'.add_url_rule(', b'.api_route(', b'urlpatterns') + tuple(
+            f'.{verb}({opener}'.encode() for verb in ('get', 'post', 'put', 'delete', 'patch')
+            for opener in ('"/', "'/", '\n', '\r\n')
+        ),
+        re.compile(
+            rb'(?:@[ \t]*[A-Za-z_][\w.]*\.(?P<verb>route|api_route|get|post|put|delete|patch|options|head)'
+            rb'|[A-Za-z_][\w.]*\.(?P<rule>add_url_rule))'
+            rb'\(\s*[rbuf]?(?P<q>[\'"])(?P<path>[^\'"\r\n]*)(?P=q)(?P<rest>[^\r\n]*)'
+        ),
+    ),
+    'javascript': (
+        (b'.get(', b'.post(', b'.put(', b'.delete(', b'.patch(', b'.all(', b'@Get', b'@Post', b'@Put',
+         b'@Delete', b'@Patch'),
+        re.compile(
+            rb'(?<![\w$])(?P<recv>[A-Za-z_$][\w$]*)\.(?P<verb>get|post|put|delete|patch|all|options|head)'
+            rb'\(\s*(?P<q>[\'"`])(?P<path>/[^\'"`\r\n]*)(?P=q)'
+            rb'|@(?P<deco>Get|Post|Put|Delete|Patch|All|Options|Head)'
+            rb'\(\s*(?:(?P<dq>[\'"`])(?P<dpath>[^\'"`\r\n]*)(?P=dq))?\s*\)'
+            rb'|@(?P<controller>Controller)\(\s*(?:\{[^}]*?\bpath\s*:\s*)?'
+            rb'(?:(?P<cq>[\'"`])(?P<cpath>[^\'"`\r\n]*)(?P=cq))?'
+        ),
+    ),
+    'php': (
+        (b'Route::', b'->get(', b'->post(', b'->put(', b'->delete(', b'->patch('),
+        re.compile(
+            rb'(?:Route::|\$\w+->)(?P<verb>get|post|put|patch|delete|options|any|match)'
+            rb'\(\s*(?:\[(?P<methods>[^\]]*)\]\s*,\s*)?(?P<q>[\'"])(?P<path>[^\'"\r\n]*)(?P=q)'
+        ),
+    ),
+    'ruby': (
+        (b'get ', b'post ', b'put ', b'patch ', b'delete ', b'match ', b'resources', b'resource '),
+        re.compile(
+            rb'^[ \t]*(?:(?P<verb>get|post|put|patch|delete|match)[ \t(]+(?P<q>[\'"])(?P<path>[^\'"\r\n]*)(?P=q)'
+            rb'|(?P<res>resources?)[ \t(]+:(?P<name>\w+))',
+            re.MULTILINE
+        ),
+    ),
+}
+
+ROUTE_LANGUAGES = {
+    '.py': 'python',
+    '.js': 'javascript',
+    '.ts': 'javascript',
+    '.php': 'php',
+    '.rb': 'ruby',
+}
+
+QUOTED_WORD = re.compile(rb'[\'"](\w+)[\'"]')
+
+# Express receivers taken as routers, plus any name the file assigns from express() or Router()
+JS_ROUTER_NAMES = {b'app', b'router', b'server'}
+JS_ROUTER_ASSIGNMENT = re.compile(
+    rb'(?<![\w$.])([A-Za-z_$][\w$]*)\s*=\s*(?:new\s+)?(?:express|(?:express\s*\.\s*)?Router)\s*\('
+)
+# Strings are matched only so that comment markers inside them are not mistaken for comments
+JS_COMMENT_OR_STRING = re.compile(
+    rb'//[^\n]*|/\*.*?(?:\*/|$)|\'(?:\\.|[^\'\\\n])*\'|"(?:\\.|[^"\\\n])*"|`(?:\\.|[^`\\])*`', re.S
+)
+
+def js_comment_spans(data):
+    """(starts, ends) of the // and /* */ comments in JavaScript or TypeScript source"""
+    starts, ends = [], []
+    for match in JS_COMMENT_OR_STRING.finditer(data):
+        if data.startswith(b'/', match.start()):
+            starts.append(match.start())
+            ends.append(match.end())
+    return starts, ends
+
+def route_framework(language, match, rel_path):
+    """Name the framework a route match belongs to"""
+    if language == 'python':
+        return 'fastapi' if match.group('verb') not in (None, b'route') else 'flask'
+    if language == 'javascript':
+        return 'nestjs' if match.group('deco') else 'express'
+    if language == 'php':
+        return 'laravel' if match.group(0).startswith(b'Route::') else 'slim'
+    return 'rails' if rel_path.endswith('routes.rb') else 'sinatra'
+
+def route_methods(language, match):
+    """HTTP methods declared by a route match"""
+    if language == 'python':
+        methods = QUOTED_WORD.findall(match.group('rest')) if b'methods' in match.group('rest') else []
+        verb = match.group('verb')
+        if verb in (None, b'route', b'api_route'):
+            return [m.decode().upper() for m in methods] or ['GET']
+        return [verb.decode().upper()]
+    if language == 'javascript':
+        return [(match.group('verb') or match.group('deco')).decode().upper()]
+    if language == 'php' and match.group('methods'):
+        return [m.decode().upper() for m in QUOTED_WORD.findall(match.group('methods'))] or ['ANY']
+    if language == 'ruby' and match.group('res'):
+        return [match.group('res').decode().upper()]
+    return [match.group('verb').decode().upper()]
+
+# Python route objects and the framework their constructor implies
+PYTHON_ROUTE_CONSTRUCTORS = {
+    'Flask': ('flask', None),
+    'Blueprint': ('flask', 'url_prefix'),
+    'FastAPI': ('fastapi', None),
+    'APIRouter': ('fastapi', 'prefix'),
+}
+PYTHON_ROUTE_VERBS = {'route', 'api_route', 'get', 'post', 'put', 'delete', 'patch', 'options', 'head'}
+
+def join_route(*parts):
+    """Join route prefixes and a path with single slashes"""
+    path = ''
+    for part in parts:
+        if not part:
+            continue
+        path = path.rstrip('/') + '/' + part.lstrip('/') if path else part
+    return path
+
+def literal_str(node):
+    """Return a string literal's value, or None"""
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    return None
+
+def call_name(node):
+    """Return (object, attribute) for `obj.attr(...)` or (None, name) for `name(...)`"""
+    func = node.func
+    if isinstance(func, ast.Attribute):
+        return (func.value.id if isinstance(func.value, ast.Name) else None), func.attr
+    if isinstance(func, ast.Name):
+        return None, func.id
+    return None, None
+
+def call_keyword(node, name):
+    """Return a keyword argument's value node from a call"""
+    for keyword in node.keywords:
+        if keyword.arg == name:
+            return keyword.value
+    return None
+
+def django_regex_path(pattern):
+    """Readable path for a re_path()/url() regex: anchors dropped, named groups shown as <name>"""
+    path = re.sub(r'\(\?P<(\w+)>[^)]*\)', r'<\1>', pattern.lstrip('^').rstrip('$'))
+    return '/' + path.lstrip('/')
+
+def call_methods(node):
+    """HTTP methods from a `methods=[...]` keyword"""
+    value = call_keyword(node, 'methods')
+    if isinstance(value, (ast.List, ast.Tuple, ast.Set)):
+        return [m.upper() for m in (literal_str(e) for e in value.elts) if m]
+    return []
+
+def extract_python_routes(rel_path, data):
+    """Extract Flask, FastAPI and Django routes from a Python module's AST
+
+    Resolves Blueprint/APIRouter prefixes and register_blueprint/include_router
+    mounts declared in the same module. Results are cached per file, so mounts
+    are not followed across modules: a router imported from elsewhere keeps its
+    own prefix only, and Django include() entries are not reported since their
+    routes live in the included URLconf. Returns None if the file does not parse.
+    """
+    try:
+        tree = ast.parse(data)
+    except (SyntaxError, ValueError):
+        return None
+
+    frameworks, prefixes, mounts = {}, {}, {}
+    routes = []
+
+    # First pass: route objects, their prefixes and where they are mounted
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Assign) and isinstance(node.value, ast.Call):
+            _, ctor = call_name(node.value)
+            if ctor in PYTHON_ROUTE_CONSTRUCTORS:
+                framework, prefix_kw = PYTHON_ROUTE_CONSTRUCTORS[ctor]
+                prefix = literal_str(call_keyword(node.value, prefix_kw)) if prefix_kw else None
+                for target in node.targets:
+                    if isinstance(target, ast.Name):
+                        frameworks[target.id] = framework
+                        prefixes[target.id] = prefix or ''
+        elif isinstance(node, ast.Call):
+            _, attr = call_name(node)
+            if attr in ('register_blueprint', 'include_router') and node.args and isinstance(node.args[0], ast.Name):
+                kw = 'url_prefix' if attr == 'register_blueprint' else 'prefix'
+                prefix = literal_str(call_keyword(node, kw))
+                if prefix is not None:
+                    mounts[node.args[0].id] = prefix
+
+    def add(method, obj, path, line, framework):
+        # Flask's register_blueprint(url_prefix=...) replaces the blueprint's own prefix
+        if obj in mounts and frameworks.get(obj) == 'flask':
+            full_path = join_route(mounts[obj], path)
+        else:
+            full_path = join_route(mounts.get(obj, ''), prefixes.get(obj, ''), path)
+        routes.append({
+            'method': method,
+            'path': full_path,
+            'file': rel_path,
+            'line': line,
+            'framework': frameworks.get(obj, framework),
+            'type': 'api_route'
+        })
+
+    # Second pass: decorators, add_url_rule calls and Django urlpatterns
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            for deco in node.decorator_list:
+                if not isinstance(deco, ast.Call) or not deco.args:
+                    continue
+                obj, verb = call_name(deco)
+                path = literal_str(deco.args[0])
+                if obj is None or verb not in PYTHON_ROUTE_VERBS or path is None:
+                    continue
+                if verb in ('route', 'api_route'):
+                    methods = call_methods(deco) or ['GET']
+                    framework = 'flask' if verb == 'route' else 'fastapi'
+                else:
+                    methods = [verb.upper()]
+                    framework = 'fastapi'
+                for method in methods:
+                    add(method, obj, path, deco.lineno, framework)
+        elif isinstance(node, ast.Call):
+            obj, attr = call_name(node)
+            if attr == 'add_url_rule' and obj and node.args and literal_str(node.args[0]) is not None:
+                for method in call_methods(node) or ['GET']:
+                    add(method, obj, literal_str(node.args[0]), node.lineno, 'flask')
+        elif isinstance(node, (ast.Assign, ast.AugAssign)):
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            if not any(isinstance(t, ast.Name) and t.id == 'urlpatterns' for t in targets):
+                continue
+            if not isinstance(node.value, (ast.List, ast.Tuple)):
+                continue
+            for elt in node.value.elts:
+                if not isinstance(elt, ast.Call) or not elt.args:
+                    continue
+                _, func = call_name(elt)
+                route = literal_str(elt.args[0])
+                if func not in ('path', 're_path', 'url') or route is None:
+                    continue
+                view = elt.args[1] if len(elt.args) > 1 else call_keyword(elt, 'view')
+                if isinstance(view, ast.Call) and call_name(view)[1] == 'include':
+                    continue
+                routes.append({
+                    'method': 'ANY',
+                    'path': '/' + route.lstrip('/') if func == 'path' else django_regex_path(route),
+                    'file': rel_path,
+                    'line': elt.lineno,
+                    'framework': 'django',
+                    'type': 'api_route'
+                })
+
+    routes.sort(key=lambda r: r['line'])
+    return routes
+
+def scan_route_content(rel_path, data, first_line=None):
+    """Extract (method, path, file, line) route records from one source file's raw bytes
+
+    When first_line is given, data is a chunk of a streamed file starting at
+    that line; chunks are matched with the regex only, since they cannot be
+    parsed on their own.
+    """
+    language = ROUTE_LANGUAGES.get(os.path.splitext(rel_path)[1])
+    if language is None:
+        return []
+    prefilter, pattern = ROUTE_PATTERNS[language]
+    if not any(token in data for token in prefilter):
+        return []
+
+    if language == 'python' and first_line is None:
+        routes = extract_python_routes(rel_path, data)
+        if routes is not None:
+            return routes
+
+    if language == 'javascript':
+        routers = JS_ROUTER_NAMES.union(JS_ROUTER_ASSIGNMENT.findall(data))
+        comment_starts, comment_ends = js_comment_spans(data)
+        controller = b''
+
+    endpoints = []
+    line, last_pos = first_line or 1, 0
+    for match in pattern.finditer(data):
+        line += data.count(b'\n', last_pos, match.start())
+        last_pos = match.start()
+
+        if language == 'javascript':
+            i = bisect.bisect_right(comment_starts, match.start()) - 1
+            if i >= 0 and match.start() < comment_ends[i]:
+                continue
+            if match.group('controller'):
+                controller = (match.group('cpath') or b'').strip(b'/')
                 continue
+            if match.group('recv') and match.group('recv') not in routers:
+                continue
+
+        if language == 'javascript' and match.group('deco'):
+            parts = (controller, (match.group('dpath') or b'').strip(b'/'))
+            path = b'/' + b'/'.join(part for part in parts if part)
+        elif language == 'ruby' and match.group('res'):
+            path = b'/' + match.group('name')
+        else:
+            path = match.group('path')
+
+        for method in route_methods(language, match):
+            endpoints.append({
+                'method': method,
+                'path': path.decode('utf-8', errors='replace'),
+                'file': rel_path,
+                'line': line,
+                'framework': route_framework(language, match, rel_path),
+                'type': 'api_route'
+            })
 
     return endpoints
 
-def find_database_schemas(root_path):
+def iter_api_endpoints(root_path, index=None, cache=None, jobs=1, executor='thread', policy=None, skipped=None,
+                       counters=None, budget=None):
+    """Yield API endpoints file by file as common route patterns are found
+
+    Files that were binary, too large or only partially read are appended
+    to `skipped` (when given) so they are reported rather than dropped.
+    """
+    if index is None:
+        index = scan_project_tree(root_path)
+
+    for rel_path, result, note in iter_file_scans(
+        root_path, index['source_files'], cache, 'api_endpoints', scan_route_content, jobs, executor, policy,
+        counters, budget
+    ):
+        if note and skipped is not None:
+            skipped.append({'file': rel_path, 'reason': note})
+        if result:
+            yield from result
+
+def find_api_endpoints(root_path, index=None, cache=None, jobs=1, executor='thread', policy=None, skipped=None):
+    """Find API endpoints by scanning common route patterns"""
+    return list(iter_api_endpoints(root_path, index, cache, jobs, executor, policy, skipped))
+
+def find_database_schemas(root_path, index=None):
     """Find database schema files"""
-    schemas = []
-
-    schema_patterns = [
-        'migrations/*.sql',
-        'schema.sql',
-        'models.py',
-        'schema.rb',
-        'schema/*.sql'
-    ]
+    if index is None:
+        index = scan_project_tree(root_path)
 
-    for pattern in schema_patterns:
-        for file_path in root_path.rglob(pattern):
-            schemas.append(str(file_path.relative_to(root_path)))
+    return list(index['schema_files'])
 
-    return schemas
+# Tokens that change the SQL scanner's state: statement ends, quotes, comments, $tag$ bodies
+SQL_TOKEN = re.compile(r"""[;'"`]|--|/\*|(?<![\w$])\$(?:[A-Za-z_]\w*)?\$""")
+SQL_QUOTE_END = {"'": re.compile(r"\\.|'", re.S), '"': re.compile(r'"'), '`': re.compile(r'`')}
+SQL_COPY_END = re.compile(r'^\\\.[ \t\r]*$', re.M)
+# A run of text with no token to act on: plain characters and complete strings or quoted names
+SQL_PLAIN = re.compile(
+    r"""(?:[^;'"`$/-]+|'[^'\\]*(?:\\.[^'\\]*)*'|"[^"]*"|`[^`]*`|-(?=[^-])|/(?=[^*]))*""", re.S
+)
 
-def extract_dependencies(root_path, project_types):
-    """Extract project dependencies"""
-    dependencies = {}
+# Statements kept for the schema model; everything else is skipped while scanning
+SQL_KEPT_STATEMENTS = {'CREATE', 'ALTER', 'DROP', 'RENAME', 'COPY'}
+# Kept statements longer than this (in characters) are dropped
+SQL_STATEMENT_LIMIT = 1 << 20
+# Characters held back between blocks so no token straddles two of them
+SQL_LOOKAHEAD = 128
 
-    dep_files = {
-        'python': ['requirements.txt', 'Pipfile', 'pyproject.toml'],
-        'node': ['package.json'],
-        'go': ['go.mod'],
-        'rust': ['Cargo.toml'],
-        'java': ['pom.xml', 'build.gradle']
+def iter_sql_statements(f):
+    """Yield the DDL statements of a binary SQL file object, reading it in blocks
+
+    Strings, quoted identifiers, comments and dollar-quoted bodies are
+    tracked across blocks, so semicolons inside them never end a statement.
+    Statements that are not DDL (INSERT, COPY ... FROM stdin data, ...) are
+    skipped without being buffered, which keeps memory bounded on large
+    dumps.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    # state: None, an open quote, '--', '/*', an open $tag$, or 'copy' (inside COPY data)
+    state, parts, size, keep = None, [], 0, None
+
+    def add(segment):
+        nonlocal size, keep
+        if keep is False or not segment:
+            return
+        size += len(segment)
+        if size > SQL_STATEMENT_LIMIT:
+            keep = False
+            parts.clear()
+            return
+        parts.append(segment)
+        if keep is None:
+            match = re.match(r'\s*(\w+)\W', ''.join(parts))
+            if match:
+                keep = match.group(1).upper() in SQL_KEPT_STATEMENTS
+                if not keep:
+                    parts.clear()
+
+    text, eof = '', False
+    while not eof:
+        block = f.read(STREAM_CHUNK_BYTES)
+        eof = not block
+        text += decoder.decode(block, final=eof)
+        limit = len(text) if eof else len(text) - SQL_LOOKAHEAD
+        pos = 0
+        while pos < limit:
+            if state is None:
+                # Fast path: skip over INSERT values and the like in one regex match
+                match = SQL_PLAIN.match(text, pos, limit)
+                if match.end() > pos:
+                    add(text[pos:match.end()])
+                    pos = match.end()
+                match = SQL_TOKEN.search(text, pos)
+                if match is None or match.start() >= limit:
+                    add(text[pos:limit])
+                    pos = limit
+                    continue
+                add(text[pos:match.start()])
+                token, pos = match.group(), match.end()
+                if token == ';':
+                    statement = ''.join(parts).strip() if keep else ''
+                    parts, size, keep = [], 0, None
+                    if re.match(r'COPY\b', statement, re.I):
+                        if re.search(r'\bFROM\s+STDIN\s*$', statement, re.I):
+                            state = 'copy'
+                    elif statement:
+                        yield statement
+                elif token in ('--', '/*'):
+                    state = token
+                else:
+                    add(token)
+                    state = token
+            elif state == 'copy':
+                match = SQL_COPY_END.search(text, pos)
+                if match is None or match.start() >= limit:
+                    pos = limit
+                else:
+                    pos, state = match.end(), None
+            elif state in SQL_QUOTE_END:
+                match = SQL_QUOTE_END[state].search(text, pos)
+                if match is None or match.start() >= limit:
+                    add(text[pos:limit])
+                    pos = limit
+                    continue
+                add(text[pos:match.end()])
+                pos = match.end()
+                if not match.group().startswith('\\'):
+                    state = None
+            else:
+                closing = '\n' if state == '--' else '*/' if state == '/*' else state
+                end = text.find(closing, pos)
+                if end < 0 or end >= limit:
+                    if state.startswith('$'):
+                        add(text[pos:limit])
+                    pos = limit
+                    continue
+                if state.startswith('$'):
+                    add(text[pos:end + len(closing)])
+                else:
+                    add(' ')
+                pos, state = end + len(closing), None
+        text = text[pos:]
+
+    statement = ''.join(parts).strip() if keep else ''
+    if statement and not re.match(r'COPY\b', statement, re.I):
+        yield statement
+
+SQL_IDENTIFIER = r'(?:"[^"]+"|`[^`]+`|\[[^\]]+\]|[\w$]+)'
+SQL_NAME = rf'{SQL_IDENTIFIER}(?:\s*\.\s*{SQL_IDENTIFIER})*'
+# Schemas dropped from qualified names so `public.users` and `users` are one table
+SQL_DEFAULT_SCHEMAS = {'public', 'dbo', 'main'}
+
+SQL_CREATE_TABLE = re.compile(
+    rf'^CREATE\s+(?:OR\s+REPLACE\s+)?(?:(?:GLOBAL|LOCAL)\s+)?(TEMP(?:ORARY)?\s+)?(?:UNLOGGED\s+)?TABLE\s+'
+    rf'(?:IF\s+NOT\s+EXISTS\s+)?({SQL_NAME})\s*\((.*)\)', re.I | re.S
+)
+SQL_CREATE_INDEX = re.compile(
+    rf'^CREATE\s+(UNIQUE\s+)?(?:\w+\s+)?INDEX\s+(?:CONCURRENTLY\s+)?(?:IF\s+NOT\s+EXISTS\s+)?(?:({SQL_NAME})\s+)?'
+    rf'ON\s+(?:ONLY\s+)?({SQL_NAME})\s*(?:USING\s+\w+\s*)?\((.*)\)', re.I | re.S
+)
+SQL_DROP_TABLE = re.compile(r'^DROP\s+TABLE\s+(?:IF\s+EXISTS\s+)?(.*?)(?:\s+(?:CASCADE|RESTRICT))?$', re.I | re.S)
+SQL_DROP_INDEX = re.compile(
+    rf'^DROP\s+INDEX\s+(?:CONCURRENTLY\s+)?(?:IF\s+EXISTS\s+)?({SQL_NAME})(?:\s+ON\s+({SQL_NAME}))?', re.I
+)
+SQL_RENAME_TABLE = re.compile(rf'^RENAME\s+TABLE\s+({SQL_NAME})\s+TO\s+({SQL_NAME})', re.I)
+SQL_ALTER_TABLE = re.compile(rf'^ALTER\s+TABLE\s+(?:IF\s+EXISTS\s+)?(?:ONLY\s+)?({SQL_NAME})\s+(.*)$', re.I | re.S)
+SQL_CONSTRAINT = re.compile(
+    rf'^(?:CONSTRAINT\s+({SQL_NAME})\s+)?(PRIMARY\s+KEY|UNIQUE(?:\s+(?:KEY|INDEX))?|FOREIGN\s+KEY|'
+    rf'(?:FULLTEXT\s+|SPATIAL\s+)?(?:KEY|INDEX)|CHECK|EXCLUDE)\b\s*(?:({SQL_NAME})\s*)?(?:USING\s+\w+\s*)?'
+    rf'(?:\((.*?)\))?(.*)$', re.I | re.S
+)
+SQL_REFERENCES = re.compile(rf'\bREFERENCES\s+({SQL_NAME})\s*(?:\(\s*({SQL_IDENTIFIER})\s*\))?', re.I)
+# Where a column's type ends and its constraints begin
+SQL_COLUMN_CONSTRAINT = re.compile(
+    r'\s(?:NOT\s+NULL|NULL|DEFAULT|PRIMARY\s+KEY|REFERENCES|UNIQUE|CHECK|CONSTRAINT|AUTO_?INCREMENT|IDENTITY|'
+    r'GENERATED|COLLATE|COMMENT|ON\s+UPDATE|CHARACTER\s+SET|ENCODE)\b', re.I
+)
+
+def sql_name(text):
+    """Unquote a possibly qualified identifier, dropping a default schema"""
+    parts = [part.strip('"`[]') for part in re.findall(SQL_IDENTIFIER, text)]
+    if len(parts) > 1 and parts[0].lower() in SQL_DEFAULT_SCHEMAS:
+        parts = parts[1:]
+    return '.'.join(parts)
+
+def split_sql_list(text):
+    """Split at commas outside parentheses and quotes"""
+    items, depth, start, quote = [], 0, 0, None
+    for i, c in enumerate(text):
+        if quote:
+            if c == quote:
+                quote = None
+        elif c in '\'"`':
+            quote = c
+        elif c == '(':
+            depth += 1
+        elif c == ')':
+            depth -= 1
+        elif c == ',' and depth == 0:
+            items.append(text[start:i].strip())
+            start = i + 1
+    items.append(text[start:].strip())
+    return [item for item in items if item]
+
+def sql_column_names(text):
+    """Column names of an index or key list such as `a, lower(b), c(10) DESC`"""
+    names = []
+    for item in split_sql_list(text):
+        match = re.match(SQL_IDENTIFIER, item)
+        if match and not item[match.end():].lstrip().startswith('('):
+            names.append(sql_name(match.group()))
+        elif match:
+            names.append(item)
+    return names
+
+def sql_column(definition):
+    """Parse a column definition into {'name', 'type', 'nullable', ...}"""
+    match = re.match(rf'\s*({SQL_IDENTIFIER})\s*(.*)$', definition, re.S)
+    if not match:
+        return None
+    rest = ' ' + match.group(2)
+    stop = SQL_COLUMN_CONSTRAINT.search(rest)
+    column_type = ' '.join(rest[:stop.start() if stop else len(rest)].split())
+    primary_key = re.search(r'\bPRIMARY\s+KEY\b', rest, re.I) is not None
+    column = {
+        'name': sql_name(match.group(1)),
+        'type': column_type or None,
+        'nullable': not primary_key and re.search(r'\bNOT\s+NULL\b', rest, re.I) is None,
     }
+    if primary_key:
+        column['primary_key'] = True
+    reference = SQL_REFERENCES.search(rest)
+    if reference:
+        column['references'] = sql_name(reference.group(1)) + (
+            f".{sql_name(reference.group(2))}" if reference.group(2) else ''
+        )
+    return column
+
+def find_column(table, name):
+    """A table's column by case-insensitive name, or None"""
+    name = name.lower()
+    return next((column for column in table['columns'] if column['name'].lower() == name), None)
+
+def apply_sql_constraint(table, match):
+    """Apply a table-level PRIMARY KEY / UNIQUE / KEY / FOREIGN KEY clause; CHECK and EXCLUDE are ignored"""
+    kind = ' '.join(match.group(2).upper().split())
+    columns = sql_column_names(match.group(4) or '')
+    name = sql_name(match.group(1) or match.group(3) or '') or None
+    if kind == 'PRIMARY KEY':
+        for column_name in columns:
+            column = find_column(table, column_name)
+            if column:
+                column.update(primary_key=True, nullable=False)
+    elif kind == 'FOREIGN KEY':
+        reference = SQL_REFERENCES.search(match.group(5) or '')
+        column = find_column(table, columns[0]) if reference and len(columns) == 1 else None
+        if column:
+            column['references'] = sql_name(reference.group(1)) + (
+                f".{sql_name(reference.group(2))}" if reference.group(2) else ''
+            )
+    elif kind not in ('CHECK', 'EXCLUDE') and columns:
+        table['indexes'].append({'name': name, 'columns': columns, 'unique': kind.startswith('UNIQUE')})
+
+def rename_column(table, column, new_name):
+    """Rename a column, including in the table's index column lists"""
+    old_name = column['name'].lower()
+    column['name'] = new_name
+    for index in table['indexes']:
+        index['columns'] = [new_name if name.lower() == old_name else name for name in index['columns']]
+
+def apply_sql_alter(tables, key, action):
+    """Apply one ALTER TABLE action to tables[key]; returns the table's (possibly renamed) key"""
+    table = tables[key]
+    match = re.match(rf'RENAME\s+(?:TO|AS)\s+({SQL_NAME})$', action, re.I)
+    if match:
+        table['name'] = sql_name(match.group(1))
+        tables[table['name'].lower()] = tables.pop(key)
+        return table['name'].lower()
+    match = re.match(rf'RENAME\s+(?:COLUMN\s+)?({SQL_IDENTIFIER})\s+TO\s+({SQL_IDENTIFIER})$', action, re.I)
+    if match:
+        column = find_column(table, sql_name(match.group(1)))
+        if column:
+            rename_column(table, column, sql_name(match.group(2)))
+        return key
+    match = re.match(r'ADD\s+(.*)$', action, re.I | re.S)
+    if match:
+        body = match.group(1)
+        constraint = SQL_CONSTRAINT.match(body)
+        if constraint and (constraint.group(1) or not re.match(r'(?:KEY|INDEX)\s*$', body, re.I)):
+            apply_sql_constraint(table, constraint)
+        else:
+            body = re.sub(r'^COLUMN\s+(?:IF\s+NOT\s+EXISTS\s+)?', '', body, flags=re.I)
+            column = sql_column(body)
+            if column and not find_column(table, column['name']):
+                table['columns'].append(column)
+        return key
+    match = re.match(rf'DROP\s+(CONSTRAINT|INDEX|KEY|PRIMARY\s+KEY|COLUMN\s+)?\s*(?:IF\s+EXISTS\s+)?({SQL_NAME})?', action,
+                     re.I)
+    if match:
+        kind = (match.group(1) or 'COLUMN').upper().split()[0]
+        name = sql_name(match.group(2) or '')
+        if kind == 'PRIMARY':
+            for column in table['columns']:
+                column.pop('primary_key', None)
+        elif kind == 'COLUMN':
+            table['columns'] = [c for c in table['columns'] if c['name'].lower() != name.lower()]
+            table['indexes'] = [i for i in table['indexes'] if name.lower() not in (c.lower() for c in i['columns'])]
+        else:
+            table['indexes'] = [i for i in table['indexes'] if (i['name'] or '').lower() != name.lower()]
+        return key
+    match = re.match(rf'ALTER\s+(?:COLUMN\s+)?({SQL_IDENTIFIER})\s+(.*)$', action, re.I | re.S)
+    if match:
+        column = find_column(table, sql_name(match.group(1)))
+        change = match.group(2)
+        if column:
+            type_change = re.match(r'(?:SET\s+DATA\s+)?TYPE\s+(.*?)(?:\s+USING\s.*)?$', change, re.I | re.S)
+            if type_change:
+                column['type'] = ' '.join(type_change.group(1).split())
+            elif re.match(r'SET\s+NOT\s+NULL', change, re.I):
+                column['nullable'] = False
+            elif re.match(r'DROP\s+NOT\s+NULL', change, re.I):
+                column['nullable'] = True
+        return key
+    match = re.match(r'(MODIFY|CHANGE)\s+(?:COLUMN\s+)?(.*)$', action, re.I | re.S)
+    if match:
+        body = match.group(2)
+        old_name = None
+        if match.group(1).upper() == 'CHANGE':
+            old = re.match(rf'({SQL_IDENTIFIER})\s+', body)
+            if not old:
+                return key
+            old_name, body = sql_name(old.group(1)), body[old.end():]
+        column = sql_column(body)
+        previous = find_column(table, old_name or (column or {}).get('name', ''))
+        if column and previous:
+            rename_column(table, previous, column['name'])
+            table['columns'][table['columns'].index(previous)] = column
+    return key
+
+def apply_sql_statement(tables, statement, source):
+    """Apply one DDL statement to the {table key: table} model"""
+    match = SQL_CREATE_TABLE.match(statement)
+    if match:
+        if match.group(1):
+            return
+        name = sql_name(match.group(2))
+        table = {'name': name, 'columns': [], 'indexes': [], 'defined_in': source}
+        for item in split_sql_list(match.group(3)):
+            constraint = SQL_CONSTRAINT.match(item)
+            if constraint:
+                apply_sql_constraint(table, constraint)
+            elif not re.match(r'LIKE\s', item, re.I):
+                column = sql_column(item)
+                if column:
+                    table['columns'].append(column)
+        tables[name.lower()] = table
+        return
+
+    match = SQL_CREATE_INDEX.match(statement)
+    if match:
+        table = tables.get(sql_name(match.group(3)).lower())
+        if table:
+            table['indexes'].append({
+                'name': sql_name(match.group(2) or '') or None,
+                'columns': sql_column_names(match.group(4)),
+                'unique': bool(match.group(1)),
+            })
+        return
+
+    match = SQL_ALTER_TABLE.match(statement)
+    if match:
+        key = sql_name(match.group(1)).lower()
+        if key in tables:
+            for action in split_sql_list(match.group(2)):
+                key = apply_sql_alter(tables, key, action)
+        return
+
+    match = SQL_DROP_TABLE.match(statement)
+    if match:
+        for name in split_sql_list(match.group(1)):
+            tables.pop(sql_name(name).lower(), None)
+        return
+
+    match = SQL_DROP_INDEX.match(statement)
+    if match:
+        name = sql_name(match.group(1)).lower()
+        for table in tables.values():
+            table['indexes'] = [i for i in table['indexes'] if (i['name'] or '').lower() not in (name, name.split('.')[-1])]
+        return
+
+    match = SQL_RENAME_TABLE.match(statement)
+    if match:
+        table = tables.pop(sql_name(match.group(1)).lower(), None)
+        if table:
+            table['name'] = sql_name(match.group(2))
+            tables[table['name'].lower()] = table
+
+def is_migration_file(rel_path):
+    """SQL schema files replayed into the schema model (down migrations are not)"""
+    name = rel_path.rsplit('/', 1)[-1].lower()
+    return name.endswith('.sql') and not re.search(r'[._-]down\.sql$', name)
+
+def migration_order(rel_path):
+    """Sort key replaying migrations in natural order: 2_x.sql before 10_x.sql"""
+    return [int(part) if part.isdigit() else part for part in re.split(r'(\d+)', rel_path.lower())]
+
+def parse_sql_file(path):
+    """DDL statements of one SQL file, or {'error': ...} if it cannot be read"""
+    try:
+        with open(path, 'rb') as f:
+            return list(iter_sql_statements(f))
+    except OSError as e:
+        return {'error': str(e)}
+
+def build_schema_model(root_path, schema_files, cache=None, budget=None):
+    """Replay SQL migrations in order into a table/column/index model
+
+    With a cache, each file's statements are reused while its content is
+    unchanged, and when the migrations seen last time are an unchanged
+    prefix of today's, replay resumes from the stored model so only new
+    migrations are applied. Returns (model, files_applied).
+    """
+    root_path = Path(root_path)
+    migrations = sorted((p for p in schema_files if is_migration_file(p)), key=migration_order)
+
+    chain, statements = [], {}
+    coverage = phase_coverage(budget, 'database_schemas', len(migrations))
+    for rel_path in migrations:
+        if out_of_time(budget):
+            break
+        if cache is not None:
+            result, digest = cached_parse(root_path, rel_path, cache, 'sql', parse_sql_file, budget)
+        elif charge_read(budget):
+            result, digest = parse_sql_file(root_path / rel_path), None
+        else:
+            result = digest = None
+        if result is None and budget is not None and budget['exhausted']:
+            # Replaying past a missing migration would give a wrong model: stop at the last one read
+            break
+        coverage['processed'] += 1
+        if result is not None:
+            chain.append([rel_path, digest])
+            statements[rel_path] = result
+
+    tables, errors, start = {}, [], 0
+    snapshot = cache.get('schema_model') if cache is not None else None
+    if snapshot and snapshot['chain'] == chain[:len(snapshot['chain'])]:
+        # Deep-copied: replay mutates tables, and the snapshot may belong to the memoized cache parse
+        tables = json.loads(json.dumps(snapshot['tables']))
+        errors = list(snapshot.get('errors', []))
+        start = len(snapshot['chain'])
+
+    for rel_path, _ in chain[start:]:
+        result = statements[rel_path]
+        if isinstance(result, dict):
+            errors.append({'file': rel_path, 'error': result['error']})
+            continue
+        for statement in result:
+            # One statement the model does not understand must not stop the whole analysis
+            try:
+                apply_sql_statement(tables, statement, rel_path)
+            except Exception as e:
+                errors.append({'file': rel_path, 'error': f"{type(e).__name__}: {e}",
+                               'statement': statement[:200]})
 
+    if cache is not None and (not snapshot or snapshot['chain'] != chain):
+        cache['schema_model'] = {'chain': chain, 'tables': tables, 'errors': errors}
+        cache['schema_model_changed'] = True
+
+    model = {
+        'migration_files': len(chain),
+        'tables': [tables[key] for key in sorted(tables)],
+    }
+    if errors:
+        model['errors'] = errors
+    return model, len(chain) - start
+
+def dependency(name, version=None, scope='runtime', requires=None):
+    """One normalized dependency record"""
+    record = {'name': name, 'version': version, 'scope': scope}
+    if requires:
+        record['requires'] = requires
+    return record
+
+def pep503_name(name):
+    """Normalize a Python distribution name (PEP 503)"""
+    return re.sub(r'[-_.]+', '-', name).lower()
+
+PEP508_REQUIREMENT = re.compile(
+    r'^\s*([A-Za-z0-9][A-Za-z0-9._-]*)\s*(?:\[[^\]]*\])?\s*(\(?\s*(?:[<>=!~]|@)[^;]*?)?\s*(?:;.*)?$'
+)
+
+def python_requirement(spec, scope='runtime'):
+    """Parse a PEP 508 requirement string, or None for URLs, options and blanks"""
+    match = PEP508_REQUIREMENT.match(spec)
+    if not match:
+        return None
+    version = match.group(2).strip().lstrip('(').rstrip(')').strip() or None
+    if version and version.startswith('@'):
+        version = None
+    return dependency(pep503_name(match.group(1)), version, scope)
+
+def parse_requirements_txt(f):
+    """requirements.txt, streamed line by line (continuations joined, options and includes skipped)"""
+    deps, pending = [], ''
+    for raw in f:
+        line = raw.decode('utf-8', errors='replace').rstrip('\r\n')
+        if line.endswith('\\'):
+            pending += line[:-1] + ' '
+            continue
+        line = re.sub(r'(^|\s)#.*$', '', pending + line).strip()
+        pending = ''
+        if not line or line.startswith('-'):
+            continue
+        record = python_requirement(line)
+        if record:
+            deps.append(record)
+    return {'ecosystem': 'pypi', 'kind': 'manifest', 'dependencies': deps}
+
+def toml_skip(text, i, newlines=True):
+    """Skip whitespace and comments (and newlines unless told not to)"""
+    while i < len(text):
+        c = text[i]
+        if c in ' \t' or (newlines and c in '\r\n'):
+            i += 1
+        elif c == '#':
+            while i < len(text) and text[i] != '\n':
+                i += 1
+        else:
+            break
+    return i
+
+def toml_string(text, i):
+    """Parse a basic, literal or multi-line string at text[i]; returns (value, end)"""
+    quote = text[i:i + 3] if text[i:i + 3] in ('"""', "'''") else text[i]
+    start = i + len(quote)
+    if quote[0] == "'":
+        end = text.find(quote, start)
+        if end < 0:
+            raise ValueError('unterminated string')
+        value = text[start:end]
+    else:
+        end = start
+        while True:
+            end = text.find(quote, end)
+            if end < 0:
+                raise ValueError('unterminated string')
+            backslashes = len(text[start:end]) - len(text[start:end].rstrip('\\'))
+            if backslashes % 2 == 0:
+                break
+            end += 1
+        value = text[start:end]
+        if len(quote) == 3:
+            value = re.sub(r'\\\r?\n\s*', '', value)
+        try:
+            value = json.loads('"' + value.replace('\n', '\\n').replace('\t', '\\t') + '"')
+        except ValueError:
+            pass
+    if len(quote) == 3 and value.startswith('\n'):
+        value = value[1:]
+    return value, end + len(quote)
+
+def toml_key(text, i):
+    """Parse a possibly dotted, possibly quoted key; returns (parts, end)"""
+    parts = []
+    while True:
+        i = toml_skip(text, i, newlines=False)
+        if text[i] in '"\'':
+            part, i = toml_string(text, i)
+        else:
+            match = re.compile(r'[A-Za-z0-9_-]+').match(text, i)
+            if not match:
+                raise ValueError(f"bad key at offset {i}")
+            part, i = match.group(), match.end()
+        parts.append(part)
+        i = toml_skip(text, i, newlines=False)
+        if i < len(text) and text[i] == '.':
+            i += 1
+            continue
+        return parts, i
+
+def toml_value(text, i):
+    """Parse a value (string, array, inline table or scalar); returns (value, end)"""
+    i = toml_skip(text, i)
+    c = text[i]
+    if c in '"\'':
+        return toml_string(text, i)
+    if c in '[{':
+        closing = ']' if c == '[' else '}'
+        container = [] if c == '[' else {}
+        i += 1
+        while True:
+            i = toml_skip(text, i)
+            if text[i] == closing:
+                return container, i + 1
+            if c == '[':
+                value, i = toml_value(text, i)
+                container.append(value)
+            else:
+                parts, i = toml_key(text, i)
+                value, i = toml_value(text, toml_skip(text, i, newlines=False) + 1)
+                toml_descend(container, parts[:-1])[parts[-1]] = value
+            i = toml_skip(text, i)
+            if text[i] == ',':
+                i += 1
+    match = re.compile(r'[^,\]}\r\n#]+').match(text, i)
+    token = match.group().strip()
+    if token in ('true', 'false'):
+        return token == 'true', match.end()
+    try:
+        return int(token.replace('_', ''), 0), match.end()
+    except ValueError:
+        pass
+    try:
+        return float(token.replace('_', '')), match.end()
+    except ValueError:
+        return token, match.end()
+
+def toml_descend(table, parts):
+    """Walk (creating) nested tables; arrays of tables resolve to their last element"""
+    for part in parts:
+        table = table.setdefault(part, {})
+        if isinstance(table, list):
+            table = table[-1]
+    return table
+
+def parse_toml_subset(text):
+    """Minimal TOML reader for Pythons without tomllib (< 3.11)
+
+    Covers what manifests use: tables, arrays of tables, dotted and quoted
+    keys, strings, numbers, booleans, arrays and inline tables. Dates are
+    returned as strings.
+    """
+    root = {}
+    table = root
+    i = toml_skip(text, 0)
+    while i < len(text):
+        if text.startswith('[[', i):
+            parts, i = toml_key(text, i + 2)
+            i = text.index(']]', i) + 2
+            parent = toml_descend(root, parts[:-1])
+            table = {}
+            parent.setdefault(parts[-1], []).append(table)
+        elif text[i] == '[':
+            parts, i = toml_key(text, i + 1)
+            i = text.index(']', i) + 1
+            table = toml_descend(root, parts)
+        else:
+            parts, i = toml_key(text, i)
+            if text[i] != '=':
+                raise ValueError(f"expected '=' at offset {i}")
+            value, i = toml_value(text, i + 1)
+            toml_descend(table, parts[:-1])[parts[-1]] = value
+        i = toml_skip(text, i)
+    return root
+
+def load_toml(f):
+    """Parse a TOML file object with tomllib where available"""
+    text = f.read().decode('utf-8', errors='replace')
+    if tomllib is not None:
+        return tomllib.loads(text)
+    return parse_toml_subset(text)
+
+def parse_pyproject(f):
+    """PEP 621 / PEP 735 dependencies and Poetry's tables from pyproject.toml"""
+    data = load_toml(f)
+    deps = []
+    project = data.get('project', {})
+    for spec in project.get('dependencies', []):
+        deps.append(python_requirement(spec))
+    for extra, specs in project.get('optional-dependencies', {}).items():
+        deps.extend(python_requirement(spec, f"optional:{extra}") for spec in specs)
+    for group, specs in data.get('dependency-groups', {}).items():
+        deps.extend(python_requirement(spec, group) for spec in specs if isinstance(spec, str))
+
+    poetry = data.get('tool', {}).get('poetry', {})
+    tables = [('runtime', poetry.get('dependencies', {})), ('dev', poetry.get('dev-dependencies', {}))]
+    tables += [(group, body.get('dependencies', {})) for group, body in poetry.get('group', {}).items()]
+    for scope, table in tables:
+        for name, spec in table.items():
+            if name.lower() == 'python':
+                continue
+            version = spec.get('version') if isinstance(spec, dict) else spec
+            deps.append(dependency(pep503_name(name), version, scope))
+    return {'ecosystem': 'pypi', 'kind': 'manifest', 'dependencies': [d for d in deps if d]}
+
+def parse_pipfile(f):
+    """[packages] and [dev-packages] from a Pipfile"""
+    data = load_toml(f)
+    deps = []
+    for section, scope in (('packages', 'runtime'), ('dev-packages', 'dev')):
+        for name, spec in data.get(section, {}).items():
+            version = spec.get('version') if isinstance(spec, dict) else spec
+            deps.append(dependency(pep503_name(name), None if version == '*' else version, scope))
+    return {'ecosystem': 'pypi', 'kind': 'manifest', 'dependencies': deps}
+
+def json_leaves(value, path=()):
+    """Yield (path, scalar) pairs of an already-parsed JSON value"""
+    if isinstance(value, dict):
+        if not value:
+            yield path, value
+        for key, child in value.items():
+            yield from json_leaves(child, path + (key,))
+    elif isinstance(value, list):
+        if not value:
+            yield path, value
+        for index, child in enumerate(value):
+            yield from json_leaves(child, path + (index,))
+    else:
+        yield path, value
+
+JSON_MEMBER = re.compile(r'"((?:[^"\\]|\\.)*)"\s*:\s*(.*)$')
+
+def iter_json_leaves(f):
+    """Yield (path, scalar) pairs from a JSON file without holding the parsed document
+
+    Pretty-printed files (one member per line, as npm and pipenv write
+    them) are read line by line; anything else is parsed whole.
+    """
+    first = f.readline()
+    if first.strip() != b'{':
+        f.seek(0)
+        yield from json_leaves(json.load(f))
+        return
+
+    # Each open container: [path, is_array, next_index]
+    stack = [[(), False, 0]]
+    for raw in f:
+        line = raw.decode('utf-8').strip()
+        if line.endswith(','):
+            line = line[:-1]
+        if not line:
+            continue
+        if line in ('}', ']'):
+            stack.pop()
+            continue
+        path, is_array, _ = stack[-1]
+        if is_array:
+            key = stack[-1][2]
+            stack[-1][2] += 1
+            rest = line
+        else:
+            match = JSON_MEMBER.match(line)
+            if not match:
+                raise ValueError(f"unexpected JSON line: {line[:60]}")
+            key = match.group(1)
+            if '\\' in key:
+                key = json.loads(f'"{key}"')
+            rest = match.group(2)
+        if rest in ('{', '['):
+            stack.append([path + (key,), rest == '[', 0])
+        elif rest.startswith('"') and rest.endswith('"') and '\\' not in rest:
+            yield path + (key,), rest[1:-1]
+        else:
+            yield from json_leaves(json.loads(rest), path + (key,))
+
+def parse_package_json(f):
+    """Direct dependencies from package.json"""
+    data = json.load(f)
+    deps = []
+    for section, scope in (('dependencies', 'runtime'), ('devDependencies', 'dev'), ('peerDependencies', 'peer'),
+                           ('optionalDependencies', 'optional')):
+        for name, spec in (data.get(section) or {}).items():
+            deps.append(dependency(name, spec, scope))
+    return {'ecosystem': 'npm', 'kind': 'manifest', 'dependencies': deps}
+
+def parse_package_lock(f):
+    """Resolved packages and their requirements from package-lock.json (lockfile v1 to v3), streamed"""
+    packages, legacy = {}, {}
+    for path, value in iter_json_leaves(f):
+        if path[0] == 'packages' and len(path) >= 3 and path[1]:
+            record = packages.setdefault(path[1], {'name': path[1].rpartition('node_modules/')[2], 'scope': 'runtime'})
+            fields = path[2:]
+        elif path[0] == 'dependencies' and len(path) >= 3:
+            # v1 nests as dependencies/<name>/dependencies/<name>/...
+            names, i = [], 0
+            while i + 1 < len(path) and path[i] == 'dependencies':
+                names.append(path[i + 1])
+                i += 2
+            record = legacy.setdefault(tuple(names), {'name': names[-1], 'scope': 'runtime'})
+            fields = path[i:]
+        else:
+            continue
+
+        if fields == ('version',):
+            record['version'] = value
+        elif fields == ('name',):
+            record['name'] = value
+        elif fields[0] in ('dev', 'devOptional') and value is True:
+            record['scope'] = 'dev'
+        elif fields[0] == 'optional' and value is True:
+            record['scope'] = 'optional'
+        elif len(fields) == 2 and fields[0] in ('dependencies', 'requires', 'optionalDependencies', 'peerDependencies'):
+            record.setdefault('requires', []).append(fields[1])
+
+    records = packages or legacy
+    deps = [dependency(r['name'], r.get('version'), r['scope'], r.get('requires')) for r in records.values()]
+    return {'ecosystem': 'npm', 'kind': 'lockfile', 'dependencies': deps}
+
+def yarn_entry_name(spec):
+    """Package name from a yarn.lock entry key such as '"@scope/pkg@^1.0", "@scope/pkg@npm:^1.1"'"""
+    first = spec.split(',')[0].strip().strip('"')
+    at = first.find('@', 1)
+    return first[:at] if at > 0 else first
+
+def parse_yarn_lock(f):
+    """Resolved packages from yarn.lock (classic v1 and berry), streamed"""
+    deps, current, in_deps = [], None, False
+    for raw in f:
+        line = raw.decode('utf-8', errors='replace').rstrip('\r\n')
+        if not line.strip() or line.lstrip().startswith('#'):
+            continue
+        indent = len(line) - len(line.lstrip(' '))
+        text = line.strip()
+        if indent == 0:
+            in_deps = False
+            current = None
+            if text.endswith(':') and not text.startswith('__metadata'):
+                current = dependency(yarn_entry_name(text[:-1]))
+                deps.append(current)
+        elif current is None:
+            continue
+        elif indent == 2:
+            in_deps = text in ('dependencies:', 'optionalDependencies:', 'peerDependencies:')
+            if text.startswith('version'):
+                current['version'] = text[len('version'):].lstrip(':').strip().strip('"')
+        elif in_deps and indent >= 4:
+            name = text.split(':')[0] if text.startswith('"') and '":' in text else text.split(' ')[0]
+            current.setdefault('requires', []).append(name.strip('"').rstrip(':'))
+    return {'ecosystem': 'npm', 'kind': 'lockfile', 'dependencies': deps}
+
+def parse_go_mod(f):
+    """require directives from go.mod (single-line and block form), marking // indirect ones"""
+    deps, in_block = [], False
+    for raw in f:
+        line = raw.decode('utf-8', errors='replace').strip()
+        if in_block and line.startswith(')'):
+            in_block = False
+            continue
+        if line.startswith('require ('):
+            in_block = True
+            continue
+        if line.startswith('require '):
+            line = line[len('require '):]
+        elif not in_block:
+            continue
+        code, _, comment = line.partition('//')
+        fields = code.split()
+        if len(fields) >= 2:
+            deps.append(dependency(fields[0], fields[1], 'indirect' if 'indirect' in comment else 'runtime'))
+    return {'ecosystem': 'go', 'kind': 'manifest', 'dependencies': deps}
+
+def parse_go_sum(f):
+    """Module versions recorded in go.sum, streamed"""
+    seen = {}
+    for raw in f:
+        fields = raw.decode('utf-8', errors='replace').split()
+        if len(fields) >= 2:
+            version = fields[1].split('/')[0]
+            seen.setdefault((fields[0], version), dependency(fields[0], version))
+    return {'ecosystem': 'go', 'kind': 'lockfile', 'dependencies': list(seen.values())}
+
+def cargo_dependency_tables(data, prefix=''):
+    """(scope, table) pairs for [dependencies]-style tables, including target-specific ones"""
+    for section, scope in (('dependencies', 'runtime'), ('dev-dependencies', 'dev'), ('build-dependencies', 'build')):
+        if isinstance(data.get(section), dict):
+            yield prefix + scope, data[section]
+    for target, body in (data.get('target') or {}).items():
+        yield from cargo_dependency_tables(body, f"{target}:")
+
+def parse_cargo_toml(f):
+    """Direct dependencies from Cargo.toml, including workspace and target-specific tables"""
+    data = load_toml(f)
+    deps = []
+    tables = list(cargo_dependency_tables(data))
+    workspace = data.get('workspace', {}).get('dependencies')
+    if isinstance(workspace, dict):
+        tables.append(('workspace', workspace))
+    for scope, table in tables:
+        for name, spec in table.items():
+            version = spec.get('version') if isinstance(spec, dict) else spec
+            deps.append(dependency(spec.get('package', name) if isinstance(spec, dict) else name, version, scope))
+    return {'ecosystem': 'cargo', 'kind': 'manifest', 'dependencies': deps}
+
+def iter_lock_packages(f):
+    """Stream [[package]] blocks of a TOML lockfile (Cargo.lock, poetry.lock) as flat dicts
+
+    Each dict has 'name', 'version', optional 'category' and a 'requires'
+    list taken from a `dependencies = [...]` array or a
+    [package.dependencies] table.
+    """
+    package, section, in_array = None, None, False
+    for raw in f:
+        line = raw.decode('utf-8', errors='replace').strip()
+        if in_array:
+            if line.startswith(']'):
+                in_array = False
+                continue
+            name = line.strip(',').strip().strip('"').split(' ')[0]
+            if name:
+                package['requires'].append(name)
+            continue
+        if line.startswith('[['):
+            if package:
+                yield package
+            package, section = ({'requires': []}, None) if line == '[[package]]' else (None, None)
+            continue
+        if line.startswith('['):
+            section = line.strip('[]')
+            continue
+        if package is None or not line or line.startswith('#') or '=' not in line:
+            continue
+        key, _, value = line.partition('=')
+        key, value = key.strip().strip('"'), value.strip()
+        if section is None:
+            if key in ('name', 'version', 'category') and value.startswith('"'):
+                package[key] = value.strip('"')
+            elif key == 'dependencies' and value.startswith('['):
+                if value.endswith(']'):
+                    package['requires'].extend(
+                        item.strip().strip('"').split(' ')[0] for item in value[1:-1].split(',') if item.strip()
+                    )
+                else:
+                    in_array = True
+        elif section == 'package.dependencies':
+            package['requires'].append(key)
+    if package:
+        yield package
+
+def parse_cargo_lock(f):
+    """Resolved crates and their dependencies from Cargo.lock, streamed"""
+    deps = [dependency(p.get('name'), p.get('version'), requires=p['requires']) for p in iter_lock_packages(f)]
+    return {'ecosystem': 'cargo', 'kind': 'lockfile', 'dependencies': deps}
+
+def parse_poetry_lock(f):
+    """Resolved packages from poetry.lock, streamed"""
+    deps = [
+        dependency(pep503_name(p.get('name', '')), p.get('version'), p.get('category', 'runtime'),
+                   [pep503_name(name) for name in p['requires']])
+        for p in iter_lock_packages(f)
+    ]
+    return {'ecosystem': 'pypi', 'kind': 'lockfile', 'dependencies': deps}
+
+def parse_pipfile_lock(f):
+    """Pinned packages from Pipfile.lock, streamed when pretty-printed"""
+    records = {}
+    for path, value in iter_json_leaves(f):
+        if len(path) == 3 and path[0] in ('default', 'develop') and path[2] == 'version':
+            scope = 'runtime' if path[0] == 'default' else 'dev'
+            records[(path[0], path[1])] = dependency(pep503_name(path[1]), value.lstrip('='), scope)
+    return {'ecosystem': 'pypi', 'kind': 'lockfile', 'dependencies': list(records.values())}
+
+# ${property} references in pom.xml values
+POM_PROPERTY_REFERENCE = re.compile(r'\$\{([^}]+)\}')
+
+def parse_pom_xml(f):
+    """<dependency> entries from pom.xml via incremental XML parsing, resolving ${properties}"""
+    import xml.etree.ElementTree as ET
+
+    deps, properties, path = [], {}, []
+    for event, element in ET.iterparse(f, events=('start', 'end')):
+        tag = element.tag.rpartition('}')[2]
+        if event == 'start':
+            path.append(tag)
+            continue
+        path.pop()
+        if len(path) == 2 and path[1] == 'properties':
+            properties[tag] = (element.text or '').strip()
+        elif tag == 'dependency':
+            fields = {child.tag.rpartition('}')[2]: (child.text or '').strip() for child in element}
+            in_management = 'dependencyManagement' in path
+            deps.append(dependency(
+                f"{fields.get('groupId', '')}:{fields.get('artifactId', '')}", fields.get('version') or None,
+                'managed' if in_management else fields.get('scope', 'compile')
+            ))
+            element.clear()
+
+    def expand(text):
+        return POM_PROPERTY_REFERENCE.sub(lambda m: properties.get(m.group(1), m.group(0)), text)
+
+    for record in deps:
+        if record['version']:
+            record['version'] = expand(record['version'])
+    return {'ecosystem': 'maven', 'kind': 'manifest', 'dependencies': deps}
+
+GRADLE_DEPENDENCY = re.compile(
+    r'^\s*(\w+)\s*\(?\s*[\'"]([^:\'"]+):([^:\'"]+)(?::([^\'"@]+))?[^\'"]*[\'"]'
+)
+
+def parse_build_gradle(f):
+    """'group:name:version' coordinates declared in build.gradle(.kts), streamed"""
+    deps = []
+    for raw in f:
+        match = GRADLE_DEPENDENCY.match(raw.decode('utf-8', errors='replace'))
+        if match and match.group(1) not in ('id', 'plugin', 'classpath', 'maven', 'url'):
+            deps.append(dependency(f"{match.group(2)}:{match.group(3)}", match.group(4), match.group(1)))
+    return {'ecosystem': 'maven', 'kind': 'manifest', 'dependencies': deps}
+
+# Manifest and lockfile parsers by file name; each takes a binary file object
+MANIFEST_PARSERS = {
+    'requirements.txt': parse_requirements_txt,
+    'pyproject.toml': parse_pyproject,
+    'Pipfile': parse_pipfile,
+    'Pipfile.lock': parse_pipfile_lock,
+    'poetry.lock': parse_poetry_lock,
+    'package.json': parse_package_json,
+    'package-lock.json': parse_package_lock,
+    'yarn.lock': parse_yarn_lock,
+    'go.mod': parse_go_mod,
+    'go.sum': parse_go_sum,
+    'Cargo.toml': parse_cargo_toml,
+    'Cargo.lock': parse_cargo_lock,
+    'pom.xml': parse_pom_xml,
+    'build.gradle': parse_build_gradle,
+    'build.gradle.kts': parse_build_gradle,
+}
+
+def parse_manifest(path):
+    """Parse one manifest, reporting failures in the result instead of raising"""
+    parser = MANIFEST_PARSERS[Path(path).name]
+    try:
+        with open(path, 'rb') as f:
+            return parser(f)
+    except (OSError, ValueError, KeyError, IndexError, AttributeError, TypeError, SyntaxError) as e:
+        return {'ecosystem': None, 'kind': None, 'dependencies': [], 'error': f"{type(e).__name__}: {e}"}
+
+def extract_dependencies(root_path, project_types, cache=None, budget=None):
+    """Parse the dependency manifests and lockfiles of each detected stack
+
+    Returns {file: {'ecosystem', 'kind', 'dependencies': [...]}}; parsed
+    results are reused from `cache` while a file's content is unchanged.
+    Each file parsed is charged to `budget`.
+    """
+    root_path = Path(root_path)
+    dependencies = {}
+
+    dep_files = []
     for lang in project_types:
-        for dep_file in dep_files.get(lang, []):
-            file_path = root_path / dep_file
-            if file_path.exists():
-                dependencies[dep_file] = f"Found at {file_path.relative_to(root_path)}"
+        for dep_file in DEPENDENCY_FILES.get(lang, []):
+            if dep_file not in dep_files and (root_path / dep_file).is_file():
+                dep_files.append(dep_file)
+
+    coverage = phase_coverage(budget, 'dependencies', len(dep_files))
+    for dep_file in dep_files:
+        if out_of_time(budget):
+            break
+        if cache is not None:
+            result, _ = cached_parse(root_path, dep_file, cache, 'dependencies', parse_manifest, budget)
+        elif charge_read(budget):
+            result = parse_manifest(root_path / dep_file)
+        else:
+            result = None
+        if result is None and budget is not None and budget['exhausted']:
+            continue
+        coverage['processed'] += 1
+        if result is not None:
+            dependencies[dep_file] = dict(result, path=dep_file)
 
     return dependencies
 
-def scan_existing_docs(root_path):
+def dependency_graph(dependencies):
+    """Merge per-file results into one graph: a node per (ecosystem, package), edges from lockfiles
+
+    Manifests mark direct dependencies and what they request; lockfiles
+    supply resolved versions and package-to-package edges.
+    """
+    nodes, edges = {}, set()
+    for manifest in dependencies.values():
+        ecosystem = manifest.get('ecosystem')
+        if not ecosystem:
+            continue
+        locked = manifest.get('kind') == 'lockfile'
+        for record in manifest.get('dependencies', []):
+            node_id = f"{ecosystem}:{record['name']}"
+            node = nodes.setdefault(node_id, {
+                'id': node_id, 'ecosystem': ecosystem, 'name': record['name'], 'version': None,
+                'requested': None, 'direct': False, 'scopes': [],
+            })
+            if locked:
+                node['version'] = node['version'] or record['version']
+                for required in record.get('requires', ()):
+                    edges.add((node_id, f"{ecosystem}:{required}"))
+            else:
+                node['direct'] = True
+                node['requested'] = node['requested'] or record['version']
+            if record['scope'] not in node['scopes']:
+                node['scopes'].append(record['scope'])
+
+    return {
+        'nodes': sorted(nodes.values(), key=lambda node: node['id']),
+        'edges': sorted([source, target] for source, target in edges if target in nodes),
+    }
+
+def scan_existing_docs(root_path, index=None):
     """Scan for existing documentation"""
+    if index is None:
+        index = scan_project_tree(root_path)
+
     docs = []
+    for rel_path in index['doc_files']:
+        try:
+            size = (root_path / rel_path).stat().st_size
+        except OSError:
+            continue
+        docs.append({
+            'file': rel_path,
+            'size': size,
+            'exists': True
+        })
 
-    doc_files = ['README.md', 'ARCHITECTURE.md', 'API.md', 'CONTRIBUTING.md']
+    return docs
 
-    for doc_file in doc_files:
-        file_path = root_path / doc_file
-        if file_path.exists():
-            docs.append({
-                'file': doc_file,
-                'size': file_path.stat().st_size,
-                'exists': True
-            })
+# Manifests that make a nested directory its own project in --monorepo mode
+PACKAGE_MANIFESTS = frozenset(
+    name for names in list(PROJECT_MARKERS.values()) + list(DEPENDENCY_FILES.values()) for name in names
+)
 
-    # Scan docs directory
-    docs_dir = root_path / 'docs'
-    if docs_dir.exists():
-        for doc in docs_dir.rglob('*.md'):
-            docs.append({
-                'file': str(doc.relative_to(root_path)),
-                'size': doc.stat().st_size,
-                'exists': True
-            })
+def package_owner(packages, rel_path):
+    """Deepest package root containing `rel_path`, or '' for the top-level project"""
+    parent = rel_path.rpartition('/')[0]
+    while parent:
+        if parent in packages:
+            return parent
+        parent = parent.rpartition('/')[0]
+    return ''
 
-    return docs
+def partition_by_package(records, packages, buckets, counts, key='file', limit=None):
+    """Pass records through as (package, record) pairs while counting and filing each under its package
+
+    With a `limit`, only that many records are kept per package (the rest are just counted).
+    """
+    for record in records:
+        owner = package_owner(packages, record[key] if key else record)
+        counts[owner] += 1
+        if limit is None or counts[owner] <= limit:
+            buckets[owner].append(record)
+        yield owner, record
+
+def package_fingerprint(root_path, package, files):
+    """Changes when a package gains or loses files or any of its manifests changes"""
+    hasher = hashlib.sha256('\0'.join(files).encode('utf-8', errors='surrogateescape'))
+    package_dir = os.path.join(str(root_path), package)
+    for name in sorted(PACKAGE_MANIFESTS):
+        hasher.update(f"\0{name}:{file_stamp(os.path.join(package_dir, name))}".encode('utf-8'))
+    return hasher.hexdigest()
+
+def analyze_package(root_path, package, files):
+    """Project type, dependencies and layout of one sub-project, from its own manifests and files"""
+    package_path = Path(root_path) / package
+    project_types = detect_project_type(package_path)
+    prefix = package + '/'
+    index = scan_project_tree(package_path, [rel_path[len(prefix):] for rel_path in files])
+    return {
+        'project_types': project_types,
+        'dependencies': extract_dependencies(package_path, project_types),
+        'structure': analyze_directory_structure(package_path, index),
+        'file_count': index['file_count'],
+    }
+
+def analyze_packages(root_path, packages, files, cache=None, jobs=1, executor='thread'):
+    """Analyze every sub-project, reusing cached results for packages whose fingerprint is unchanged
+
+    Returns (results by package, number re-analyzed).
+    """
+    owned = defaultdict(list)
+    for rel_path in files:
+        owner = package_owner(packages, rel_path)
+        if owner:
+            owned[owner].append(rel_path)
 
-def load_template(template_name):
-    """Load a template file"""
-    script_dir = Path(__file__).parent
-    template_path = script_dir.parent / 'templates' / template_name
+    cached = cache['packages'] if cache is not None else {}
+    results, pending = {}, []
+    for package in sorted(packages):
+        fingerprint = package_fingerprint(root_path, package, owned[package])
+        entry = cached.get(package)
+        if entry and entry['fingerprint'] == fingerprint:
+            results[package] = entry['result']
+        else:
+            pending.append((package, fingerprint))
 
-    if not template_path.exists():
-        # Fallback to simple template if file not found
+    if jobs > 1 and len(pending) > 1:
+        pool_class = ProcessPoolExecutor if executor == 'process' else ThreadPoolExecutor
+        with pool_class(max_workers=jobs) as pool:
+            futures = [pool.submit(analyze_package, str(root_path), package, owned[package]) for package, _ in pending]
+            analyzed = [future.result() for future in futures]
+    else:
+        analyzed = [analyze_package(root_path, package, owned[package]) for package, _ in pending]
+
+    refreshed = {}
+    for (package, fingerprint), result in zip(pending, analyzed):
+        results[package] = result
+        refreshed[package] = {'fingerprint': fingerprint, 'result': result}
+    if cache is not None and (refreshed or set(cached) - set(packages)):
+        cache['packages'] = {package: refreshed.get(package) or cached[package] for package in sorted(packages)}
+        cache['packages_changed'] = True
+    return results, len(pending)
+
+def package_context_path(packages_dir, package):
+    """Per-package context file, named after the package path"""
+    return Path(packages_dir) / (package.replace('/', '__') + '.json')
+
+def write_package_contexts(packages_dir, package_results, buckets, counts, file_source, outputs=None):
+    """Write one context document per package and return the merged summary entries
+
+    Context files of packages that no longer exist are removed.
+    """
+    summaries = []
+    for package, result in sorted(package_results.items()):
+        context = build_analysis(
+            result['project_types'], file_source, result['structure'], buckets['api_endpoints'][package],
+            buckets['database_schemas'][package], result['dependencies'], buckets['existing_docs'][package],
+            buckets['skipped_files'][package],
+            {phase: counts[phase][package] for phase in ('api_endpoints', 'database_schemas', 'existing_docs')}
+        )
+        context = dict({'package': package}, **context)
+        context_path = package_context_path(packages_dir, package)
+        save_context(context_path, context, outputs)
+        summaries.append({
+            'path': package,
+            'project_types': result['project_types'],
+            'file_count': result['file_count'],
+            'counts': context['counts'],
+            'context_file': str(context_path),
+        })
+
+    current = {package_context_path(packages_dir, package).name for package in package_results}
+    if Path(packages_dir).is_dir():
+        for entry in os.scandir(packages_dir):
+            if entry.name.endswith('.json') and entry.name not in current:
+                os.unlink(entry.path)
+    return summaries
+
+# {UPPER_CASE} placeholders; other braces in templates are left alone
+TEMPLATE_PLACEHOLDER = re.compile(r'\{([A-Z][A-Z0-9_]*)\}')
+
+# template name -> (mtime_ns, segments)
+_compiled_templates = {}
+
+def compile_template(template_name):
+    """Load a template as alternating literal/placeholder segments, cached by mtime.
+
+    Even indexes are literal text, odd indexes placeholder names. Returns None
+    if the template file is missing.
+    """
+    template_path = Path(__file__).parent.parent / 'templates' / template_name
+    try:
+        mtime = template_path.stat().st_mtime_ns
+    except OSError:
+        # Fallback to simple generation if file not found
         return None
 
+    cached = _compiled_templates.get(template_name)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
     with open(template_path, 'r') as f:
-        return f.read()
+        segments = TEMPLATE_PLACEHOLDER.split(f.read())
+    _compiled_templates[template_name] = (mtime, segments)
+    return segments
+
+def render_template(segments, variables, used, unknown):
+    """Render compiled segments in one join; unknown placeholders are kept verbatim."""
+    parts = list(segments)
+    for i in range(1, len(parts), 2):
+        name = parts[i]
+        if name in variables:
+            parts[i] = variables[name]
+            used.add(name)
+        else:
+            parts[i] = '{' + name + '}'
+            unknown.add(name)
+    return ''.join(parts)
 
 def extract_readme_content(root_path):
     """Extract content from README.md"""
@@ -212,13 +2970,17 @@ def format_tech_stack(project_types, dependencies):
     frameworks = {
         'package.json': 'Node.js ecosystem',
         'requirements.txt': 'Python packages',
+        'pyproject.toml': 'Python packages',
         'go.mod': 'Go modules',
-        'Cargo.toml': 'Rust crates'
+        'Cargo.toml': 'Rust crates',
+        'pom.xml': 'Maven artifacts',
+        'build.gradle': 'Gradle artifacts'
     }
 
-    for dep_file in dependencies.keys():
+    for dep_file, manifest in dependencies.items():
         if dep_file in frameworks:
-            lines.append(f"  - {frameworks[dep_file]}: `{dep_file}`")
+            count = len(manifest.get('dependencies', [])) if isinstance(manifest, dict) else 0
+            lines.append(f"  - {frameworks[dep_file]}: `{dep_file}` ({count} declared)")
 
     return '\n'.join(lines) if lines else "- [To be detected] Please add tech stack information"
 
@@ -233,31 +2995,59 @@ def format_directory_tree(structure):
                 lines.append(f"  {d}/")
     return '\n'.join(lines) if lines else "[To be scanned] Project directory structure"
 
-def format_api_endpoints(endpoints):
+def format_api_endpoints(endpoints, total=None):
     """Format API endpoints"""
     if not endpoints:
         return "[Not detected] Please add API endpoint information"
+    total = len(endpoints) if total is None else total
 
-    lines = ["**Detected route files**:"]
+    lines = ["**Detected endpoints**:"]
     for endpoint in endpoints[:10]:  # Limit to first 10
-        lines.append(f"- `{endpoint['file']}`")
+        lines.append(f"- `{endpoint['method']} {endpoint['path']}` (`{endpoint['file']}:{endpoint['line']}`)")
 
-    if len(endpoints) > 10:
-        lines.append(f"- ... and {len(endpoints) - 10} more files")
+    if total > 10:
+        lines.append(f"- ... and {total - 10} more endpoints")
 
     return '\n'.join(lines)
 
-def format_database_schemas(schemas):
-    """Format database schema files"""
+def format_column(column):
+    """One column as `name` type with its key and nullability"""
+    text = f"`{column['name']}` {column['type'] or ''}".rstrip()
+    if column.get('primary_key'):
+        text += " PK"
+    elif not column['nullable']:
+        text += " NOT NULL"
+    if column.get('references'):
+        text += f" → {column['references']}"
+    return text
+
+def format_database_schemas(schemas, total=None, model=None):
+    """Format database schema files and the tables replayed from SQL migrations"""
     if not schemas:
         return "[Not detected] Please add database design information"
+    total = len(schemas) if total is None else total
 
     lines = ["**Detected Schema files**:"]
     for schema in schemas[:5]:
         lines.append(f"- `{schema}`")
 
-    if len(schemas) > 5:
-        lines.append(f"- ... and {len(schemas) - 5} more files")
+    if total > 5:
+        lines.append(f"- ... and {total - 5} more files")
+
+    tables = (model or {}).get('tables', [])
+    if tables:
+        lines.append("")
+        lines.append(f"**Tables** (replayed from {model['migration_files']} SQL files):")
+        for table in tables[:20]:
+            columns = ', '.join(format_column(column) for column in table['columns'][:12])
+            if len(table['columns']) > 12:
+                columns += f", ... ({len(table['columns']) - 12} more)"
+            lines.append(f"- **`{table['name']}`**: {columns or 'no columns detected'}")
+            for index in table['indexes']:
+                unique = "unique " if index['unique'] else ""
+                lines.append(f"  - {unique}index `{index['name'] or '(unnamed)'}` on ({', '.join(index['columns'])})")
+        if len(tables) > 20:
+            lines.append(f"- ... and {len(tables) - 20} more tables")
 
     return '\n'.join(lines)
 
@@ -273,45 +3063,55 @@ def format_system_components(structure):
 
     return '\n'.join(lines)
 
-def generate_baseline_specs(analysis, output_dir, root_path):
-    """Generate baseline SDD specifications using templates"""
+# Files generate_baseline_specs() writes, relative to the specs directory (besides .analysis-metadata.json)
+GENERATED_SPEC_FILES = ('project.md', 'architecture.md', 'features/README.md')
+
+def generate_baseline_specs(analysis, output_dir, root_path, outputs=None):
+    """Generate baseline SDD specifications using templates
+
+    Files are only rewritten when their content changes; `outputs` records
+    which were written and which were left alone.
+    """
     output_path = Path(output_dir)
     output_path.mkdir(parents=True, exist_ok=True)
 
+    # Streamed analyses only hold a preview of each list; counts carry the totals
+    counts = analysis.get('counts') or {
+        key: len(analysis[key]) for key in ('api_endpoints', 'database_schemas', 'existing_docs')
+    }
+
     # Extract project name from directory
     project_name = root_path.name.replace('-', ' ').replace('_', ' ').title()
     project_description = extract_readme_content(root_path)
 
-    # Prepare template variables
+    # Prepare template variables, shared by every rendered file
+    tech_stack = format_tech_stack(analysis['project_types'], analysis['dependencies'])
+    database_schemas = format_database_schemas(
+        analysis['database_schemas'], counts['database_schemas'], analysis.get('schema_model')
+    )
     template_vars = {
         'PROJECT_NAME': project_name,
         'PROJECT_DESCRIPTION': project_description,
-        'DETECTED_TECHNOLOGIES': format_tech_stack(analysis['project_types'], analysis['dependencies']),
+        'DETECTED_TECHNOLOGIES': tech_stack,
         'PROJECT_STRUCTURE': format_directory_tree(analysis['structure']),
-        'API_ENDPOINTS': format_api_endpoints(analysis['api_endpoints']),
-        'DATABASE_SCHEMA': format_database_schemas(analysis['database_schemas']),
+        'API_ENDPOINTS': format_api_endpoints(analysis['api_endpoints'], counts['api_endpoints']),
+        'DATABASE_SCHEMA': database_schemas,
         'ARCHITECTURE_OVERVIEW': infer_architecture_pattern(analysis['structure']),
         'SYSTEM_COMPONENTS': format_system_components(analysis['structure']),
-        'TECH_STACK_DETAILS': format_tech_stack(analysis['project_types'], analysis['dependencies']),
-        'DATA_STORAGE': format_database_schemas(analysis['database_schemas']),
+        'TECH_STACK_DETAILS': tech_stack,
+        'DATA_STORAGE': database_schemas,
         'SECURITY_CONSIDERATIONS': "- [TODO] Add authentication and authorization mechanisms\n- [TODO] Add data encryption strategies\n- [TODO] Add security audit plans"
     }
+    used_vars, unknown_vars = set(), set()
 
     # Generate project.md from template
-    project_template = load_template('project.md.template')
+    project_template = compile_template('project.md.template')
     if project_template:
-        project_content = project_template
-        for key, value in template_vars.items():
-            project_content = project_content.replace('{' + key + '}', value)
+        project_content = render_template(project_template, template_vars, used_vars, unknown_vars)
 
-        project_md = output_path / 'project.md'
-        with open(project_md, 'w') as f:
-            f.write(project_content)
     else:
         # Fallback to simple generation
-        project_md = output_path / 'project.md'
-        with open(project_md, 'w') as f:
-            f.write(f"""# {project_name}
+        project_content = f"""# {project_name}
 
 > Auto-generated baseline specification from legacy codebase analysis
 > Date: {__import__('datetime').datetime.now().strftime('%Y-%m-%d')}
@@ -324,27 +3124,22 @@ Detected technologies: {', '.join(analysis['project_types'])}
 
 ### Directory Structure
 
-""")
+"""
+        for category, dirs in analysis['structure'].items():
+            if dirs:
+                project_content += f"**{category.replace('_', ' ').title()}**: {', '.join(dirs)}\n"
 
-            for category, dirs in analysis['structure'].items():
-                if dirs:
-                    f.write(f"**{category.replace('_', ' ').title()}**: {', '.join(dirs)}\n")
+    project_md = output_path / GENERATED_SPEC_FILES[0]
+    write_if_changed(project_md, project_content, outputs)
 
     # Generate architecture.md from template
-    arch_template = load_template('architecture.md.template')
+    arch_template = compile_template('architecture.md.template')
     if arch_template:
-        arch_content = arch_template
-        for key, value in template_vars.items():
-            arch_content = arch_content.replace('{' + key + '}', value)
+        arch_content = render_template(arch_template, template_vars, used_vars, unknown_vars)
 
-        arch_md = output_path / 'architecture.md'
-        with open(arch_md, 'w') as f:
-            f.write(arch_content)
     else:
         # Fallback to simple generation
-        arch_md = output_path / 'architecture.md'
-        with open(arch_md, 'w') as f:
-            f.write(f"""# System Architecture
+        arch_content = f"""# System Architecture
 
 > Auto-generated baseline - requires manual refinement
 
@@ -359,15 +3154,17 @@ Detected technologies: {', '.join(analysis['project_types'])}
 ## Design Patterns
 
 [TODO] Add architecture patterns
-""")
+"""
+
+    arch_md = output_path / GENERATED_SPEC_FILES[1]
+    write_if_changed(arch_md, arch_content, outputs)
 
     # Create features directory with README
     features_dir = output_path / 'features'
     features_dir.mkdir(exist_ok=True)
 
-    readme = features_dir / 'README.md'
-    with open(readme, 'w') as f:
-        f.write("""# Features
+    readme = output_path / GENERATED_SPEC_FILES[2]
+    write_if_changed(readme, """# Features
 
 This directory is used to document various system features.
 
@@ -386,51 +3183,698 @@ You can use `../templates/feature.md.template` as a template.
 ---
 
 *Tip: You can ask Claude to help identify and document features*
-""")
+""", outputs)
 
     # Save generation metadata
     metadata = {
         'generated_at': __import__('datetime').datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
         'analysis_summary': {
             'project_types': analysis['project_types'],
-            'api_endpoints_count': len(analysis['api_endpoints']),
-            'database_schemas_count': len(analysis['database_schemas']),
-            'documentation_count': len(analysis['existing_docs'])
+            'api_endpoints_count': counts['api_endpoints'],
+            'database_schemas_count': counts['database_schemas'],
+            'documentation_count': counts['existing_docs']
         }
     }
 
     metadata_file = output_path / '.analysis-metadata.json'
-    with open(metadata_file, 'w') as f:
-        json.dump(metadata, f, indent=2)
+    previous = load_analysis_metadata(metadata_file)
+    metadata = reuse_timestamp({k: previous[k] for k in metadata if k in previous}, metadata, 'generated_at')
+    update_analysis_metadata(metadata_file, metadata, outputs)
 
     return {
         'project_md': str(project_md),
         'architecture_md': str(arch_md),
         'features_dir': str(features_dir),
-        'metadata': str(metadata_file)
+        'metadata': str(metadata_file),
+        'unknown_placeholders': sorted(unknown_vars),
+        # Only meaningful when every template was found
+        'unused_variables': sorted(set(template_vars) - used_vars) if project_template and arch_template else []
     }
 
+# Phase names in run order, shared by --profile and --watch reports
+ANALYSIS_PHASES = ('project_type', 'directory_structure', 'api_endpoints', 'database_schemas', 'dependencies',
+                   'existing_docs', 'code_stats')
+
+def build_analysis(project_types, file_source, structure, api_endpoints, schemas, dependencies, existing_docs,
+                   skipped_files, counts=None, schema_model=None, code_stats=None, skipped_directories=None):
+    """Assemble the context document; `counts` defaults to the list lengths"""
+    analysis = {
+        'analysis_date': __import__('datetime').datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'project_types': project_types,
+        'file_source': file_source,
+        'structure': structure,
+        'api_endpoints': api_endpoints,
+        'database_schemas': schemas,
+        'dependencies': dependencies,
+        'dependency_graph': dependency_graph(dependencies),
+        'existing_docs': existing_docs,
+        'skipped_files': skipped_files,
+        'skipped_directories': skipped_directories or [],
+        'counts': counts or {
+            'api_endpoints': len(api_endpoints),
+            'database_schemas': len(schemas),
+            'existing_docs': len(existing_docs)
+        }
+    }
+    if schema_model is not None:
+        analysis['schema_model'] = schema_model
+    if code_stats is not None:
+        analysis['code_stats'] = code_stats
+    return analysis
+
+def save_context(output_path, analysis, outputs=None):
+    """Write the JSON context if it changed, keeping the previous date when nothing else did"""
+    try:
+        previous = load_json_file(output_path)
+    except (OSError, ValueError):
+        previous = None
+    analysis = reuse_timestamp(previous, analysis, 'analysis_date')
+    if analysis == previous:
+        # Same document as on disk; skip serializing it just to compare bytes
+        record_output(outputs, output_path, False)
+    else:
+        write_if_changed(output_path, json.dumps(analysis, indent=2), outputs)
+        remember_json_file(output_path, analysis)
+    return analysis
+
+# inotify(7) event bits
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+INOTIFY_EVENT = struct.Struct('iIII')
+
+# Batches touching more paths than this re-list the project instead of checking paths one by one
+WATCH_RELIST_THRESHOLD = 512
+
+def open_inotify():
+    """Open an inotify instance through libc, or None where unavailable"""
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        import ctypes
+        import ctypes.util
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | IN_CLOEXEC)
+    except (OSError, AttributeError):
+        return None
+    if fd < 0:
+        return None
+    return {'libc': libc, 'fd': fd, 'dirs': {}}
+
+def inotify_add_dir(watcher, root_path, rel_dir):
+    """Watch one directory; False when the kernel refuses (usually max_user_watches)"""
+    path = os.fsencode(os.path.join(str(root_path), rel_dir))
+    wd = watcher['libc'].inotify_add_watch(watcher['fd'], path, WATCH_MASK)
+    if wd < 0:
+        return False
+    watcher['dirs'][wd] = rel_dir
+    return True
+
+def inotify_read(watcher, timeout):
+    """Wait up to `timeout` seconds for events
+
+    Returns (paths, new_dirs, overflow) with project-relative paths.
+    """
+    paths, new_dirs, overflow = set(), [], False
+    ready, _, _ = select.select([watcher['fd']], [], [], timeout)
+    if not ready:
+        return paths, new_dirs, overflow
+    try:
+        data = os.read(watcher['fd'], 1 << 16)
+    except BlockingIOError:
+        return paths, new_dirs, overflow
+
+    offset = 0
+    while offset + INOTIFY_EVENT.size <= len(data):
+        wd, mask, _, length = INOTIFY_EVENT.unpack_from(data, offset)
+        name = data[offset + INOTIFY_EVENT.size:offset + INOTIFY_EVENT.size + length].rstrip(b'\0')
+        offset += INOTIFY_EVENT.size + length
+        if mask & IN_Q_OVERFLOW:
+            overflow = True
+            continue
+        if mask & IN_IGNORED:
+            watcher['dirs'].pop(wd, None)
+            continue
+        rel_dir = watcher['dirs'].get(wd)
+        if rel_dir is None or not name:
+            continue
+        name = name.decode('utf-8', errors='surrogateescape')
+        rel_path = f"{rel_dir}/{name}" if rel_dir else name
+        if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+            if name not in IGNORED_DIRS:
+                new_dirs.append(rel_path)
+        else:
+            paths.add(rel_path)
+    return paths, new_dirs, overflow
+
+def project_watch_dirs(files):
+    """Every directory holding a project file, plus its ancestors and the root"""
+    dirs = {''}
+    for rel_path in files:
+        parent = rel_path.rpartition('/')[0]
+        while parent not in dirs:
+            dirs.add(parent)
+            parent = parent.rpartition('/')[0]
+    return dirs
+
+def walk_new_dir(root_path, rel_dir):
+    """Directories and files under a directory that appeared while watching"""
+    dirs, files = [], []
+    stack = [rel_dir]
+    while stack:
+        current = stack.pop()
+        dirs.append(current)
+        try:
+            with os.scandir(os.path.join(str(root_path), current)) as it:
+                for entry in it:
+                    rel_path = f"{current}/{entry.name}"
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in IGNORED_DIRS:
+                            stack.append(rel_path)
+                    elif entry.is_file():
+                        files.append(rel_path)
+        except OSError:
+            continue
+    return dirs, files
+
+def wait_inotify(watcher, root_path, debounce):
+    """Block for the first event, then gather events until quiet for `debounce` seconds
+
+    Returns (paths, relist); relist is set when the kernel queue overflowed.
+    """
+    changed, relist = set(), False
+    timeout = None
+    while True:
+        paths, new_dirs, overflow = inotify_read(watcher, timeout)
+        if not paths and not new_dirs and not overflow:
+            if timeout is not None:
+                return changed, relist
+            continue
+        relist = relist or overflow
+        for rel_dir in new_dirs:
+            dirs, files = walk_new_dir(root_path, rel_dir)
+            for new_dir in dirs:
+                inotify_add_dir(watcher, root_path, new_dir)
+            # Files may have landed before the watch was added
+            changed.update(files)
+        changed |= paths
+        timeout = debounce
+
+def poll_snapshot(root_path, source):
+    """(mtime, size) for every project file and root marker"""
+    files, _ = list_project_files(root_path, source)
+    marker_files = {name for names in PROJECT_MARKERS.values() for name in names}
+    snapshot = {}
+    for rel_path in marker_files.union(files):
+        try:
+            st = os.stat(os.path.join(str(root_path), rel_path))
+        except OSError:
+            continue
+        snapshot[rel_path] = (st.st_mtime_ns, st.st_size)
+    return snapshot
+
+def wait_poll(root_path, source, snapshot, interval, debounce):
+    """Poll until something changes and then stays quiet for `debounce` seconds
+
+    Returns (paths, new_snapshot).
+    """
+    changed = set()
+    while True:
+        time.sleep(debounce if changed else interval)
+        current = poll_snapshot(root_path, source)
+        delta = {p for p in snapshot.keys() | current.keys() if snapshot.get(p) != current.get(p)}
+        snapshot = current
+        if delta:
+            changed |= delta
+        elif changed:
+            return changed, snapshot
+
+def gitignore_rule_sets(root_path, rel_dir, rule_cache):
+    """Stacked (base, rules) sets that apply to entries of `rel_dir`, as walk_project builds them"""
+    if rel_dir not in rule_cache:
+        parent_sets = gitignore_rule_sets(root_path, rel_dir.rpartition('/')[0], rule_cache) if rel_dir else []
+        local_rules = load_gitignore(os.path.join(str(root_path), rel_dir))
+        base = rel_dir + '/' if rel_dir else ''
+        rule_cache[rel_dir] = parent_sets + [(base, local_rules)] if local_rules else parent_sets
+    return rule_cache[rel_dir]
+
+def filter_project_paths(root_path, rel_paths, source):
+    """Keep the new paths that listing the project with `source` ('git' or 'walk') would include"""
+    candidates = [p for p in rel_paths if not any(part in IGNORED_DIRS for part in p.split('/')[:-1])]
+    if not candidates:
+        return set()
+
+    if source == 'git':
+        try:
+            result = subprocess.run(
+                ['git', '--literal-pathspecs', 'ls-files', '-z', '--cached', '--others', '--exclude-standard',
+                 '--', *candidates],
+                cwd=str(root_path), capture_output=True, check=True
+            )
+        except (OSError, subprocess.CalledProcessError):
+            return set(candidates)
+        return {raw.decode('utf-8', errors='surrogateescape') for raw in result.stdout.split(b'\0') if raw}
+
+    rule_cache = {}
+    kept = set()
+    for rel_path in candidates:
+        parts = rel_path.split('/')
+        ancestors = ['/'.join(parts[:i]) for i in range(1, len(parts))]
+        if any(is_gitignored(gitignore_rule_sets(root_path, d.rpartition('/')[0], rule_cache), d, True)
+               for d in ancestors):
+            continue
+        if not is_gitignored(gitignore_rule_sets(root_path, rel_path.rpartition('/')[0], rule_cache),
+                             rel_path, False):
+            kept.add(rel_path)
+    return kept
+
+def refresh_analysis(root_path, state, changed, relist, cache, jobs=1, executor='thread', policy=None):
+    """Bring watch-mode state up to date for a batch of changed paths
+
+    Only phases whose inputs changed are re-run, and API routes are only
+    rescanned in changed source files. Returns the phases that ran.
+    """
+    files = state['files']
+    relist = relist or len(changed) > WATCH_RELIST_THRESHOLD or any(
+        p == '.gitignore' or p.endswith('/.gitignore') for p in changed
+    )
+    if relist:
+        listed, state['file_source'] = list_project_files(root_path, state['file_source'])
+        listed = set(listed)
+        added, removed = listed - files, files - listed
+        # An overflowed queue says nothing about which files changed; the cache sorts it out
+        touched = added | removed | (changed & listed if changed else listed)
+        files = state['files'] = listed
+    else:
+        removed, unknown = set(), []
+        for rel_path in changed:
+            full_path = root_path / rel_path
+            if rel_path in files:
+                if not full_path.is_file():
+                    removed.add(rel_path)
+            elif full_path.is_file():
+                unknown.append(rel_path)
+            elif not full_path.exists():
+                # A removed or moved-away directory only reports itself
+                prefix = rel_path + '/'
+                removed.update(p for p in files if p.startswith(prefix))
+        added = filter_project_paths(root_path, unknown, state['file_source'])
+        touched = added | removed | (changed & files)
+        files -= removed
+        files |= added
+
+    # Layout changes and edits inside skipped or kept copies can change what is redundant
+    skip_dirs = {entry['path'] for entry in state['skipped_dirs']}
+    copied_dirs = skip_dirs | {entry['duplicate_of'] for entry in state['skipped_dirs'] if 'duplicate_of' in entry}
+    redetect = added or removed or any(skipped_dir_of(copied_dirs, p) is not None for p in touched)
+    if redetect and not state['include_vendored']:
+        state['skipped_dirs'] = find_redundant_dirs(root_path, files)
+        previous_dirs, skip_dirs = skip_dirs, {entry['path'] for entry in state['skipped_dirs']}
+        if skip_dirs != previous_dirs:
+            moved = skip_dirs ^ previous_dirs
+            touched |= {p for p in files if skipped_dir_of(moved, p) is not None}
+        else:
+            redetect = added or removed
+
+    phases = set()
+    if redetect:
+        phases.add('directory_structure')
+        state['index'] = scan_project_tree(root_path, sorted(files), skip_dirs)
+        state['structure'] = analyze_directory_structure(root_path, state['index'])
+        if cache is not None:
+            for rel_path in removed:
+                cache['seen'].discard(rel_path)
+                cache['files'].pop(rel_path, None)
+
+    marker_files = {name for names in PROJECT_MARKERS.values() for name in names}
+    marker_files.update(name for names in DEPENDENCY_FILES.values() for name in names)
+    for rel_path in touched | changed:
+        if rel_path in marker_files:
+            phases.update(('project_type', 'dependencies'))
+        if rel_path.endswith(SOURCE_EXTENSIONS):
+            phases.add('api_endpoints')
+        if is_schema_file(rel_path):
+            phases.add('database_schemas')
+        if is_doc_file(rel_path):
+            phases.add('existing_docs')
+        if code_language(rel_path):
+            phases.add('code_stats')
+
+    index = state['index']
+    if 'code_stats' in phases:
+        for rel_path in touched:
+            state['file_stats'].pop(rel_path, None)
+        own_outputs = state['own_outputs']
+        recount = sorted(
+            p for p in touched if p in files and code_language(p) and skipped_dir_of(skip_dirs, p) is None
+            and p not in own_outputs and os.path.dirname(p) not in own_outputs
+        )
+        state['file_stats'].update(iter_code_stats(root_path, recount, cache))
+    if 'project_type' in phases:
+        state['project_types'] = detect_project_type(root_path)
+        state['dependencies'] = extract_dependencies(root_path, state['project_types'], cache)
+    if 'api_endpoints' in phases:
+        for rel_path in touched:
+            state['endpoints'].pop(rel_path, None)
+            state['skipped'].pop(rel_path, None)
+        rescan = sorted(
+            p for p in touched if p in files and p.endswith(SOURCE_EXTENSIONS) and skipped_dir_of(skip_dirs, p) is None
+        )
+        for rel_path, result, note in iter_file_scans(
+            root_path, rescan, cache, 'api_endpoints', scan_route_content, jobs, executor, policy
+        ):
+            if result:
+                state['endpoints'][rel_path] = result
+            if note:
+                state['skipped'][rel_path] = note
+    if 'database_schemas' in phases:
+        state['schemas'] = find_database_schemas(root_path, index)
+        state['schema_model'], _ = build_schema_model(root_path, state['schemas'], cache)
+    if 'existing_docs' in phases:
+        state['docs'] = scan_existing_docs(root_path, index)
+
+    return [phase for phase in ANALYSIS_PHASES if phase in phases]
+
+def state_analysis(state):
+    """The context document for the current watch-mode state, in full-run order"""
+    sources = state['index']['source_files']
+    return build_analysis(
+        state['project_types'], state['file_source'], state['structure'],
+        [endpoint for rel_path in sources for endpoint in state['endpoints'].get(rel_path, ())],
+        state['schemas'], state['dependencies'], state['docs'],
+        [{'file': rel_path, 'reason': state['skipped'][rel_path]} for rel_path in sources
+         if rel_path in state['skipped']],
+        schema_model=state['schema_model'], code_stats=summarize_code_stats(state['file_stats']),
+        skipped_directories=state['skipped_dirs']
+    )
+
+def own_output_paths(root_path, output_path, cache, metadata_file):
+    """Project-relative paths this script writes: context, cache, metadata, per-package directory and baseline specs"""
+    own = set()
+    packages_dir = Path(output_path).with_name(Path(output_path).stem + '.packages')
+    specs = [Path(metadata_file).parent / name for name in GENERATED_SPEC_FILES]
+    for path in (output_path, cache and cache['path'], metadata_file, packages_dir, *specs):
+        try:
+            own.add(Path(path).resolve().relative_to(root_path.resolve()).as_posix())
+        except (TypeError, ValueError):
+            pass
+    return own
+
+def watch_project(root_path, state, cache, args, policy, metadata_file):
+    """Keep the context file (and specs, with --generate-specs) current until interrupted"""
+    output_path = Path(args.output_file)
+    own_outputs = own_output_paths(root_path, output_path, cache, metadata_file)
+
+    if cache is not None:
+        # Git-diff trust only holds for the initial scan
+        cache['git_changed'] = None
+
+    watcher = None
+    if args.watch_backend in ('auto', 'inotify'):
+        watcher = open_inotify()
+        if watcher is not None and not all(
+            inotify_add_dir(watcher, root_path, rel_dir) for rel_dir in sorted(project_watch_dirs(state['files']))
+        ):
+            os.close(watcher['fd'])
+            watcher = None
+            print("⚠️  Not enough inotify watches (see fs.inotify.max_user_watches), polling instead")
+        elif watcher is None and args.watch_backend == 'inotify':
+            print("⚠️  inotify is not available here, polling instead")
+    snapshot = None if watcher is not None else poll_snapshot(root_path, state['file_source'])
+
+    backend = 'inotify' if watcher is not None else f'polling every {args.poll_interval:g}s'
+    print(f"\n👀 Watching {root_path} ({backend}); press Ctrl+C to stop")
+    debounce = args.debounce_ms / 1000
+    try:
+        while True:
+            if watcher is not None:
+                changed, relist = wait_inotify(watcher, root_path, debounce)
+            else:
+                changed, snapshot = wait_poll(root_path, state['file_source'], snapshot, args.poll_interval,
+                                              debounce)
+                relist = False
+            # Ignore our own outputs and hidden temp files (ours and editors')
+            changed = {p for p in changed if p not in own_outputs and os.path.dirname(p) not in own_outputs
+                       and not (p.endswith('.tmp') and p.rpartition('/')[2].startswith('.'))}
+            if not changed and not relist:
+                continue
+
+            started = time.perf_counter()
+            phases = refresh_analysis(root_path, state, changed, relist, cache, max(1, args.jobs), args.executor,
+                                      policy)
+            if not phases:
+                continue
+
+            outputs = {}
+            analysis = save_context(output_path, state_analysis(state), outputs)
+            if cache is not None:
+                head = git_head(root_path)
+                save_analysis_cache(cache, root_path, head)
+                if head:
+                    update_analysis_metadata(metadata_file, {'git_head': head}, outputs)
+            if args.generate_specs:
+                generate_baseline_specs(analysis, root_path / 'openspec' / 'specs', root_path, outputs)
+
+            written = sum(1 for changed_output in outputs.values() if changed_output)
+            print(f"[{time.strftime('%H:%M:%S')}] {len(changed)} path(s) changed → {', '.join(phases)}; "
+                  f"{written} file(s) written ({time.perf_counter() - started:.2f}s)")
+    except KeyboardInterrupt:
+        print("\nStopped watching.")
+    finally:
+        if watcher is not None:
+            os.close(watcher['fd'])
+
+# Records kept in memory per phase when streaming; enough for generated spec previews
+STREAM_PREVIEW_LIMIT = 10
+
+def write_jsonl_record(stream, phase, data, package=None):
+    """Write one analysis record as a JSON line, tagged with its package ('' for the top level) if given"""
+    line = {'phase': phase, 'data': data}
+    if package is not None:
+        line['package'] = package
+    stream.write(json.dumps(line) + '\n')
+
+def collect_phase(records, phase, stream=None, tagged=False):
+    """Drain a phase's records, writing each to `stream` as it is found when streaming
+
+    With `tagged`, records arrive as (package, record) pairs from
+    partition_by_package. Returns (kept, count): all records when not
+    streaming, otherwise only the first STREAM_PREVIEW_LIMIT so memory stays flat.
+    """
+    kept, count = [], 0
+    for record in records:
+        package, record = record if tagged else (None, record)
+        count += 1
+        if stream is None:
+            kept.append(record)
+            continue
+        write_jsonl_record(stream, phase, record, package)
+        if count <= STREAM_PREVIEW_LIMIT:
+            kept.append(record)
+
+    if stream is not None:
+        stream.flush()
+    return kept, count
+
+def server_socket_path():
+    """Where analysis-server.py listens; SDD_ANALYSIS_SOCKET overrides the per-user default"""
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR') or tempfile.gettempdir()
+    return os.environ.get('SDD_ANALYSIS_SOCKET') or os.path.join(runtime_dir, f'sdd-analysis-{os.getuid()}.sock')
+
+def trusted_socket(socket_path):
+    """Whether `socket_path` is our own server socket that no other user can have planted or reach"""
+    try:
+        st = os.lstat(socket_path)
+    except OSError:
+        return False
+    if not stat.S_ISSOCK(st.st_mode) or st.st_uid != os.getuid():
+        return False
+    if not st.st_mode & 0o077:
+        return True
+    try:
+        parent = os.stat(os.path.dirname(os.path.abspath(socket_path)))
+    except OSError:
+        return False
+    return parent.st_uid == os.getuid() and not parent.st_mode & 0o077
+
+def run_via_server(argv):
+    """Run this invocation inside a running analysis-server.py
+
+    Returns the exit code, or None when no server answers (or SDD_NO_SERVER
+    is set) and the caller should run in-process.
+    """
+    if os.environ.get('SDD_NO_SERVER') or not hasattr(socket, 'AF_UNIX'):
+        return None
+    socket_path = server_socket_path()
+    # Without XDG_RUNTIME_DIR the socket lives in the shared temp dir, where anyone could answer "passed"
+    if not trusted_socket(socket_path):
+        return None
+
+    # The environment travels too: git reads GIT_INDEX_FILE, GIT_DIR etc. (e.g. under `git commit -a`)
+    request = {'script': os.path.abspath(__file__), 'argv': argv, 'cwd': os.getcwd(), 'env': dict(os.environ)}
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(1.0)
+            sock.connect(socket_path)
+            sock.settimeout(None)
+            sock.sendall(json.dumps(request).encode('utf-8') + b'\n')
+            with sock.makefile('rb') as f:
+                response = json.loads(f.readline())
+    except (OSError, ValueError):
+        return None
+
+    sys.stdout.write(response.get('stdout', ''))
+    sys.stderr.write(response.get('stderr', ''))
+    return response.get('exit_code', 1)
+
 def main():
+    # A running analysis server answers from warm caches; --watch must stay in this process
+    if '--watch' not in sys.argv[1:]:
+        exit_code = run_via_server(sys.argv[1:])
+        if exit_code is not None:
+            sys.exit(exit_code)
+
     parser = argparse.ArgumentParser(
         description='Analyze project and generate context for AI assistance'
     )
     parser.add_argument(
         '--output-file',
-        default='.claude/project-context.json',
-        help='Output file for project context (default: .claude/project-context.json)'
+        help='Output file for project context (default: .claude/project-context.json, or .jsonl with --format jsonl)'
+    )
+    parser.add_argument(
+        '--format',
+        choices=['json', 'jsonl'],
+        default='json',
+        help='json writes one document at the end; jsonl streams one record per finding plus a trailing summary'
     )
     parser.add_argument(
         '--project-root',
         default='.',
         help='Project root directory (default: current directory)'
     )
+    parser.add_argument(
+        '--file-source',
+        choices=['auto', 'git', 'walk'],
+        default='auto',
+        help='How to enumerate files: git index, .gitignore-aware walk, or auto (default: auto)'
+    )
+    parser.add_argument(
+        '--cache-file',
+        help='Incremental analysis cache (default: <output-file stem>.cache.json)'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Re-read every file instead of reusing cached per-file results'
+    )
+    parser.add_argument(
+        '--jobs',
+        type=int,
+        default=1,
+        help='Number of parallel workers for reading and scanning files (default: 1)'
+    )
+    parser.add_argument(
+        '--executor',
+        choices=['thread', 'process'],
+        default='thread',
+        help='Worker pool type for --jobs: thread for I/O-bound, process for CPU-bound scanning (default: thread)'
+    )
+    parser.add_argument(
+        '--max-file-size',
+        type=int,
+        default=DEFAULT_READ_POLICY['max_file_size'],
+        help='Files larger than this many bytes are handled per --large-files (default: 1048576)'
+    )
+    parser.add_argument(
+        '--large-files',
+        choices=['skip', 'head', 'stream'],
+        default=DEFAULT_READ_POLICY['large_files'],
+        help='Skip large files, scan only their first --head-kb, or stream them in chunks (default: skip)'
+    )
+    parser.add_argument(
+        '--head-kb',
+        type=int,
+        default=DEFAULT_READ_POLICY['head_bytes'] >> 10,
+        help='KB read from large files with --large-files head (default: 64)'
+    )
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='Record per-phase and per-directory timings and I/O counts in .analysis-metadata.json'
+    )
+    parser.add_argument(
+        '--trace-file',
+        help='Also write a Chrome trace-event JSON file (implies --profile)'
+    )
     parser.add_argument(
         '--generate-specs',
         action='store_true',
         help='Generate baseline OpenSpec specifications from analysis'
     )
+    parser.add_argument(
+        '--monorepo',
+        action='store_true',
+        help='Also analyze nested sub-projects (directories with their own manifest) and write a context per package'
+    )
+    parser.add_argument(
+        '--include-vendored',
+        action='store_true',
+        help='Also analyze vendored directories and every copy of duplicated subtrees (skipped by default)'
+    )
+    parser.add_argument(
+        '--max-seconds',
+        type=float,
+        help='Stop reading files after this many seconds and save a partial context (default: no limit)'
+    )
+    parser.add_argument(
+        '--max-files',
+        type=int,
+        help='Read at most this many files (cached results are free) and save a partial context (default: no limit)'
+    )
+    parser.add_argument(
+        '--watch',
+        action='store_true',
+        help='After the initial scan, keep the context file current as files change (json format only)'
+    )
+    parser.add_argument(
+        '--watch-backend',
+        choices=['auto', 'inotify', 'poll'],
+        default='auto',
+        help='How --watch notices changes: inotify on Linux, or stat polling (default: auto)'
+    )
+    parser.add_argument(
+        '--debounce-ms',
+        type=int,
+        default=300,
+        help='Quiet period before a burst of changes is processed in --watch mode (default: 300)'
+    )
+    parser.add_argument(
+        '--poll-interval',
+        type=float,
+        default=2.0,
+        help='Seconds between scans when --watch polls (default: 2)'
+    )
 
     args = parser.parse_args()
+    if args.watch and args.format != 'json':
+        parser.error('--watch requires --format json')
+    if args.watch and args.monorepo:
+        parser.error('--watch cannot be combined with --monorepo')
+    if args.watch and (args.max_seconds is not None or args.max_files is not None):
+        parser.error('--watch cannot be combined with --max-seconds or --max-files')
+    if (args.max_seconds is not None and args.max_seconds <= 0) or (args.max_files is not None and args.max_files < 0):
+        parser.error('--max-seconds must be positive and --max-files must not be negative')
+    if args.output_file is None:
+        args.output_file = '.claude/project-context.jsonl' if args.format == 'jsonl' else '.claude/project-context.json'
 
     root_path = Path(args.project_root).resolve()
 
@@ -448,61 +3892,239 @@ def main():
         sys.exit(1)
 
     print("=== Analyzing Project Context ===\n")
+    budget = new_budget(args.max_seconds, args.max_files)
+
+    profile = new_profile() if args.profile or args.trace_file else None
+    metadata_file = root_path / 'openspec' / 'specs' / '.analysis-metadata.json'
+    head = git_head(root_path)
+
+    read_policy = {
+        'max_file_size': args.max_file_size,
+        'large_files': args.large_files,
+        'head_bytes': args.head_kb << 10,
+    }
+
+    cache = None
+    if not args.no_cache:
+        cache = load_analysis_cache(args.cache_file or default_cache_path(args.output_file), read_policy)
+        previous_head = load_analysis_metadata(metadata_file).get('git_head')
+        git_delta = use_git_diff(cache, root_path, head, previous_head)
+        if git_delta is not None:
+            print(f"Incremental: {git_delta[0]} changed, {git_delta[1]} deleted since {previous_head[:12]}\n")
 
     # Perform analysis
     print("1. Detecting project type...")
-    project_types = detect_project_type(root_path)
+    with profile_phase(profile, 'project_type'):
+        project_types = detect_project_type(root_path)
     print(f"   Found: {', '.join(project_types) if project_types else 'Unknown'}")
 
     print("2. Analyzing directory structure...")
-    structure = analyze_directory_structure(root_path)
+    with profile_phase(profile, 'directory_structure') as counters:
+        files, file_source = list_project_files(root_path, args.file_source)
+        files = list(files)
+        skipped_dirs = [] if args.include_vendored else find_redundant_dirs(root_path, files)
+        index = scan_project_tree(root_path, files, {entry['path'] for entry in skipped_dirs})
+        structure = analyze_directory_structure(root_path, index)
+        if counters is not None:
+            counters['files_visited'] = index['file_count']
+    if skipped_dirs:
+        reasons = defaultdict(int)
+        for entry in skipped_dirs:
+            reasons[entry['reason']] += 1
+        print(f"   Skipped {', '.join(f'{n} {r}' for r, n in sorted(reasons.items()))} "
+              f"director{'y' if len(skipped_dirs) == 1 else 'ies'} "
+              f"({sum(entry['files'] for entry in skipped_dirs)} files)")
+    if budget is not None:
+        index['source_files'] = prioritize_paths(index['source_files'], structure)
+        index['code_files'] = prioritize_paths(index['code_files'], structure)
+
+    output_path = Path(args.output_file)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    # Outputs are only replaced when their content changes: path -> written?
+    outputs = {}
+    # JSONL records go straight to the output so consumers can read them while the run continues;
+    # the previous run's state is kept to carry its date over when nothing changed
+    stream = None
+    if args.format == 'jsonl':
+        previous_digest, previous_summary = stream_state(output_path)
+        stream = open(output_path, 'w')
+
+    # Per-package counts and copies of each phase's records, filled as they stream past (--monorepo);
+    # when streaming, the full records are only in the output and each package keeps a preview
+    packages = index['package_roots'] if args.monorepo else set()
+    package_phases = ('api_endpoints', 'database_schemas', 'existing_docs', 'skipped_files')
+    package_buckets = {phase: defaultdict(list) for phase in package_phases}
+    package_counts = {phase: defaultdict(int) for phase in package_phases}
+    package_limit = STREAM_PREVIEW_LIMIT if stream is not None else None
+
+    def by_package(records, phase, key='file'):
+        if not packages:
+            return records
+        return partition_by_package(
+            records, packages, package_buckets[phase], package_counts[phase], key, package_limit
+        )
 
     print("3. Finding API patterns...")
-    api_endpoints = find_api_endpoints(root_path)
-    print(f"   Found {len(api_endpoints)} potential route files")
+    route_files = set()
+    skipped_files = []
+
+    def tracked_endpoints(counters):
+        for endpoint in iter_api_endpoints(
+            root_path, index, cache, max(1, args.jobs), args.executor, read_policy, skipped_files, counters, budget
+        ):
+            route_files.add(endpoint['file'])
+            yield endpoint
+
+    with profile_phase(profile, 'api_endpoints', cache, len(index['source_files'])) as counters:
+        api_endpoints, endpoint_count = collect_phase(
+            by_package(tracked_endpoints(counters), 'api_endpoints'), 'api_endpoints', stream, bool(packages)
+        )
+    print(f"   Found {endpoint_count} endpoints in {len(route_files)} files")
+    if skipped_files:
+        reasons = defaultdict(int)
+        for skipped in skipped_files:
+            reasons[skipped['reason']] += 1
+        print(f"   Not fully scanned: {', '.join(f'{n} {r}' for r, n in sorted(reasons.items()))}")
+        collect_phase(by_package(skipped_files, 'skipped_files'), 'skipped_files', stream, bool(packages))
+    if cache is not None:
+        stats = cache['stats']
+        print(f"   Cache: {stats['hits']} unchanged, {stats['rehashed']} rehashed, {stats['misses']} scanned")
 
     print("4. Locating database schemas...")
-    schemas = find_database_schemas(root_path)
-    print(f"   Found {len(schemas)} schema files")
+    with profile_phase(profile, 'database_schemas', files_visited=len(index['schema_files'])):
+        schemas, schema_count = collect_phase(
+            by_package(find_database_schemas(root_path, index), 'database_schemas', key=None),
+            'database_schemas', stream, bool(packages)
+        )
+    print(f"   Found {schema_count} schema files")
+    with profile_phase(profile, 'schema_model', cache):
+        schema_model, applied = build_schema_model(root_path, index['schema_files'], cache, budget)
+    if schema_model['migration_files']:
+        print(f"   Schema model: {len(schema_model['tables'])} tables from {schema_model['migration_files']} "
+              f"SQL files ({applied} replayed)")
 
     print("5. Extracting dependencies...")
-    dependencies = extract_dependencies(root_path, project_types)
+    with profile_phase(profile, 'dependencies', cache):
+        dependencies = extract_dependencies(root_path, project_types, cache, budget)
+    package_total = sum(len(manifest['dependencies']) for manifest in dependencies.values())
+    print(f"   Parsed {len(dependencies)} manifests ({package_total} dependency entries)")
 
     print("6. Scanning existing documentation...")
-    existing_docs = scan_existing_docs(root_path)
-    print(f"   Found {len(existing_docs)} documentation files")
+    with profile_phase(profile, 'existing_docs', files_visited=len(index['doc_files'])):
+        existing_docs, doc_count = collect_phase(
+            by_package(scan_existing_docs(root_path, index), 'existing_docs'), 'existing_docs', stream, bool(packages)
+        )
+    print(f"   Found {doc_count} documentation files")
+
+    # Last, so a budget is spent on routes and schemas before size statistics
+    print("7. Measuring code size...")
+    # Our own outputs change on every run and are not part of the codebase
+    own_outputs = own_output_paths(root_path, args.output_file, cache, metadata_file)
+    code_files = [p for p in index['code_files'] if p not in own_outputs and os.path.dirname(p) not in own_outputs]
+    with profile_phase(profile, 'code_stats', cache, len(code_files)) as counters:
+        file_stats = dict(iter_code_stats(root_path, code_files, cache, counters, budget))
+        code_stats = summarize_code_stats(file_stats)
+    total = code_stats['total']
+    top_languages = ', '.join(
+        f"{lang} {counts['code']}" for lang, counts in list(code_stats['languages'].items())[:3]
+    )
+    print(f"   {total['files']} code files, {total['lines']} lines ({total['code']} code)"
+          + (f": {top_languages}" if top_languages else ''))
+
+    package_results = {}
+    if args.monorepo:
+        print("   Analyzing sub-projects...")
+        with profile_phase(profile, 'packages', files_visited=len(files)):
+            package_results, reanalyzed = analyze_packages(
+                root_path, packages, files, cache, max(1, args.jobs), args.executor
+            )
+        print(f"   Found {len(package_results)} packages ({reanalyzed} re-analyzed)")
 
     # Compile analysis
-    analysis = {
-        'analysis_date': __import__('datetime').datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-        'project_types': project_types,
-        'structure': structure,
-        'api_endpoints': api_endpoints,
-        'database_schemas': schemas,
-        'dependencies': dependencies,
-        'existing_docs': existing_docs
-    }
+    analysis = build_analysis(
+        project_types, file_source, structure, api_endpoints, schemas, dependencies, existing_docs,
+        skipped_files, {'api_endpoints': endpoint_count, 'database_schemas': schema_count, 'existing_docs': doc_count},
+        schema_model, code_stats, skipped_dirs
+    )
+    if budget is not None:
+        analysis['coverage'] = budget_coverage(budget)
+        truncated = [
+            f"{phase} {coverage['processed']}/{coverage['total']}"
+            for phase, coverage in analysis['coverage']['phases'].items() if coverage['status'] == 'truncated'
+        ]
+        if truncated:
+            print(f"\n⏳ Budget exhausted ({budget['exhausted']}); partial results for: {', '.join(truncated)}")
+    if args.monorepo:
+        packages_dir = output_path.with_name(output_path.stem + '.packages')
+        summaries = write_package_contexts(
+            packages_dir, package_results, package_buckets, package_counts, file_source, outputs
+        )
+        merged_types = set(project_types).union(*(summary['project_types'] for summary in summaries))
+        analysis['monorepo'] = {
+            'package_count': len(summaries),
+            'project_types': [lang for lang in PROJECT_MARKERS if lang in merged_types],
+            'packages': summaries,
+        }
 
     # Save context file
-    output_path = Path(args.output_file)
-    output_path.parent.mkdir(parents=True, exist_ok=True)
+    if stream is not None:
+        summary = {
+            k: v for k, v in analysis.items()
+            if k not in ('api_endpoints', 'database_schemas', 'existing_docs', 'skipped_files')
+        }
+        stream.flush()
+        with open(output_path, 'rb') as f:
+            digest = hashlib.sha256(f.read()).digest()
+        if digest == previous_digest:
+            summary = reuse_timestamp(previous_summary, summary, 'analysis_date')
+        write_jsonl_record(stream, 'summary', summary)
+        stream.close()
+        record_output(outputs, output_path,
+                      digest != previous_digest or json.loads(json.dumps(summary)) != previous_summary)
+    else:
+        analysis = save_context(output_path, analysis, outputs)
 
-    with open(output_path, 'w') as f:
-        json.dump(analysis, f, indent=2)
+    if cache is not None:
+        save_analysis_cache(cache, root_path, head)
+        if head:
+            update_analysis_metadata(metadata_file, {'git_head': head}, outputs)
 
     print(f"\n✅ Project context saved to: {output_path}")
 
+    if profile is not None:
+        summary = profile_summary(profile, index)
+        update_analysis_metadata(metadata_file, {'profile': summary}, outputs)
+        print(f"\n⏱  Profile ({summary['total_seconds']:.3f}s total, saved to {metadata_file}):")
+        for name, phase in summary['phases'].items():
+            line = f"   {name:<20} {phase['seconds']:>8.3f}s  {phase['files_visited']:>7} visited"
+            line += f"  {phase['files_read']:>7} read  {phase['bytes_read']:>12} bytes"
+            if 'cache' in phase:
+                line += f"  {phase['cache']['hit_rate']:.0%} cache hits"
+            print(line)
+        for top, directory in list(summary['directories'].items())[:5]:
+            print(f"   {top + '/':<20} {directory['read_seconds']:>8.3f}s  {directory['files_visited']:>7} visited"
+                  f"  {directory['files_read']:>7} read  {directory['bytes_read']:>12} bytes")
+        if args.trace_file:
+            write_chrome_trace(profile, args.trace_file)
+            print(f"   Trace written to: {args.trace_file}")
+
     # Generate baseline specs if requested
     if args.generate_specs:
-        print("\n7. Generating baseline specification files...")
+        print("\n8. Generating baseline specification files...")
         specs_dir = root_path / 'openspec' / 'specs'
-        generated_files = generate_baseline_specs(analysis, specs_dir, root_path)
+        generated_files = generate_baseline_specs(analysis, specs_dir, root_path, outputs)
 
         print("   ✅ Generated baseline spec files:")
         print(f"      - {generated_files['project_md']}")
         print(f"      - {generated_files['architecture_md']}")
         print(f"      - {generated_files['features_dir']}/")
         print(f"      - {generated_files['metadata']}")
+        if generated_files['unknown_placeholders']:
+            print(f"   ⚠️  Unknown template placeholders left as-is: "
+                  f"{', '.join(generated_files['unknown_placeholders'])}")
+        if generated_files['unused_variables']:
+            print(f"   ⚠️  Template variables not used by any template: "
+                  f"{', '.join(generated_files['unused_variables'])}")
 
         print("\n" + "="*60)
         print("✨ Baseline specification generation complete")
@@ -532,8 +4154,36 @@ def main():
         print('   "I want to add [YOUR FEATURE]. Please create an')
         print('    OpenSpec change proposal for this feature"')
 
+    written = [path for path, changed in outputs.items() if changed]
+    print(f"\n💾 Outputs: {len(written)} written, {len(outputs) - len(written)} unchanged")
+    for path in written:
+        print(f"   - {path}")
+
     print("\n📚 Reference documentation: reference/legacy-adoption.md")
     print("="*60)
 
+    if args.watch:
+        endpoints_by_file = defaultdict(list)
+        for endpoint in api_endpoints:
+            endpoints_by_file[endpoint['file']].append(endpoint)
+        state = {
+            'files': set(files),
+            'file_source': file_source,
+            'index': index,
+            'project_types': project_types,
+            'structure': structure,
+            'endpoints': dict(endpoints_by_file),
+            'skipped': {skipped['file']: skipped['reason'] for skipped in skipped_files},
+            'schemas': schemas,
+            'schema_model': schema_model,
+            'file_stats': file_stats,
+            'own_outputs': own_outputs,
+            'skipped_dirs': skipped_dirs,
+            'include_vendored': args.include_vendored,
+            'dependencies': dependencies,
+            'docs': existing_docs,
+        }
+        watch_project(root_path, state, cache, args, read_policy, metadata_file)
+
 if __name__ == "__main__":
     main()
@@ -7,6 +7,15 @@
 set -e
 
 PROPOSAL_NAME="${1:-}"
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+
+# Fast path: answer from the indexed status store (re-reads only changed tasks.md files).
+# Set SDD_NO_STATUS_INDEX=1 to force the grep-based fallback below, which also runs
+# (and reports any error itself) whenever the Python path fails.
+if [ -z "${SDD_NO_STATUS_INDEX:-}" ] && command -v python3 >/dev/null 2>&1 && \
+   [ -f "$SCRIPT_DIR/validate-spec.py" ]; then
+    python3 "$SCRIPT_DIR/validate-spec.py" --proposal-status "$PROPOSAL_NAME" 2>/dev/null && exit 0
+fi
 
 # Function to check a single proposal's status
 check_proposal() {
@@ -22,15 +31,15 @@ check_proposal() {
     fi
 
     # Check tasks.md content
-    TOTAL_TASKS=$(grep -c "^- \[" "$proposal_dir/tasks.md" 2>/dev/null || echo "0")
+    TOTAL_TASKS=$(grep -c "^- \[" "$proposal_dir/tasks.md" 2>/dev/null || true)
 
     if [ "$TOTAL_TASKS" -eq 0 ]; then
         echo "draft"
         return
     fi
 
-    COMPLETED_TASKS=$(grep -c "^- \[x\]" "$proposal_dir/tasks.md" 2>/dev/null || echo "0")
-    UNCHECKED_TASKS=$(grep -c "^- \[ \]" "$proposal_dir/tasks.md" 2>/dev/null || echo "0")
+    COMPLETED_TASKS=$(grep -c "^- \[x\]" "$proposal_dir/tasks.md" 2>/dev/null || true)
+    UNCHECKED_TASKS=$(grep -c "^- \[ \]" "$proposal_dir/tasks.md" 2>/dev/null || true)
 
     if [ "$COMPLETED_TASKS" -eq 0 ] && [ "$UNCHECKED_TASKS" -gt 0 ]; then
         echo "ready"
@@ -10,45 +10,156 @@ Usage:
     uv run scripts/validate-spec.py <spec-file-path>
     uv run scripts/validate-spec.py specs/001-feature/spec.md
     uv run scripts/validate-spec.py openspec/changes/feature-name/proposal.md
+
+Batch mode (directories, globs or several files, validated in one process):
+    uv run scripts/validate-spec.py openspec/
+    uv run scripts/validate-spec.py 'openspec/changes/*/tasks.md' specs/ --jobs 4
+    uv run scripts/validate-spec.py openspec/ --json
+
+Pre-commit (validate the staged content of staged spec files; results are cached by content hash):
+    uv run scripts/validate-spec.py --changed-only
+
+Proposal status (indexed in openspec/.status-index.sqlite, refreshed by mtime):
+    uv run scripts/validate-spec.py --proposal-status
+    uv run scripts/validate-spec.py --proposal-status feature-name [--json]
 """
 
 import sys
+import os
 import re
+import glob
+import json
+import hashlib
+import socket
+import stat
+import sqlite3
+import argparse
+import tempfile
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Tuple
+from typing import Dict, List, Optional, Tuple
+
+
+# Every keyword any validator looks for, matched in one pass over the lowered text
+SPEC_KEYWORDS = [
+    "example", "edge case", "error", "as a", "i want",
+    "performance", "security", "scalability", "availability",
+    "why", "because", "alternative", "affect", "impact",
+    "depend", "after", "api", "database", "schema",
+]
+
+# Zero-width lookahead so overlapping keywords (e.g. "as a" in "as api") are all found
+KEYWORD_PATTERN = re.compile(
+    "(?=(" + "|".join(re.escape(k) for k in sorted(SPEC_KEYWORDS, key=len, reverse=True)) + "))"
+)
+HEADING_PATTERN = re.compile(r"^(#{1,6})[ \t]+(.+?)[ \t#]*$")
+FENCE_PATTERN = re.compile(r"^[ \t]{0,3}(`{3,}|~{3,})")
+
+
+def build_spec_index(content: str) -> Dict:
+    """Index a markdown spec in one pass: headings with section spans and keyword hits.
+
+    A section runs until the next heading of the same or a higher level, so it
+    contains its subsections. Headings inside fenced code blocks are ignored.
+    Each keyword maps to the list of section numbers it occurs in directly
+    (-1 for text before the first heading).
+    """
+    lowered = content.lower()
+    sections = []
+    open_sections = []
+    fence = None
+    offset = 0
+
+    for line in lowered.splitlines(keepends=True):
+        fence_match = FENCE_PATTERN.match(line)
+        if fence_match:
+            marker = fence_match.group(1)
+            if fence is None:
+                fence = marker
+            elif marker[0] == fence[0] and len(marker) >= len(fence):
+                fence = None
+        elif fence is None:
+            heading = HEADING_PATTERN.match(line.rstrip("\r\n"))
+            if heading:
+                level = len(heading.group(1))
+                while open_sections and open_sections[-1]["level"] >= level:
+                    open_sections.pop()["end"] = offset
+                sections.append({
+                    "level": level,
+                    "title": heading.group(2).strip(),
+                    "start": offset,
+                    "end": len(lowered),
+                })
+                open_sections.append(sections[-1])
+        offset += len(line)
+
+    starts = [section["start"] for section in sections]
+    keywords: Dict[str, List[int]] = {}
+    section_number = -1
+    for match in KEYWORD_PATTERN.finditer(lowered):
+        position = match.start()
+        while section_number + 1 < len(starts) and starts[section_number + 1] <= position:
+            section_number += 1
+        hits = keywords.setdefault(match.group(1), [])
+        if not hits or hits[-1] != section_number:
+            hits.append(section_number)
+
+    return {"content": content, "sections": sections, "keywords": keywords}
+
+
+def find_section(index: Dict, name: str) -> Optional[int]:
+    """Return the number of the first heading whose title starts with name (any level)."""
+    name = name.lower()
+    for number, section in enumerate(index["sections"]):
+        if section["title"].startswith(name):
+            return number
+    return None
+
+
+def has_keyword(index: Dict, keyword: str, section: Optional[int] = None) -> bool:
+    """Check whether a keyword occurs anywhere, or within one section (subsections included) when given."""
+    hits = index["keywords"].get(keyword, [])
+    if section is None:
+        return bool(hits)
+    sections = index["sections"]
+    span = sections[section]
+    return any(hit >= 0 and span["start"] <= sections[hit]["start"] < span["end"] for hit in hits)
 
 
 def validate_spec_kit_spec(content: str) -> List[str]:
     """Validate spec-kit specification file."""
     issues = []
+    index = build_spec_index(content)
 
     # Required sections for spec-kit specs
     required_sections = [
-        ("# Overview", "Overview section"),
-        ("# User Stories", "User Stories section"),
-        ("# Requirements", "Requirements section"),
-        ("# Acceptance Criteria", "Acceptance Criteria section"),
+        ("Overview", "Overview section"),
+        ("User Stories", "User Stories section"),
+        ("Requirements", "Requirements section"),
+        ("Acceptance Criteria", "Acceptance Criteria section"),
     ]
 
-    for pattern, name in required_sections:
-        if pattern.lower() not in content.lower():
+    for title, name in required_sections:
+        if find_section(index, title) is None:
             issues.append(f"Missing: {name}")
 
     # Check for concrete examples
-    if "example" not in content.lower():
+    if not has_keyword(index, "example"):
         issues.append("No examples found. Add concrete usage examples.")
 
     # Check for edge cases
-    if "edge case" not in content.lower() and "error" not in content.lower():
+    if not has_keyword(index, "edge case") and not has_keyword(index, "error"):
         issues.append("No edge cases or error handling documented.")
 
-    # Check for user story format
-    if "as a" not in content.lower() or "i want" not in content.lower():
+    # Check for user story format, within the User Stories section when there is one
+    stories = find_section(index, "User Stories")
+    if not has_keyword(index, "as a", stories) or not has_keyword(index, "i want", stories):
         issues.append("User stories may be incomplete. Use format: 'As a [user], I want...'")
 
     # Check for non-functional requirements
     nfr_keywords = ["performance", "security", "scalability", "availability"]
-    if not any(kw in content.lower() for kw in nfr_keywords):
+    if not any(has_keyword(index, kw) for kw in nfr_keywords):
         issues.append("Consider adding non-functional requirements (performance, security, etc.)")
 
     return issues
@@ -57,48 +168,65 @@ def validate_spec_kit_spec(content: str) -> List[str]:
 def validate_openspec_proposal(content: str) -> List[str]:
     """Validate OpenSpec proposal file."""
     issues = []
+    index = build_spec_index(content)
 
     # Required sections for OpenSpec proposals
     required_sections = [
-        ("# Problem", "Problem statement"),
-        ("# Solution", "Proposed solution"),
-        ("# Impact", "Impact analysis"),
+        ("Problem", "Problem statement"),
+        ("Solution", "Proposed solution"),
+        ("Impact", "Impact analysis"),
     ]
 
-    for pattern, name in required_sections:
-        if pattern.lower() not in content.lower():
+    for title, name in required_sections:
+        if find_section(index, title) is None:
             issues.append(f"Missing: {name}")
 
     # Check for rationale
-    if "why" not in content.lower() and "because" not in content.lower():
+    if not has_keyword(index, "why") and not has_keyword(index, "because"):
         issues.append("Missing rationale. Explain why this change is needed.")
 
     # Check for alternatives
-    if "alternative" not in content.lower():
+    if not has_keyword(index, "alternative"):
         issues.append("Consider documenting alternatives considered.")
 
     # Check for affected files/components
-    if "affect" not in content.lower() and "impact" not in content.lower():
+    if not has_keyword(index, "affect") and not has_keyword(index, "impact"):
         issues.append("Document what files/components are affected.")
 
     return issues
 
 
+# Checkboxes anywhere (validation) and top-level task lines (proposal status)
+CHECKBOX_PATTERN = re.compile(r"- \[[ x]\]")
+TASK_LINE_PATTERN = re.compile(r"^- \[(.?)", re.MULTILINE)
+
+
+def count_tasks(content: str) -> Dict[str, int]:
+    """Count checkboxes and top-level completed/unchecked tasks in a tasks.md."""
+    marks = TASK_LINE_PATTERN.findall(content)
+    return {
+        "checkboxes": len(CHECKBOX_PATTERN.findall(content)),
+        "total": len(marks),
+        "completed": marks.count("x"),
+        "unchecked": marks.count(" "),
+    }
+
+
 def validate_openspec_tasks(content: str) -> List[str]:
     """Validate OpenSpec tasks file."""
     issues = []
+    index = build_spec_index(content)
 
     # Check for task list format
-    task_pattern = r"- \[[ x]\]"
-    tasks = re.findall(task_pattern, content)
+    tasks = count_tasks(content)["checkboxes"]
 
     if not tasks:
         issues.append("No task checkboxes found. Use '- [ ] Task description' format.")
-    elif len(tasks) < 2:
+    elif tasks < 2:
         issues.append("Only one task found. Consider breaking down further.")
 
     # Check for dependencies
-    if "depend" not in content.lower() and "after" not in content.lower():
+    if not has_keyword(index, "depend") and not has_keyword(index, "after"):
         issues.append("Consider documenting task dependencies.")
 
     return issues
@@ -107,6 +235,7 @@ def validate_openspec_tasks(content: str) -> List[str]:
 def validate_openspec_design(content: str) -> List[str]:
     """Validate OpenSpec design file."""
     issues = []
+    index = build_spec_index(content)
 
     # Check for technical details
     technical_sections = [
@@ -115,11 +244,7 @@ def validate_openspec_design(content: str) -> List[str]:
         ("schema", "Schema changes"),
     ]
 
-    found_technical = False
-    for keyword, name in technical_sections:
-        if keyword in content.lower():
-            found_technical = True
-            break
+    found_technical = any(has_keyword(index, keyword) for keyword, _ in technical_sections)
 
     if not found_technical:
         issues.append("Consider adding technical details (API, database, schema changes).")
@@ -164,24 +289,522 @@ def print_results(spec_type: str, path: Path, issues: List[str]) -> int:
         return 1
 
 
+# File names that can hold a specification; detect_spec_type() decides by location
+SPEC_FILE_NAMES = {"spec.md", "proposal.md", "tasks.md", "design.md"}
+
+# Directories never searched for specifications
+IGNORED_DIRS = {".git", "node_modules", "venv", ".venv", "__pycache__"}
+
+
+def discover_spec_files(targets: List[str]) -> Tuple[List[Path], List[str]]:
+    """Expand files, directories and globs into spec files with a known validator.
+
+    Returns (spec_files, problems) where problems lists targets that matched
+    nothing or explicit files of an unknown type.
+    """
+    found: Dict[str, Path] = {}
+    problems = []
+
+    for target in targets:
+        if glob.has_magic(target):
+            matches = [Path(m) for m in sorted(glob.glob(target, recursive=True))]
+        else:
+            matches = [Path(target)]
+
+        if not matches or not matches[0].exists():
+            problems.append(f"Not found: {target}")
+            continue
+
+        for match in matches:
+            if match.is_dir():
+                for dir_path, dir_names, file_names in os.walk(match):
+                    dir_names[:] = sorted(d for d in dir_names if d not in IGNORED_DIRS)
+                    for name in sorted(file_names):
+                        path = Path(dir_path) / name
+                        if name in SPEC_FILE_NAMES and detect_spec_type(path)[1]:
+                            found.setdefault(str(path), path)
+            elif detect_spec_type(match)[1]:
+                found.setdefault(str(match), match)
+            elif not glob.has_magic(target):
+                problems.append(f"Unknown specification type: {match}")
+
+    return list(found.values()), problems
+
+
+# Bump whenever a validator's checks or messages change; invalidates cached results
+VALIDATOR_VERSION = 2
+
+DEFAULT_CACHE_FILE = Path(".claude") / "validate-spec-cache.json"
+
+
+# Parsed cache files by absolute path, reused while unchanged on disk (pays off in analysis-server.py)
+_loaded_caches: Dict[str, Tuple[Optional[Tuple[int, int, int]], Dict]] = {}
+
+
+def file_stamp(path: str) -> Optional[Tuple[int, int, int]]:
+    """Identity of a file's current contents for in-memory memoization, or None if missing."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+def load_validation_cache(cache_path: Path) -> Dict:
+    """Load cached validation results, discarding them if written by another validator version."""
+    cache = {"version": VALIDATOR_VERSION, "files": {}, "results": {}}
+    key = os.path.abspath(cache_path)
+    try:
+        stamp = file_stamp(key)
+        memo = _loaded_caches.get(key)
+        if memo and memo[0] == stamp:
+            data = memo[1]
+        else:
+            with open(key, "r") as f:
+                data = json.load(f)
+            _loaded_caches[key] = (stamp, data)
+        if data.get("version") == VALIDATOR_VERSION:
+            cache["files"] = data.get("files", {})
+            cache["results"] = data.get("results", {})
+    except (OSError, ValueError):
+        pass
+    cache["path"] = str(cache_path)
+    return cache
+
+
+def save_validation_cache(cache: Dict) -> None:
+    """Persist the cache, dropping files that no longer exist and results no file references."""
+    files = {path: entry for path, entry in cache["files"].items() if os.path.exists(path)}
+    referenced = {entry["key"] for entry in files.values()}
+    data = {
+        "version": VALIDATOR_VERSION,
+        "files": files,
+        "results": {k: v for k, v in cache["results"].items() if k in referenced},
+    }
+    cache_path = Path(cache["path"])
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(cache_path, "w") as f:
+        json.dump(data, f, separators=(",", ":"))
+    key = os.path.abspath(cache_path)
+    _loaded_caches[key] = (file_stamp(key), data)
+
+
+def cached_validation(cache: Dict, path: Path,
+                      data: Optional[bytes] = None) -> Tuple[Optional[Dict], Optional[str], Optional[str]]:
+    """Look a file up in the cache.
+
+    Returns (result, key, content): a finished result on a hit or read error,
+    otherwise the result key to store under and the content to validate.
+    Files whose mtime and size are unchanged are not read at all. When `data`
+    is given (staged content), it is validated instead of the file on disk.
+    """
+    spec_type, validator = detect_spec_type(path)
+    result = {"file": str(path), "type": spec_type, "issues": [], "error": None, "cached": True}
+    file_key = str(path.resolve())
+    entry = cache["files"].get(file_key)
+    st = None
+
+    try:
+        if data is None:
+            st = path.stat()
+            if entry and entry["mtime_ns"] == st.st_mtime_ns and entry["size"] == st.st_size \
+                    and entry["key"] in cache["results"]:
+                result["issues"] = cache["results"][entry["key"]]
+                return result, None, None
+            data = path.read_bytes()
+        content = data.decode("utf-8")
+    except Exception as e:
+        result.update(error=f"Error reading file: {e}", cached=False)
+        return result, None, None
+
+    key = f"{hashlib.sha256(data).hexdigest()}:{validator.__name__}"
+    if st is not None:
+        cache["files"][file_key] = {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "key": key}
+    if key in cache["results"]:
+        result["issues"] = cache["results"][key]
+        return result, None, None
+    return None, key, content
+
+
+def validate_content(job: Tuple[Path, str]) -> List[str]:
+    """Worker entry point: run the right validator on already-read content."""
+    path, content = job
+    return detect_spec_type(path)[1](content)
+
+
+def validate_file(path: Path) -> Dict:
+    """Validate one specification file and return a JSON-friendly result."""
+    spec_type, validator = detect_spec_type(path)
+    result = {"file": str(path), "type": spec_type, "issues": [], "error": None}
+    try:
+        content = path.read_text(encoding='utf-8')
+    except Exception as e:
+        result["error"] = f"Error reading file: {e}"
+        return result
+
+    result["issues"] = validator(content)
+    return result
+
+
+def validate_files(paths: List[Path], jobs: int = 1, cache: Optional[Dict] = None,
+                   contents: Optional[Dict[Path, bytes]] = None) -> List[Dict]:
+    """Validate many files in one process, or across a process pool, keeping input order.
+
+    With a cache, unchanged files are answered from it and only new content
+    is validated. Paths found in `contents` are validated from those bytes
+    instead of the working tree.
+    """
+    if cache is None and contents is None:
+        if jobs > 1 and len(paths) > 1:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                return list(pool.map(validate_file, paths, chunksize=max(1, len(paths) // (jobs * 4))))
+        return [validate_file(path) for path in paths]
+    if cache is None:
+        cache = {"files": {}, "results": {}}
+    contents = contents or {}
+
+    results: List[Optional[Dict]] = []
+    misses = []
+    for path in paths:
+        result, key, content = cached_validation(cache, path, contents.get(path))
+        results.append(result)
+        if result is None:
+            misses.append((len(results) - 1, path, key, content))
+
+    jobs_list = [(path, content) for _, path, _, content in misses]
+    if jobs > 1 and len(jobs_list) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            issues_list = list(pool.map(validate_content, jobs_list, chunksize=max(1, len(jobs_list) // (jobs * 4))))
+    else:
+        issues_list = [validate_content(job) for job in jobs_list]
+
+    for (i, path, key, _), issues in zip(misses, issues_list):
+        cache["results"][key] = issues
+        results[i] = {
+            "file": str(path), "type": detect_spec_type(path)[0], "issues": issues, "error": None, "cached": False
+        }
+
+    return results
+
+
+def staged_spec_files() -> Optional[List[str]]:
+    """Spec files added, copied, modified or renamed in the git index, or None outside git."""
+    try:
+        output = subprocess.run(
+            ["git", "diff", "--cached", "--name-only", "--diff-filter=ACMR", "--relative", "-z"],
+            capture_output=True, check=True
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return [p for p in output.decode("utf-8", errors="surrogateescape").split("\0")
+            if p and detect_spec_type(Path(p))[1]]
+
+
+def staged_contents(paths: List[str]) -> Dict[Path, bytes]:
+    """Index (staged) contents of the given paths, read in one git cat-file call."""
+    request = "".join(f":./{p}\n" for p in paths).encode("utf-8", errors="surrogateescape")
+    try:
+        output = subprocess.run(["git", "cat-file", "--batch"], input=request, capture_output=True,
+                                check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return {}
+
+    contents = {}
+    pos = 0
+    for p in paths:
+        header_end = output.find(b"\n", pos)
+        if header_end == -1:
+            break
+        header = output[pos:header_end].split()
+        pos = header_end + 1
+        # "<name> missing" has no body; blobs are followed by their bytes and a newline
+        if len(header) == 3 and header[1] == b"blob":
+            size = int(header[2])
+            contents[Path(p)] = output[pos:pos + size]
+            pos += size + 1
+    return contents
+
+
+def summarize(results: List[Dict]) -> Dict:
+    """Aggregate counts for a batch of validation results."""
+    return {
+        "total": len(results),
+        "passed": sum(1 for r in results if not r["issues"] and not r["error"]),
+        "with_issues": sum(1 for r in results if r["issues"]),
+        "errors": sum(1 for r in results if r["error"]),
+        "issues": sum(len(r["issues"]) for r in results),
+    }
+
+
+def print_batch_results(results: List[Dict], problems: List[str]) -> int:
+    """Print an aggregate report and return the combined exit code."""
+    for problem in problems:
+        print(f"✗ {problem}")
+
+    for result in results:
+        if result["error"]:
+            print(f"✗ {result['file']}: {result['error']}")
+        elif result["issues"]:
+            print(f"⚠ {result['file']} ({result['type']}): {len(result['issues'])} issue(s)")
+            for issue in result["issues"]:
+                print(f"    - {issue}")
+        else:
+            print(f"✓ {result['file']} ({result['type']})")
+
+    summary = summarize(results)
+    print(f"\n{'=' * 50}")
+    print(f"Validated {summary['total']} file(s): {summary['passed']} complete, "
+          f"{summary['with_issues']} with issues, {summary['errors']} unreadable")
+    print('=' * 50)
+
+    return 0 if summary["passed"] == summary["total"] and not problems else 1
+
+
+CHANGE_FILES = ("proposal.md", "design.md", "tasks.md")
+
+STATUS_INDEX_NAME = ".status-index.sqlite"
+
+
+def proposal_status(has_files: bool, counts: Dict[str, int]) -> str:
+    """Derive a change's status the same way check-proposal-status.sh does."""
+    total, completed, unchecked = counts["total"], counts["completed"], counts["unchecked"]
+    if not has_files or total == 0:
+        return "draft"
+    if completed == 0 and unchecked > 0:
+        return "ready"
+    if completed == total and unchecked == 0:
+        return "completed"
+    if unchecked > 0:
+        return "implementing"
+    return "draft"
+
+
+def open_status_index(openspec_dir: Path, in_memory: bool = False) -> sqlite3.Connection:
+    """Open (creating if needed) the proposal status index under openspec/, or a throwaway one in memory."""
+    conn = sqlite3.connect(":memory:" if in_memory else str(openspec_dir / STATUS_INDEX_NAME))
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS changes ("
+        "name TEXT PRIMARY KEY, stamp TEXT, has_proposal INTEGER, has_design INTEGER, "
+        "has_tasks INTEGER, total INTEGER, completed INTEGER, unchecked INTEGER, status TEXT, "
+        "version INTEGER)"
+    )
+    return conn
+
+
+def refresh_change(conn: sqlite3.Connection, change_dir: Path) -> None:
+    """Re-index one change if any of its files appeared, vanished or changed mtime."""
+    stamps = []
+    for name in CHANGE_FILES:
+        try:
+            st = (change_dir / name).stat()
+            stamps.append(f"{st.st_mtime_ns}:{st.st_size}")
+        except OSError:
+            stamps.append("-")
+    stamp = ",".join(stamps)
+
+    row = conn.execute("SELECT stamp, version FROM changes WHERE name = ?", (change_dir.name,)).fetchone()
+    if row and row[0] == stamp and row[1] == VALIDATOR_VERSION:
+        return
+
+    present = [s != "-" for s in stamps]
+    counts = {"total": 0, "completed": 0, "unchecked": 0}
+    if present[2]:
+        try:
+            counts = count_tasks((change_dir / "tasks.md").read_text(encoding="utf-8", errors="replace"))
+        except OSError:
+            pass
+    conn.execute(
+        "INSERT OR REPLACE INTO changes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (change_dir.name, stamp, *present, counts["total"], counts["completed"], counts["unchecked"],
+         proposal_status(all(present), counts), VALIDATOR_VERSION)
+    )
+
+
+def query_proposal_status(openspec_dir: Path, name: Optional[str] = None,
+                          in_memory: bool = False) -> Optional[List[Dict]]:
+    """Status of one change (None if missing) or of every change, from the incremental index."""
+    changes_dir = openspec_dir / "changes"
+    conn = open_status_index(openspec_dir, in_memory)
+    try:
+        with conn:
+            if name is not None:
+                change_dir = changes_dir / name
+                if not change_dir.is_dir():
+                    conn.execute("DELETE FROM changes WHERE name = ?", (name,))
+                    return None
+                refresh_change(conn, change_dir)
+                names = [name]
+            else:
+                names = sorted(e.name for e in os.scandir(changes_dir) if e.is_dir())
+                for change in names:
+                    refresh_change(conn, changes_dir / change)
+                known = {r[0] for r in conn.execute("SELECT name FROM changes")}
+                conn.executemany("DELETE FROM changes WHERE name = ?", [(n,) for n in known - set(names)])
+        rows = []
+        for change in names:
+            row = conn.execute(
+                "SELECT name, has_proposal, has_design, has_tasks, total, completed, unchecked, status "
+                "FROM changes WHERE name = ?", (change,)
+            ).fetchone()
+            rows.append(dict(zip(
+                ("name", "proposal", "design", "tasks", "total", "completed", "unchecked", "status"), row
+            )))
+        return rows
+    finally:
+        conn.close()
+
+
+def print_proposal_status(openspec_dir: Path, name: Optional[str], as_json: bool) -> int:
+    """Print status in check-proposal-status.sh format (or JSON) and return the exit code."""
+    if not (openspec_dir / "changes").is_dir():
+        print("No openspec/changes directory found", file=sys.stderr)
+        return 1
+    try:
+        rows = query_proposal_status(openspec_dir, name)
+    except (sqlite3.Error, OSError):
+        # Read-only or unusable openspec/: compute the status without persisting the index
+        rows = query_proposal_status(openspec_dir, name, in_memory=True)
+    if rows is None:
+        print(f"Proposal not found: {name}", file=sys.stderr)
+        return 1
+    if as_json:
+        for row in rows:
+            for key in ("proposal", "design", "tasks"):
+                row[key] = bool(row[key])
+        print(json.dumps(rows[0] if name else rows, indent=2))
+    elif name:
+        print(rows[0]["status"])
+    else:
+        for row in rows:
+            print(f"{row['name']}:{row['status']}")
+    return 0
+
+
+def server_socket_path() -> str:
+    """Where analysis-server.py listens; SDD_ANALYSIS_SOCKET overrides the per-user default."""
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return os.environ.get("SDD_ANALYSIS_SOCKET") or os.path.join(runtime_dir, f"sdd-analysis-{os.getuid()}.sock")
+
+
+def trusted_socket(socket_path: str) -> bool:
+    """Whether `socket_path` is our own server socket that no other user can have planted or reach."""
+    try:
+        st = os.lstat(socket_path)
+    except OSError:
+        return False
+    if not stat.S_ISSOCK(st.st_mode) or st.st_uid != os.getuid():
+        return False
+    if not st.st_mode & 0o077:
+        return True
+    try:
+        parent = os.stat(os.path.dirname(os.path.abspath(socket_path)))
+    except OSError:
+        return False
+    return parent.st_uid == os.getuid() and not parent.st_mode & 0o077
+
+
+def run_via_server(argv: List[str]) -> Optional[int]:
+    """Run this invocation inside a running analysis-server.py.
+
+    Returns the exit code, or None when no server answers (or SDD_NO_SERVER
+    is set) and the caller should run in-process.
+    """
+    if os.environ.get("SDD_NO_SERVER") or not hasattr(socket, "AF_UNIX"):
+        return None
+    socket_path = server_socket_path()
+    # Without XDG_RUNTIME_DIR the socket lives in the shared temp dir, where anyone could answer "passed"
+    if not trusted_socket(socket_path):
+        return None
+
+    # The environment travels too: git reads GIT_INDEX_FILE, GIT_DIR etc. (e.g. under `git commit -a`)
+    request = {"script": os.path.abspath(__file__), "argv": argv, "cwd": os.getcwd(), "env": dict(os.environ)}
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(1.0)
+            sock.connect(socket_path)
+            sock.settimeout(None)
+            sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+            with sock.makefile("rb") as f:
+                response = json.loads(f.readline())
+    except (OSError, ValueError):
+        return None
+
+    sys.stdout.write(response.get("stdout", ""))
+    sys.stderr.write(response.get("stderr", ""))
+    return response.get("exit_code", 1)
+
+
 def main():
+    exit_code = run_via_server(sys.argv[1:])
+    if exit_code is not None:
+        sys.exit(exit_code)
+
     if len(sys.argv) < 2:
         print(__doc__)
         sys.exit(1)
 
-    spec_path = Path(sys.argv[1])
+    parser = argparse.ArgumentParser(description="Validate specification completeness.")
+    parser.add_argument("targets", nargs="*", help="Spec files, directories or glob patterns")
+    parser.add_argument("--jobs", type=int, default=1, help="Validate in parallel worker processes")
+    parser.add_argument("--json", action="store_true", help="Print a JSON report instead of text")
+    parser.add_argument("--changed-only", action="store_true",
+                        help="Validate only spec files staged in git (within targets, if given)")
+    parser.add_argument("--cache-file", default=str(DEFAULT_CACHE_FILE),
+                        help=f"Validation result cache (default: {DEFAULT_CACHE_FILE})")
+    parser.add_argument("--no-cache", action="store_true", help="Always re-read and re-validate files")
+    parser.add_argument("--proposal-status", nargs="?", const="", metavar="NAME",
+                        help="Print status of one OpenSpec change, or all changes if NAME is omitted")
+    parser.add_argument("--openspec-dir", default="openspec", help="OpenSpec root (default: openspec)")
+    args = parser.parse_args()
+
+    if args.proposal_status is not None:
+        sys.exit(print_proposal_status(Path(args.openspec_dir), args.proposal_status or None, args.json))
+
+    cache = None if args.no_cache else load_validation_cache(Path(args.cache_file))
+
+    if args.changed_only:
+        staged = staged_spec_files()
+        if staged is None:
+            print("Error: --changed-only requires a git repository")
+            sys.exit(1)
+        if args.targets:
+            roots = [os.path.normpath(t) for t in args.targets]
+            staged = [p for p in staged
+                      if any(r == "." or p == r or p.startswith(r.rstrip("/") + "/") for r in roots)]
+        if not staged:
+            print("No staged specification files to validate.")
+            sys.exit(0)
+        args.targets = staged
+    elif not args.targets:
+        parser.error("at least one target is required unless --changed-only is given")
+
+    batch = len(args.targets) > 1 or args.json or args.changed_only or glob.has_magic(args.targets[0]) \
+        or Path(args.targets[0]).is_dir()
+    if batch:
+        if args.changed_only:
+            # What is being committed is the index, not the working tree
+            paths, problems = [Path(p) for p in args.targets], []
+            contents = staged_contents(args.targets)
+        else:
+            paths, problems = discover_spec_files(args.targets)
+            contents = None
+        results = validate_files(paths, max(1, args.jobs), cache, contents)
+        if cache is not None:
+            save_validation_cache(cache)
+        if args.json:
+            summary = summarize(results)
+            print(json.dumps({"files": results, "problems": problems, "summary": summary}, indent=2))
+            exit_code = 0 if summary["passed"] == summary["total"] and not problems else 1
+        else:
+            exit_code = print_batch_results(results, problems)
+        sys.exit(exit_code)
+
+    spec_path = Path(args.targets[0])
 
     if not spec_path.exists():
         print(f"Error: File not found: {spec_path}")
         sys.exit(1)
 
-    # Read file content
-    try:
-        content = spec_path.read_text(encoding='utf-8')
-    except Exception as e:
-        print(f"Error reading file: {e}")
-        sys.exit(1)
-
     # Detect spec type and get validator
     spec_type, validator = detect_spec_type(spec_path)
 
@@ -195,8 +818,13 @@ def main():
         sys.exit(1)
 
     # Validate and print results
-    issues = validator(content)
-    exit_code = print_results(spec_type, spec_path, issues)
+    result = validate_files([spec_path], cache=cache)[0]
+    if result["error"]:
+        print(result["error"])
+        sys.exit(1)
+    if cache is not None:
+        save_validation_cache(cache)
+    exit_code = print_results(spec_type, spec_path, result["issues"])
     sys.exit(exit_code)
 
 
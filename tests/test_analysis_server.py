@@ -0,0 +1,86 @@
+"""Tests for requests forwarded to skills/managing-specifications/scripts/analysis-server.py"""
+import importlib.util
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+SCRIPTS = Path(__file__).resolve().parent.parent / 'skills' / 'managing-specifications' / 'scripts'
+
+
+def load_script(name, filename):
+    """Import one of the hyphenated skill scripts as a module"""
+    spec = importlib.util.spec_from_file_location(name, SCRIPTS / filename)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+server = load_script('analysis_server', 'analysis-server.py')
+
+
+@unittest.skipUnless(hasattr(socket, 'AF_UNIX') and shutil.which('git'), 'needs Unix sockets and git')
+class ForwardedEnvironmentTests(unittest.TestCase):
+    def setUp(self):
+        # mkdtemp is private to this user, so the clients trust a socket inside it
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        self.socket_path = str(self.tmp / 'server.sock')
+        env = dict(os.environ)
+        env.pop('SDD_NO_SERVER', None)
+        self.server = subprocess.Popen(
+            [sys.executable, str(SCRIPTS / 'analysis-server.py'), '--socket', self.socket_path, '--idle-timeout', '60'],
+            env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        self.addCleanup(self.stop_server)
+        deadline = time.time() + 10
+        while server.send_request(self.socket_path, {'command': 'ping'}, timeout=1.0) is None:
+            if time.time() > deadline or self.server.poll() is not None:
+                self.fail('analysis server did not start')
+            time.sleep(0.05)
+
+    def stop_server(self):
+        server.send_request(self.socket_path, {'command': 'shutdown'}, timeout=5.0)
+        try:
+            self.server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.server.kill()
+
+    def git(self, repo, *args, env=None):
+        subprocess.run(['git', '-c', 'user.name=t', '-c', 'user.email=t@example.com', *args],
+                       cwd=repo, env=env, check=True, capture_output=True)
+
+    def test_changed_only_reads_the_clients_git_index(self):
+        repo = self.tmp / 'repo'
+        change = repo / 'openspec' / 'changes' / 'add-login'
+        change.mkdir(parents=True)
+        (repo / 'README.md').write_text('# demo\n')
+        self.git(repo, 'init', '-q')
+        self.git(repo, 'add', 'README.md')
+        self.git(repo, 'commit', '-q', '-m', 'init')
+
+        # Stage the proposal only in a separate index, like `git commit -a` does with .git/index.lock
+        (change / 'proposal.md').write_text('# Add login\n')
+        alt_index = self.tmp / 'alt-index'
+        shutil.copy(repo / '.git' / 'index', alt_index)
+        env = dict(os.environ, GIT_INDEX_FILE=str(alt_index), SDD_ANALYSIS_SOCKET=self.socket_path)
+        env.pop('SDD_NO_SERVER', None)
+        self.git(repo, 'add', 'openspec', env=env)
+
+        result = subprocess.run(
+            [sys.executable, str(SCRIPTS / 'validate-spec.py'), '--changed-only', '--json', '--no-cache'],
+            cwd=repo, env=env, capture_output=True, text=True
+        )
+        self.assertEqual(server.send_request(self.socket_path, {'command': 'ping'}, timeout=5.0)['requests'], 1)
+        report = json.loads(result.stdout)
+        self.assertEqual([f['file'] for f in report['files']], ['openspec/changes/add-login/proposal.md'])
+
+
+if __name__ == '__main__':
+    unittest.main()
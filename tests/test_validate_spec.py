@@ -0,0 +1,80 @@
+"""Regression tests for skills/managing-specifications/scripts/validate-spec.py"""
+import contextlib
+import importlib.util
+import io
+import tempfile
+import unittest
+from pathlib import Path
+
+SCRIPTS = Path(__file__).resolve().parent.parent / 'skills' / 'managing-specifications' / 'scripts'
+
+
+def load_script(name, filename):
+    """Import one of the hyphenated skill scripts as a module"""
+    spec = importlib.util.spec_from_file_location(name, SCRIPTS / filename)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+validator = load_script('validate_spec', 'validate-spec.py')
+
+NESTED_STORIES_SPEC = """# Login
+
+## Overview
+Users sign in with email and password, for example alice@example.com.
+
+## User Stories
+
+### Story 1: Login
+As a user, I want to sign in so that I can see my dashboard.
+
+### Story 2: Logout
+As a user, I want to sign out on shared machines.
+
+## Requirements
+Sessions expire after 30 minutes. Performance: sign-in completes within 200 ms.
+
+## Acceptance Criteria
+A wrong password shows an error and keeps the email filled in.
+"""
+
+
+class SpecKitSectionTests(unittest.TestCase):
+    def test_nested_story_headings_count_for_user_stories(self):
+        self.assertEqual(validator.validate_spec_kit_spec(NESTED_STORIES_SPEC), [])
+
+    def test_stories_outside_the_section_are_still_reported(self):
+        content = NESTED_STORIES_SPEC.replace('## User Stories\n', '## User Stories\nTBD\n\n## Notes\n')
+        self.assertIn("User stories may be incomplete. Use format: 'As a [user], I want...'",
+                      validator.validate_spec_kit_spec(content))
+
+    def test_section_ends_at_next_heading_of_same_level(self):
+        index = validator.build_spec_index(NESTED_STORIES_SPEC)
+        stories = validator.find_section(index, 'User Stories')
+        requirements = validator.find_section(index, 'Requirements')
+        self.assertEqual(index['sections'][stories]['end'], index['sections'][requirements]['start'])
+        self.assertFalse(validator.has_keyword(index, 'performance', stories))
+
+
+class ProposalStatusTests(unittest.TestCase):
+    def test_status_printed_when_index_cannot_be_opened(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            openspec = Path(tmp) / 'openspec'
+            change = openspec / 'changes' / 'add-login'
+            change.mkdir(parents=True)
+            for name in ('proposal.md', 'design.md'):
+                (change / name).write_text('# ' + name + '\n')
+            (change / 'tasks.md').write_text('- [x] schema\n- [ ] endpoint\n')
+            # A directory where the index file should be makes sqlite3.connect fail, like a read-only openspec/
+            (openspec / validator.STATUS_INDEX_NAME).mkdir()
+
+            out = io.StringIO()
+            with contextlib.redirect_stdout(out):
+                exit_code = validator.print_proposal_status(openspec, 'add-login', as_json=False)
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(out.getvalue(), 'implementing\n')
+
+
+if __name__ == '__main__':
+    unittest.main()